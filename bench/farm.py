@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Local mock site farm for offline benchmarks.
+
+Serves every role the scanner talks to, so a scan never leaves the machine:
+  - one page per sites.json rule (status code, marker and regex sites, including
+    the xcancel, TikTok and Facebook marker pages), rewritten to /site/<slug>/...
+  - DuckDuckGo results for "search" rules (/html/?q=... and the lite engine's /lite/?q=...)
+  - the GitHub users/events API (/users/<name>, /users/<name>/events/public)
+
+Latency distribution, error rate, dropped connections, page size and hit rate come
+from a profile (see PROFILES) and can be overridden per site. Rules are spread over
+several loopback addresses (127.0.0.1, 127.0.0.2, ...) so per-host limits behave as
+they do against real hosts.
+
+Usage: python bench/farm.py --out /tmp/farm_sites.json [--profile realistic] [--sites 40]
+Writes the rewritten rule file, prints one JSON line with the farm addresses and
+serves until stdin is closed.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+# latency: {"dist": "fixed", "ms"} | {"dist": "uniform", "min_ms", "max_ms"}
+#        | {"dist": "lognormal", "median_ms", "sigma"} | {"dist": "exponential", "mean_ms"}
+# error_rate: share of requests answered 503; drop_rate: share closed without an answer
+# page_kb: body size of profile and result pages; marker_at: where in the page the marker sits (0..1)
+# hit_rate: share of (site, username) pairs that exist
+PROFILES = {
+    "fast": {
+        "latency": {"dist": "fixed", "ms": 2},
+        "error_rate": 0.0, "drop_rate": 0.0, "page_kb": 16, "marker_at": 0.5, "hit_rate": 0.3,
+    },
+    "realistic": {
+        "latency": {"dist": "lognormal", "median_ms": 120, "sigma": 0.7},
+        "error_rate": 0.02, "drop_rate": 0.005, "page_kb": 150, "marker_at": 0.5, "hit_rate": 0.3,
+    },
+    "degraded": {
+        "latency": {"dist": "lognormal", "median_ms": 400, "sigma": 1.0},
+        "error_rate": 0.15, "drop_rate": 0.05, "page_kb": 300, "marker_at": 0.8, "hit_rate": 0.3,
+    },
+}
+
+# Keys that would make the farm pace or cache itself instead of being measured
+LIVE_ONLY_KEYS = ("rate_limit", "cache_ttl")
+
+FILLER = b"<div class=\"post\"><p>Lorem ipsum dolor sit amet, bench filler text.</p></div>\n"
+
+def exists(key, username, hit_rate):
+    """Stable pseudo-random answer to "does username have an account on key?"."""
+    return zlib.crc32(f"{key}|{username.lower()}".encode()) % 10000 < hit_rate * 10000
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+class LatencyModel:
+    def __init__(self, spec, seed=None):
+        self.spec = dict(spec)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """One delay in seconds."""
+        spec = self.spec
+        with self._lock:
+            dist = spec.get("dist", "fixed")
+            if dist == "fixed":
+                ms = spec.get("ms", 0)
+            elif dist == "uniform":
+                ms = self._random.uniform(spec["min_ms"], spec["max_ms"])
+            elif dist == "lognormal":
+                ms = self._random.lognormvariate(math.log(spec["median_ms"]), spec.get("sigma", 0.5))
+            elif dist == "exponential":
+                ms = self._random.expovariate(1 / spec["mean_ms"])
+            else:
+                raise ValueError(f"Unknown latency distribution: {dist}")
+        return max(ms, 0) / 1000
+
+    def chance(self, rate):
+        with self._lock:
+            return self._random.random() < rate
+
+class SiteFarm:
+    """
+    The farm's state: its virtual hosts, the routed rules and the traffic model.
+    Handlers only read it, apart from the per-host request counters.
+    """
+    def __init__(self, config, hosts=8, seed=1):
+        self.config = config
+        self.overrides = config.get("sites", {})  # site name -> partial profile
+        self.seed = seed
+        self.host_count = hosts
+        self.servers = []
+        self.routes = {}  # slug -> (site name, rule dict)
+        self.requests = 0
+        self._models = {}
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._engines = {}  # search engine hostname -> farm host index
+
+    # --- TRAFFIC MODEL ---
+
+    def setting(self, site, key):
+        return self.overrides.get(site, {}).get(key, self.config[key])
+
+    def model(self, site):
+        spec = self.setting(site, "latency")
+        key = json.dumps(spec, sort_keys=True)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = LatencyModel(spec, seed=self.seed + len(self._models))
+            return self._models[key]
+
+    def filler(self, size):
+        """size bytes of markup that contains no marker."""
+        with self._lock:
+            page = self._pages.get(size)
+            if page is None:
+                page = self._pages[size] = (FILLER * (size // len(FILLER) + 1))[:size]
+            return page
+
+    def page(self, site, marker=b""):
+        size = int(self.setting(site, "page_kb") * 1024)
+        split = int(size * self.setting(site, "marker_at"))
+        return self.filler(split) + marker + self.filler(max(size - split, 0))
+
+    # --- SERVING ---
+
+    def start(self):
+        handler = type("FarmHandler", (FarmHandler,), {"farm": self})
+        for index in range(self.host_count):
+            address = f"127.0.0.{index + 1}"
+            try:
+                server = FarmServer((address, 0), handler)
+            except OSError:
+                # Only 127.0.0.1 is routable here (e.g. macOS): every host shares one address
+                print(f"[!] Cannot bind {address}; per-host limits will treat the farm as one host.", file=sys.stderr)
+                break
+            self.servers.append(server)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        if not self.servers:
+            raise OSError("Could not bind any loopback address")
+
+    def base_url(self, index):
+        host, port = self.servers[index % len(self.servers)].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    # --- RULE REWRITING ---
+
+    def rewrite_rules(self, rules, count=None, keep_live=False):
+        """
+        Points every rule at the farm. With count, rules are cloned round-robin
+        ("GitHub 2", "GitHub 3", ...) until there are count sites; clones never pivot.
+        """
+        count = count or len(rules)
+        rewritten = []
+        for index in range(count):
+            rule = json.loads(json.dumps(rules[index % len(rules)]))
+            copy = index // len(rules)
+            if copy:
+                rule["name"] = f"{rule['name']} {copy + 1}"
+                rule.pop("pivot", None)
+            self._rewrite(rule, rule["name"], self.base_url(index), keep_live)
+            rewritten.append(rule)
+        return rewritten
+
+    def search_url(self, original):
+        """Farm URL for a search engine template; every engine host gets its own farm host, from the last one down."""
+        parts = urlparse(original or "https://html.duckduckgo.com/html/?q={}")
+        with self._lock:
+            index = self._engines.setdefault(parts.hostname, self.host_count - 1 - len(self._engines))
+        return f"{self.base_url(index)}{parts.path}?{parts.query}"
+
+    def _rewrite(self, rule, site, base_url, keep_live):
+        if not keep_live:
+            for key in LIVE_ONLY_KEYS:
+                rule.pop(key, None)
+        if rule.get("check_type") == "search":
+            rule["search_url"] = self.search_url(rule.get("search_url"))
+        if "url" in rule:
+            slug, copy = slugify(site), 1
+            while slug in self.routes:
+                copy += 1
+                slug = f"{slugify(site)}-{copy}"
+            parts = urlparse(rule["url"])
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            rule["url"] = f"{base_url}/site/{slug}{path}"
+            self.routes[slug] = (site, rule)
+        for nested in rule.get("strategies", []) + [rule.get("fallback")]:
+            if isinstance(nested, dict):
+                self._rewrite(nested, site, base_url, keep_live)
+
+class FarmServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on status-only probes without reading the body; that is not a farm error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class FarmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real sites
+    farm = None
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        farm = self.farm
+        with farm._lock:
+            farm.requests += 1
+        url = urlparse(self.path)
+        if url.path.startswith("/site/"):
+            slug = url.path.split("/")[2]
+            site, rule = farm.routes.get(slug, (None, None))
+            if rule is None:
+                return self.send(404)
+        elif url.path.startswith(("/html", "/lite")):
+            site, rule = "Search", None
+        elif url.path.startswith("/users/"):
+            site, rule = "GitHub API", None
+        else:
+            return self.send(404)
+
+        time.sleep(farm.model(site).sample())
+        if farm.model(site).chance(farm.setting(site, "drop_rate")):
+            self.close_connection = True
+            return
+        if farm.model(site).chance(farm.setting(site, "error_rate")):
+            return self.send(503, b"Service Unavailable")
+
+        if rule is not None:
+            self.serve_site(site, rule, url)
+        elif site == "Search":
+            css_class = "result-link" if url.path.startswith("/lite") else "result__a"
+            self.serve_search(parse_qs(url.query).get("q", [""])[0], css_class)
+        else:
+            self.serve_github(url)
+
+    # --- ROLES ---
+
+    def serve_site(self, site, rule, url):
+        template = urlparse(rule["url"]).path
+        prefix, _, suffix = template.partition("{}")
+        path = url.path
+        if not path.startswith(prefix) or not path.endswith(suffix):
+            return self.send(404)
+        username = unquote(path[len(prefix):len(path) - len(suffix)])
+        hit = exists(site, username, self.farm.setting(site, "hit_rate"))
+        check = rule.get("check_type", "status_code")
+
+        if check == "markers":
+            present = [m.replace("{}", username) for m in rule.get("present_markers", ())]
+            absent = rule.get("absent_markers", ())
+            if hit:
+                marker = present[0] if present else ""
+            else:
+                marker = absent[0] if absent else ""
+                if not absent:
+                    return self.send(404, self.farm.page(site))
+            return self.send(200, self.farm.page(site, marker.encode()))
+        if check == "regex":
+            return self.send(200, self.farm.page(site, f"<title>{username}</title>".encode() if hit else b""))
+
+        if hit:
+            return self.send(200, self.farm.page(site))
+        if rule.get("miss_redirects"):
+            return self.send(302, headers={"Location": f"/{rule['miss_redirects'][0].strip('/')}"})
+        return self.send(404, self.farm.page(site))
+
+    def serve_search(self, query, css_class):
+        """DuckDuckGo results: up to five redirect-wrapped result links, hits for site:domain/user terms first."""
+        links = []
+        for term in re.findall(r"site:(\S+)", query):
+            domain, _, username = term.rpartition("/")
+            if username and exists(domain, username, self.farm.setting("Search", "hit_rate")):
+                links.append(f"https://{term}")
+        links += [f"https://example.org/result/{n}" for n in range(5 - len(links))]
+        results = "".join(
+            f'<div class="result"><a class="{css_class}" href="//duckduckgo.com/l/?uddg={quote(link, safe="")}&amp;rut=0">{link}</a></div>\n'
+            for link in links[:5])
+        self.send(200, results.encode() + self.farm.page("Search"))
+
+    def serve_github(self, url):
+        """users/<name> and users/<name>/events/public with Link paging; the email is on the profile or page 2."""
+        parts = url.path.strip("/").split("/")
+        username = unquote(parts[1]) if len(parts) > 1 else ""
+        headers = {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999",
+                   "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+        if not exists("GitHub", username, self.farm.setting("GitHub API", "hit_rate")):
+            return self.send(404, b'{"message": "Not Found"}', "application/json", headers)
+        on_profile = zlib.crc32(username.encode()) % 2 == 0
+        email = f"{username}@bench.example"
+
+        if len(parts) == 2:
+            body = {"login": username, "email": email if on_profile else None}
+            return self.send(200, json.dumps(body).encode(), "application/json", headers)
+
+        query = parse_qs(url.query)
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        if page == 1:
+            events = [{"type": "WatchEvent", "payload": {}}] * per_page
+            headers["Link"] = f'<{self.farm.base_url(self.farm.host_count - 1)}{url.path}?per_page={per_page}&page=2>; rel="next"'
+        else:
+            events = [{"type": "PushEvent", "payload": {"commits": [{"author": {"email": email}}]}}]
+        self.send(200, json.dumps(events).encode(), "application/json", headers)
+
+def load_config(profile, overrides=None):
+    config = json.loads(json.dumps(PROFILES[profile]))
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            config[key] = value
+    return config
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock site farm for offline benchmarks")
+    parser.add_argument("--rules", default="data/sites.json", help="Rule file to mirror (default: data/sites.json)")
+    parser.add_argument("--out", required=True, help="Where the rewritten rule file goes")
+    parser.add_argument("--profile", default="realistic", choices=sorted(PROFILES))
+    parser.add_argument("--config", metavar="FILE", help="JSON file merged over the profile (may hold per-site 'sites' overrides)")
+    parser.add_argument("--sites", type=int, default=None, help="Clone rules until there are N sites")
+    parser.add_argument("--hosts", type=int, default=8, help="Loopback addresses to spread sites over (default: 8)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep the live rate_limit/cache_ttl keys")
+    args = parser.parse_args()
+
+    overrides = None
+    if args.config:
+        with open(args.config, "r") as f:
+            overrides = json.load(f)
+    farm = SiteFarm(load_config(args.profile, overrides), hosts=args.hosts, seed=args.seed)
+    farm.start()
+    with open(args.rules, "r") as f:
+        rules = farm.rewrite_rules(json.load(f), count=args.sites, keep_live=args.keep_rate_limits)
+    with open(args.out, "w") as f:
+        json.dump(rules, f, indent=2)
+
+    print(json.dumps({"sites_file": args.out, "sites": len(rules), "hosts": len(farm.servers),
+                      "github": farm.base_url(farm.host_count - 1)}), flush=True)
+    try:
+        sys.stdin.read()  # The parent closes our stdin when it is done
+    except KeyboardInterrupt:
+        pass
+    farm.stop()
+    print(json.dumps({"requests": farm.requests}), flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Offline scan benchmark against the local site farm (bench/farm.py).
+
+Phases, all over N sites x M usernames:
+  - scan:   scan_target for one username after another (interactive mode)
+  - batch:  BatchRunner over every username at once (batch mode)
+  - report: Reporter.generate_html and IdentityGraph.visualize for the largest graph
+
+Reports targets/sec and p50/p99 per-target latency for scan and batch, peak RSS and
+report/visualize time. Results can be saved as a baseline and later runs are compared
+against it (exit code 1 when a metric regresses past the tolerance).
+
+Usage: python bench/scan_bench.py [--profile realistic] [--sites 40] [--users 20]
+                                  [--save-baseline] [--baseline bench/baseline.json]
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.models.graph import IdentityGraph
+from src.models.node import PersonNode
+
+DEFAULT_BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+
+# metric -> True when higher is better
+METRICS = {
+    "scan_targets_per_sec": True,
+    "scan_p50_ms": False,
+    "scan_p99_ms": False,
+    "batch_targets_per_sec": True,
+    "batch_p50_ms": False,
+    "batch_p99_ms": False,
+    "report_ms": False,
+    "visualize_ms": False,
+    "peak_rss_mb": False,
+}
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class Farm:
+    """bench/farm.py in a child process, so serving never competes with the scanner for the GIL."""
+    def __init__(self, args, sites_file):
+        command = [sys.executable, os.path.join(ROOT, "bench", "farm.py"), "--out", sites_file,
+                   "--profile", args.profile, "--hosts", str(args.hosts), "--seed", str(args.seed)]
+        if args.sites: command += ["--sites", str(args.sites)]
+        if args.farm_config: command += ["--config", args.farm_config]
+        self.process = subprocess.Popen(command, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Site farm failed to start")
+        self.info = json.loads(line)
+
+    def close(self):
+        """Stops the farm and returns how many requests it served."""
+        self.process.stdin.close()
+        line = self.process.stdout.readline()
+        self.process.wait(timeout=10)
+        return json.loads(line)["requests"] if line else None
+
+def build_scanner(args, sites_file, github_url):
+    from src.core.github import GitHubPivot
+    from src.core.scanner import Scanner
+    from src.utils.http_client import HttpClient
+
+    # The politeness limiter would pace the farm like a live site and measure nothing else
+    http = None if args.polite else HttpClient(pool_maxsize=args.per_host)
+    scanner = Scanner(sites_file=sites_file, max_workers=args.workers, per_host=args.per_host, verbose=False, http=http)
+    scanner.github = GitHubPivot(scanner.http, base_url=github_url, token="bench")
+    return scanner
+
+def run_scan(args, sites_file, github_url, usernames):
+    """Interactive mode: one target after another. Returns (metrics, largest graph)."""
+    scanner = build_scanner(args, sites_file, github_url)
+    latencies, largest = [], None
+    started = time.perf_counter()
+    for username in usernames:
+        graph = IdentityGraph()
+        root = PersonNode(username, source="Benchmark")
+        graph.set_root(root)
+        t = time.perf_counter()
+        scanner.scan_target(username, graph, root)
+        latencies.append((time.perf_counter() - t) * 1000)
+        if largest is None or len(graph.nodes) > len(largest.nodes):
+            largest = graph
+    elapsed = time.perf_counter() - started
+    scanner.http.close()
+    return {
+        "scan_targets_per_sec": round(len(usernames) / elapsed, 2),
+        "scan_p50_ms": round(percentile(latencies, 50), 1),
+        "scan_p99_ms": round(percentile(latencies, 99), 1),
+    }, largest
+
+def run_batch(args, sites_file, github_url, usernames):
+    from src.core.batch import BatchRunner
+
+    scanner = build_scanner(args, sites_file, github_url)
+    out = io.StringIO()
+    started = time.perf_counter()
+    BatchRunner(scanner, concurrency=args.concurrency, out=out).run(usernames)
+    elapsed = time.perf_counter() - started
+    scanner.http.close()
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    latencies = [r["elapsed"] * 1000 for r in records if "elapsed" in r]
+    return {
+        "batch_targets_per_sec": round(len(usernames) / elapsed, 2),
+        "batch_p50_ms": round(percentile(latencies, 50), 1),
+        "batch_p99_ms": round(percentile(latencies, 99), 1),
+        "batch_errors": sum(1 for r in records if "error" in r),
+    }
+
+def run_report(args, graph):
+    """Times the HTML report and the PNG for one graph (in a scratch directory)."""
+    from src.core.reporter import Reporter
+
+    results = {"report_ms": None, "visualize_ms": None, "report_nodes": len(graph.nodes)}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        stdout, sys.stdout = sys.stdout, io.StringIO()  # Both print their output path
+        try:
+            t = time.perf_counter()
+            Reporter(graph.root.id, graph).generate_html()
+            results["report_ms"] = round((time.perf_counter() - t) * 1000, 1)
+            try:
+                t = time.perf_counter()
+                graph.visualize(filename=f"scan_{graph.root.id}.png")
+                results["visualize_ms"] = round((time.perf_counter() - t) * 1000, 1)
+            except ImportError as e:
+                print(f"[!] visualize skipped: {e}", file=sys.stderr)
+        finally:
+            sys.stdout = stdout
+            os.chdir(cwd)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Prints each metric against the baseline. Returns the regressed metric names."""
+    regressions = []
+    print(f"\n{'METRIC':<24}{'BASELINE':>12}{'NOW':>12}{'CHANGE':>10}")
+    for name, higher_is_better in METRICS.items():
+        old, new = baseline["results"].get(name), results.get(name)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  [-] regression"
+            regressions.append(name)
+        elif worse < -tolerance:
+            flag = "  [+] improvement"
+        print(f"{name:<24}{old:>12}{new:>12}{change:>+9.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scan benchmark against a local site farm")
+    parser.add_argument("--profile", default="realistic", help="Farm traffic profile (see bench/farm.py PROFILES)")
+    parser.add_argument("--farm-config", metavar="FILE", help="JSON merged over the farm profile")
+    parser.add_argument("--sites", type=int, default=None, help="Sites per target (default: every sites.json rule)")
+    parser.add_argument("--users", type=int, default=20, help="Usernames to scan (default: 20)")
+    parser.add_argument("--hosts", type=int, default=8, help="Loopback hosts the sites are spread over (default: 8)")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8, help="Targets in flight in the batch phase")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--polite", action="store_true",
+                        help="Keep the per-host rate limiter (measures pacing instead of the scanner)")
+    parser.add_argument("--skip", action="append", default=[], choices=("scan", "batch", "report"),
+                        help="Skip a phase (repeatable)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file (default: bench/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=15.0, help="Allowed regression in percent (default: 15)")
+    parser.add_argument("--json", metavar="FILE", help="Also write this run's results to FILE")
+    args = parser.parse_args()
+
+    usernames = [f"bench_user{n:04d}" for n in range(args.users)]
+    config = {key: getattr(args, key) for key in
+              ("profile", "farm_config", "sites", "users", "hosts", "workers", "per_host", "concurrency", "seed",
+               "polite")}
+    results = {}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        farm = Farm(args, os.path.join(scratch, "sites.json"))
+        try:
+            sites_file, github_url = farm.info["sites_file"], farm.info["github"]
+            print(f"[*] Farm up: {farm.info['sites']} sites on {farm.info['hosts']} hosts, "
+                  f"profile '{args.profile}', {len(usernames)} usernames")
+            largest = None
+            if "scan" not in args.skip:
+                scan, largest = run_scan(args, sites_file, github_url, usernames)
+                results.update(scan)
+                print(f"[+] scan:  {scan['scan_targets_per_sec']} targets/s, "
+                      f"p50 {scan['scan_p50_ms']} ms, p99 {scan['scan_p99_ms']} ms")
+            if "batch" not in args.skip:
+                batch = run_batch(args, sites_file, github_url, usernames)
+                results.update(batch)
+                print(f"[+] batch: {batch['batch_targets_per_sec']} targets/s, "
+                      f"p50 {batch['batch_p50_ms']} ms, p99 {batch['batch_p99_ms']} ms, {batch['batch_errors']} errors")
+        finally:
+            results["farm_requests"] = farm.close()
+
+    if "report" not in args.skip and largest is not None:
+        report = run_report(args, largest)
+        results.update(report)
+        print(f"[+] report: {report['report_ms']} ms, visualize: {report['visualize_ms']} ms "
+              f"({report['report_nodes']} nodes)")
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"[+] peak RSS: {results['peak_rss_mb']} MB, farm served {results['farm_requests']} requests")
+
+    run = {"config": config, "results": results, "python": sys.version.split()[0], "timestamp": time.time()}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(run, f, indent=2)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"[!] Baseline was recorded with a different configuration: {baseline.get('config')}")
+        regressions = compare(results, baseline, args.tolerance)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"[+] Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"[-] {len(regressions)} metric(s) regressed more than {args.tolerance:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
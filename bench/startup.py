@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for the CLI.
+
+Imports `main` in fresh interpreters and fails (exit code 1) when either:
+  - the median import time goes over the budget, or
+  - a heavy library (plotting, parsing, HTTP, numerics) gets loaded at import time.
+
+Usage: python bench/startup.py [--budget-ms 150] [--runs 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported once they are actually used
+HEAVY_MODULES = ["networkx", "matplotlib", "numpy", "requests", "urllib3", "bs4", "msgpack"]
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t
+print(json.dumps({"ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+def measure(runs):
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded.update(result["loaded"])
+    return samples, sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if CLI startup regresses")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Allowed median import time of main.py")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    samples, loaded = measure(args.runs)
+    median = statistics.median(samples)
+    print(f"[*] import main: median {median:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"[-] Heavy modules loaded at startup: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"[-] Startup is over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("[+] Startup within budget.")
+
+if __name__ == "__main__":
+    main()
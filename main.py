@@ -1,11 +1,252 @@
 #!/usr/bin/env python3
+import argparse
 import sys
 from src.models.node import PersonNode
 from src.models.graph import IdentityGraph
 from src.core.scanner import Scanner
-from src.core.reporter import Reporter
+
+# Functions listed by --profile (sorted by cumulative time)
+PROFILE_TOP = 20
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Digital Footprint Mapper - OpSec Analysis Tool")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Scan every username in FILE (one per line, '-' for stdin) and stream JSON Lines")
+    parser.add_argument("--queue", metavar="FILE",
+                        help="Run the batch from a resumable work queue in FILE (SQLite); --batch targets are added "
+                             "to it. Without --batch, join the queue as another worker")
+    parser.add_argument("--lease", type=int, default=120, metavar="SECONDS",
+                        help="How long a crashed worker's targets stay reserved before others take them (default: 120)")
+    parser.add_argument("--queue-results", action="store_true",
+                        help="Write every finished record in --queue FILE as JSON Lines to --output and exit")
+    parser.add_argument("--rank", metavar="FILE",
+                        help="Rank the targets of a batch output FILE ('-' for stdin) by risk score and exit")
+    parser.add_argument("--weights", metavar="FILE",
+                        help="JSON {feature: points} table overriding the default risk weights")
+    parser.add_argument("--top", type=int, default=None,
+                        help="Only show the N riskiest targets with --rank")
+    parser.add_argument("--output", metavar="FILE", default="-",
+                        help="Where batch results go (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Targets scanned at the same time in batch mode (default: 8)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Global cap on in-flight probes (default: 32, or 8 per concurrent target in batch mode)")
+    parser.add_argument("--per-host", type=int, default=4,
+                        help="Cap on in-flight probes per host (default: 4)")
+    parser.add_argument("--cache", metavar="FILE", default=".cache/http_cache.sqlite",
+                        help="On-disk HTTP response cache (default: .cache/http_cache.sqlite)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always fetch from the network and keep nothing between runs")
+    parser.add_argument("--store", metavar="FILE", default=".cache/identity.sqlite",
+                        help="Identity store every finding is saved to (default: .cache/identity.sqlite)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Do not persist findings")
+    parser.add_argument("--github-token", metavar="TOKEN", default=None,
+                        help="GitHub API token for the email pivot (default: $GITHUB_TOKEN; 5000 calls/hour instead of 60)")
+    parser.add_argument("--github-wait", type=int, default=0, metavar="SECONDS",
+                        help="Wait up to SECONDS for the GitHub quota to reset instead of skipping the pivot (default: 0)")
+    parser.add_argument("--rescan", action="store_true",
+                        help="Incremental mode: only re-probe sites whose last stored result is stale, print the delta")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Recursive mode: keep pivoting on found emails, usernames and profile URLs")
+    parser.add_argument("--depth", type=int, default=2,
+                        help="How many pivots away from the target --crawl may go (default: 2)")
+    parser.add_argument("--budget", type=int, default=200,
+                        help="Probes --crawl may spend per target (default: 200)")
+    parser.add_argument("--export", metavar="FILE",
+                        help="Stream the identity graph to FILE while scanning (.jsonl, .graphml, .gexf, .msgpack)")
+    parser.add_argument("--export-dir", metavar="DIR",
+                        help="Batch mode: stream each target's graph to DIR/<target>.<format>")
+    parser.add_argument("--export-format", default="jsonl", choices=("jsonl", "graphml", "gexf", "msgpack"),
+                        help="File format for --export-dir (default: jsonl)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Write per-site probe timings, statuses, errors and latency histograms to FILE (JSON)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Run under cProfile, save the stats to FILE and print the top functions to stderr")
+    return parser.parse_args()
+
+def open_cache(args):
+    if args.no_cache:
+        return None
+    from src.utils.cache import ResponseCache
+    return ResponseCache(args.cache)
+
+def open_store(args):
+    if args.no_store:
+        return None
+    from src.models.store import IdentityStore
+    return IdentityStore(args.store)
+
+def build_scanner(args, max_workers, verbose=True):
+    from src.core.github import GitHubPivot
+
+    scanner = Scanner(max_workers=max_workers, per_host=args.per_host, verbose=verbose,
+                      cache=open_cache(args), store=open_store(args))
+    scanner.github = GitHubPivot(scanner.http, token=args.github_token, max_wait=args.github_wait)
+    return scanner
+
+def write_metrics(args, scanner):
+    if args.metrics:
+        scanner.metrics.write_json(args.metrics, hosts=scanner.health.snapshot())
+        print(f"[+] Scan metrics written to: {args.metrics}", file=sys.stderr)
+
+def open_rescanner(args, scanner):
+    if not args.rescan:
+        return None
+    if scanner.store is None:
+        print("[-] Error: --rescan needs the identity store (drop --no-store).", file=sys.stderr)
+        sys.exit(1)
+    from src.core.incremental import IncrementalScanner
+    return IncrementalScanner(scanner, scanner.store)
+
+def open_crawler(args, scanner, workers):
+    if not args.crawl:
+        return None
+    if args.rescan:
+        print("[-] Error: --crawl and --rescan cannot be combined.", file=sys.stderr)
+        sys.exit(1)
+    from src.core.crawler import PivotCrawler
+    return PivotCrawler(scanner, max_depth=args.depth, budget=args.budget, workers=workers)
+
+def run_batch(args):
+    from src.core.batch import BatchRunner, read_usernames
+
+    workers = args.workers or max(32, args.concurrency * 8)
+    scanner = build_scanner(args, workers, verbose=False)
+    rescanner = open_rescanner(args, scanner)
+    crawler = open_crawler(args, scanner, workers=2)
+
+    if args.queue:
+        run_queue(args, scanner, rescanner, crawler)
+        return
+
+    source = sys.stdin if args.batch == "-" else open(args.batch, "r")
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        runner = BatchRunner(scanner, concurrency=args.concurrency, out=out,
+                             export_dir=args.export_dir, export_format=args.export_format, rescanner=rescanner,
+                             crawler=crawler)
+        count = runner.run(read_usernames(source))
+        print(f"[+] Batch complete: {count} targets scanned.", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\n[*] User aborted.", file=sys.stderr)
+    finally:
+        if source is not sys.stdin: source.close()
+        if out is not sys.stdout: out.close()
+        write_metrics(args, scanner)
+
+def run_queue(args, scanner, rescanner, crawler):
+    from src.core.batch import BatchRunner, read_usernames
+    from src.core.workqueue import WorkQueue, default_worker_id
+
+    queue = WorkQueue(args.queue, lease=args.lease)
+    worker = default_worker_id()
+    # Appending keeps the lines of earlier, interrupted runs
+    out = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        if args.batch:
+            source = sys.stdin if args.batch == "-" else open(args.batch, "r")
+            try:
+                added = queue.add(read_usernames(source))
+            finally:
+                if source is not sys.stdin: source.close()
+            print(f"[*] Queued {added} new targets in {args.queue}.", file=sys.stderr)
+        runner = BatchRunner(scanner, concurrency=args.concurrency, out=out,
+                             export_dir=args.export_dir, export_format=args.export_format, rescanner=rescanner,
+                             crawler=crawler, queue=queue, worker=worker)
+        count = runner.run_queue()
+        print(f"[+] Queue drained: {count} targets scanned by this worker.", file=sys.stderr)
+    except KeyboardInterrupt:
+        # Hand our targets back right away instead of making other workers wait out the lease
+        released = queue.release(worker)
+        print(f"\n[*] User aborted, {released} targets returned to the queue.", file=sys.stderr)
+    finally:
+        counts = queue.counts()
+        print("[*] Queue: " + ", ".join(f"{counts.get(state, 0)} {state}"
+                                        for state in ("done", "failed", "leased", "pending")), file=sys.stderr)
+        queue.close()
+        if out is not sys.stdout: out.close()
+        write_metrics(args, scanner)
+
+def dump_queue(args):
+    import json
+    from src.core.workqueue import WorkQueue
+
+    queue = WorkQueue(args.queue)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for record in queue.records():
+            out.write(json.dumps(record) + "\n")
+    finally:
+        queue.close()
+        if out is not sys.stdout: out.close()
+
+def run_rank(args):
+    import json
+    from src.core.analyzer import RiskAnalyzer
+
+    analyzer = RiskAnalyzer.from_weights_file(args.weights) if args.weights else RiskAnalyzer()
+    source = sys.stdin if args.rank == "-" else open(args.rank, "r")
+    try:
+        records = (json.loads(line) for line in source if line.strip())
+        ranked = analyzer.rank_records(records, top=args.top)
+    finally:
+        if source is not sys.stdin: source.close()
+
+    print(f"{'#':>5}  {'SCORE':>5}  {'LEVEL':<9} TARGET")
+    for position, assessment in enumerate(ranked, 1):
+        factors = "; ".join(assessment.factors)
+        print(f"{position:>5}  {assessment.score:>5.1f}  {assessment.level:<9} {assessment.target}  {factors}")
+
+def run_profiled(args):
+    import cProfile
+    import pstats
+    import threading
+
+    # cProfile only sees the thread it runs on; probes run on worker threads, so each new
+    # thread gets its own profiler and everything is merged at the end
+    thread_profilers = []
+
+    def profile_thread(*_):
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        thread_profilers.append(profiler)
+        profiler.enable()
+
+    profiler = cProfile.Profile()
+    threading.setprofile(profile_thread)
+    try:
+        profiler.runcall(run, args)
+    finally:
+        threading.setprofile(None)
+        for worker in thread_profilers:
+            worker.disable()
+        stats = pstats.Stats(profiler, *thread_profilers, stream=sys.stderr)
+        stats.dump_stats(args.profile)
+        print(f"\n[*] Profile saved to {args.profile} (top {PROFILE_TOP} by cumulative time):", file=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
 
 def main():
+    args = parse_args()
+    if args.profile:
+        run_profiled(args)
+    else:
+        run(args)
+
+def run(args):
+    if args.rank:
+        run_rank(args)
+        return
+    if args.queue_results:
+        if not args.queue:
+            print("[-] Error: --queue-results needs --queue FILE.", file=sys.stderr)
+            sys.exit(1)
+        dump_queue(args)
+        return
+    if args.batch or args.queue:
+        run_batch(args)
+        return
+
     print("========================================")
     print("   DIGITAL FOOTPRINT MAPPER (v1.0)      ")
     print("   OpSec Analysis Tool                  ")
@@ -29,10 +270,32 @@ def main():
     graph.set_root(me)
 
     # 4. Initialize the Engine
-    scanner = Scanner()
+    scanner = build_scanner(args, args.workers or 32)
+    rescanner = open_rescanner(args, scanner)
+    crawler = open_crawler(args, scanner, workers=4)
     
     # 5. Run the Scan (The Algorithm)
-    scanner.scan_target(target_username, graph, me)
+    exporter = None
+    if args.export:
+        from src.utils.export import open_writer
+        exporter = open_writer(args.export)
+        graph.add_listener(exporter)
+    try:
+        if rescanner:
+            delta = rescanner.rescan(target_username, graph, me)
+            print("")
+            for line in delta.summary():
+                print(line)
+        elif crawler:
+            spent = crawler.crawl(target_username, graph, me)
+            print(f"\n[*] Crawl finished: {len(graph.nodes) - 1} findings for {spent} probes.")
+        else:
+            scanner.scan_target(target_username, graph, me)
+    finally:
+        if exporter:
+            exporter.close()
+            print(f"[+] Graph exported to: {args.export}")
+        write_metrics(args, scanner)
 
     # 6. Visualize the Results
     print("\n" + "="*40)
@@ -55,7 +318,8 @@ def main():
         # C. Generate the HTML Report
         print("\n[*] Generating Intelligence Report...")
         try:
-            reporter = Reporter(target_username, graph)
+            from src.core.reporter import Reporter
+            reporter = Reporter(target_username, graph, metrics=scanner.metrics)
             reporter.generate_html()
         except Exception as e:
             print(f"[!] Error generating report: {e}")
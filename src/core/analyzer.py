@@ -0,0 +1,180 @@
+import json
+from collections import deque
+from src.core.rules import RuleTable
+
+# --- FEATURES ---
+# One row per target. Category columns count accounts per sites.json category.
+CATEGORIES = ("Code", "Social", "Blog", "Infrastructure", "Other")
+FEATURES = ("accounts", "has_accounts", "many_accounts", "emails", "has_email", "extra_emails",
+            "pivot_depth", "deep_pivots", "platform_weight") + CATEGORIES
+
+# More accounts than this counts as a highly visible footprint
+MANY_ACCOUNTS = 5
+
+# Account -> Email is two hops from the target; anything deeper came from recursive pivots
+NORMAL_DEPTH = 2
+
+# Points per unit of each feature. The step features keep the classic badge:
+# 10 for any account, +20 past MANY_ACCOUNTS, +40 once an email is exposed.
+# Extra emails and recursive pivots only add to it; the sites.json platform weights
+# are off by default (points per account would move targets across the badge
+# thresholds) and are switched on with a weight table, e.g. {"platform_weight": 1}.
+DEFAULT_WEIGHTS = {
+    "has_accounts": 10,
+    "many_accounts": 20,
+    "has_email": 40,
+    "extra_emails": 5,
+    "deep_pivots": 5,
+    "platform_weight": 0,
+}
+
+# (level, score above which it applies, badge color)
+RISK_LEVELS = (("LOW", None, "#10b981"), ("MODERATE", 30, "#f59e0b"), ("CRITICAL", 60, "#ef4444"))
+
+MAX_SCORE = 100
+
+class RiskAssessment:
+    def __init__(self, target, score, level, color, factors):
+        self.target = target
+        self.score = score
+        self.level = level
+        self.color = color
+        self.factors = factors
+
+    def to_dict(self):
+        return {"target": self.target, "score": self.score, "level": self.level, "factors": self.factors}
+
+class RiskAnalyzer:
+    """
+    Turns identity graphs into feature vectors and scores them with one matrix
+    product, so a watchlist of thousands of targets is ranked in a single pass.
+    Weights are a {feature: points} table; platform weights come from the
+    optional "risk_weight" key of each site in sites.json (default 1) and only
+    count when the table gives "platform_weight" points.
+    """
+    def __init__(self, sites_file="data/sites.json", weights=None, rules=None):
+        rules = rules if rules is not None else RuleTable.load(sites_file)
+        self.categories = {rule.name: rule.category if rule.category in CATEGORIES else "Other" for rule in rules}
+        self.platform_weights = {rule.name: rule.options.get("risk_weight", 1) for rule in rules}
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        unknown = set(self.weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown risk features: {', '.join(sorted(unknown))} (expected some of {', '.join(FEATURES)})")
+
+    @classmethod
+    def from_weights_file(cls, path, sites_file="data/sites.json"):
+        with open(path, "r") as f:
+            return cls(sites_file=sites_file, weights=json.load(f))
+
+    # --- FEATURE EXTRACTION ---
+
+    def _row(self, platforms, email_count, depth):
+        row = dict.fromkeys(FEATURES, 0.0)
+        for platform in platforms:
+            row[self.categories.get(platform, "Other")] += 1
+            row["platform_weight"] += self.platform_weights.get(platform, 1)
+        row["accounts"] = len(platforms)
+        row["has_accounts"] = float(len(platforms) > 0)
+        row["many_accounts"] = float(len(platforms) > MANY_ACCOUNTS)
+        row["emails"] = email_count
+        row["has_email"] = float(email_count > 0)
+        row["extra_emails"] = max(email_count - 1, 0)
+        row["pivot_depth"] = depth
+        row["deep_pivots"] = max(depth - NORMAL_DEPTH, 0)
+        return [row[name] for name in FEATURES]
+
+    def graph_features(self, graph):
+        """Feature vector of one IdentityGraph."""
+        platforms = [node.platform for node in graph.nodes_by_type("Account")]
+        emails = len(graph.nodes_by_type("Email"))
+        depth = 0
+        if graph.root:
+            depth = _max_depth(graph.root.id, lambda node_id: (n.id for n in graph.neighbors(node_id)))
+        return self._row(platforms, emails, depth)
+
+    def record_features(self, record):
+        """Feature vector of one batch output record (see BatchRunner.to_record), no graph needed."""
+        platforms = [n.get("platform") for n in record.get("nodes", ()) if n.get("type") == "AccountNode"]
+        emails = sum(1 for n in record.get("nodes", ()) if n.get("type") == "EmailNode")
+        adjacency = {}
+        for src, dst, _ in record.get("edges", ()):
+            adjacency.setdefault(src, []).append(dst)
+            adjacency.setdefault(dst, []).append(src)
+        depth = _max_depth(record["target"], lambda node_id: adjacency.get(node_id, ()))
+        return self._row(platforms, emails, depth)
+
+    # --- VECTORIZED SCORING ---
+
+    def weight_vector(self):
+        import numpy as np
+        return np.array([self.weights.get(name, 0) for name in FEATURES], dtype=np.float64)
+
+    def score_matrix(self, matrix):
+        """Scores for an (n_targets x n_features) matrix, clipped to 0..MAX_SCORE."""
+        import numpy as np
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(-1, len(FEATURES))
+        return np.clip(matrix @ self.weight_vector(), 0, MAX_SCORE)
+
+    def level_indexes(self, scores):
+        """Index into RISK_LEVELS for every score (strictly above a threshold moves up a level)."""
+        import numpy as np
+        thresholds = np.array([level[1] for level in RISK_LEVELS[1:]], dtype=np.float64)
+        return np.searchsorted(thresholds, scores, side="left")
+
+    def _factors(self, row):
+        values = dict(zip(FEATURES, row))
+        factors = []
+        if values["many_accounts"]:
+            factors.append("High footprint visibility")
+        if values["has_email"]:
+            factors.append("Email address exposed" if values["emails"] == 1 else f"{int(values['emails'])} email addresses exposed")
+        if values["deep_pivots"]:
+            factors.append(f"Reachable through {int(values['pivot_depth'])} pivots")
+        return factors
+
+    def assess(self, graph, target=None):
+        """RiskAssessment of a single graph (what the HTML report shows)."""
+        row = self.graph_features(graph)
+        score = float(self.score_matrix([row])[0])
+        level, _, color = RISK_LEVELS[int(self.level_indexes([score])[0])]
+        target = target or (graph.root.id if graph.root else None)
+        return RiskAssessment(target, round(score, 1), level, color, self._factors(row))
+
+    def rank(self, targets, top=None):
+        """
+        Ranks many targets by exposure, highest first.
+        `targets` yields (name, feature row) pairs, e.g. from rank_records(); only the rows are kept.
+        """
+        import numpy as np
+        names, rows = [], []
+        for name, row in targets:
+            names.append(name)
+            rows.append(row)
+        if not rows:
+            return []
+        matrix = np.array(rows, dtype=np.float64)
+        scores = self.score_matrix(matrix)
+        levels = self.level_indexes(scores)
+        order = np.argsort(-scores, kind="stable")
+        if top:
+            order = order[:top]
+        return [RiskAssessment(names[i], round(float(scores[i]), 1), RISK_LEVELS[levels[i]][0],
+                               RISK_LEVELS[levels[i]][2], self._factors(matrix[i])) for i in order]
+
+    def rank_records(self, records, top=None):
+        """Ranks batch output records (dicts); error records are skipped."""
+        return self.rank(((r["target"], self.record_features(r)) for r in records if "error" not in r), top=top)
+
+def _max_depth(start, neighbors):
+    """Longest shortest-path distance from start (BFS)."""
+    depths = {start: 0}
+    queue = deque([start])
+    deepest = 0
+    while queue:
+        current = queue.popleft()
+        for neighbor in neighbors(current):
+            if neighbor not in depths:
+                depths[neighbor] = depths[current] + 1
+                deepest = max(deepest, depths[neighbor])
+                queue.append(neighbor)
+    return deepest
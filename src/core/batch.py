@@ -0,0 +1,245 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.core.scanner import PROBE_FOUND, PROBE_MISSING
+from src.models.node import PersonNode
+from src.models.graph import IdentityGraph
+
+# Scanned targets whose GitHub pivots are handed to the quota-aware scheduler together
+PIVOT_WINDOW = 32
+
+def read_usernames(stream):
+    """Yields one username per line, skipping blanks and # comments."""
+    for line in stream:
+        username = line.strip()
+        if username and not username.startswith("#"):
+            yield username
+
+class BatchRunner:
+    """
+    Scans many targets in one process.
+    Up to `concurrency` targets are in flight at once, all sharing the Scanner's
+    probe engine and connection pools. Each finished target is written out as
+    one JSON line and its graph is dropped, so memory stays bounded.
+    With export_dir, every graph is also streamed to its own export file as it grows.
+    With a rescanner (IncrementalScanner), only stale sites are probed and each record carries a "delta".
+    With a crawler (PivotCrawler), every target is mapped recursively within the crawler's budget.
+    With a queue (WorkQueue), run_queue() pulls leased targets from it instead and keeps their leases
+    renewed while they run. Site outcomes are journaled in every mode; a plain scan left behind by a
+    crashed worker resumes from its unanswered sites (a rescan from the store's fresh results).
+    In plain scans, targets with GitHub hits are parked until pivot_window of them can be pivoted
+    together around the API quota (Scanner.pivot_emails); pivots the quota left out are marked
+    "pivot_deferred" in the record.
+    """
+    def __init__(self, scanner, concurrency=8, out=None, export_dir=None, export_format="jsonl", rescanner=None,
+                 crawler=None, queue=None, worker=None, pivot_window=PIVOT_WINDOW):
+        self.scanner = scanner
+        self.pivot_window = pivot_window
+        self.queue = queue
+        self.worker = worker  # This process' lease holder name in the queue
+        self.rescanner = rescanner
+        self.crawler = crawler
+        self.concurrency = concurrency
+        self.out = out or sys.stdout
+        self.export_dir = export_dir
+        self.export_format = export_format
+        if export_dir:
+            os.makedirs(export_dir, exist_ok=True)
+
+    def scan_one(self, username):
+        """Scans one target. Returns its record, or a ParkedTarget when its GitHub pivots wait for the scheduler."""
+        started = time.time()
+        graph = IdentityGraph()
+        root = PersonNode(username, source="Batch Input")
+        graph.set_root(root)
+        exporter = self._open_exporter(username, graph)
+        extra = {}
+        accounts = []
+        try:
+            if self.rescanner:
+                extra["delta"] = self.rescanner.rescan(username, graph, root, journal=self.queue).to_dict()
+            elif self.crawler:
+                self.crawler.crawl(username, graph, root, journal=self.queue)
+            elif self.queue:
+                rules = self._unanswered_rules(username, graph, root)
+                resumed = len(self.scanner.rules) - len(rules)
+                if resumed:
+                    extra["resumed"] = resumed
+                self.scanner.scan_target(username, graph, root, rules=rules, journal=self.queue, deferred=accounts)
+            else:
+                self.scanner.scan_target(username, graph, root, deferred=accounts)
+        except BaseException:
+            if exporter: exporter.close()
+            raise
+        target = ParkedTarget(username, graph, exporter, accounts, time.time() - started, extra)
+        return target if accounts else self._finish(target)
+
+    def _finish(self, target, pivot_deferred=False):
+        if target.exporter: target.exporter.close()
+        record = self.to_record(target.username, target.graph, target.elapsed)
+        record.update(target.extra)
+        if pivot_deferred:
+            record["pivot_deferred"] = True
+        return record
+
+    def _unanswered_rules(self, username, graph, root):
+        """
+        Rules the queue has no final answer for yet. Hits journaled by an earlier
+        attempt go straight into the graph; pivoting hits are probed again so the
+        pivot (which is not journaled) runs too.
+        """
+        states = self.queue.probe_states(username)
+        rules = []
+        for rule in self.scanner.rules:
+            state, url, _ = states.get(rule.name, (None, None, None))
+            if state == PROBE_MISSING:
+                continue
+            if state == PROBE_FOUND and not rule.pivot:
+                self.scanner._register_hit(graph, root, username, rule.name, url)
+                continue
+            rules.append(rule)
+        return rules
+
+    def _open_exporter(self, username, graph):
+        if not self.export_dir:
+            return None
+        from src.utils.export import open_writer
+
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in username)
+        exporter = open_writer(os.path.join(self.export_dir, f"{safe_name}.{self.export_format}"))
+        graph.add_listener(exporter)
+        return exporter
+
+    def to_record(self, username, graph, elapsed):
+        return {
+            "target": username,
+            "elapsed": round(elapsed, 3),
+            "nodes": [node.to_dict() for node in graph.nodes.values() if node is not graph.root],
+            "edges": [[u.id, v.id, rel] for u, v, rel in graph.edges],
+        }
+
+    def _emit(self, record):
+        self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+
+    def run(self, usernames):
+        """Scans every username from the iterable and streams results. Returns the target count."""
+        count = 0
+        parked = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="target") as pool:
+            in_flight = {}
+            for username in usernames:
+                # Only read ahead as far as the concurrency window allows
+                if len(in_flight) >= self.concurrency:
+                    count += self._drain(in_flight, parked)
+                in_flight[pool.submit(self.scan_one, username)] = username
+            while in_flight:
+                count += self._drain(in_flight, parked)
+        return count + self._pivot(parked, force=True)
+
+    def run_queue(self, poll=5.0):
+        """
+        Works through the queue until no target is left to claim. While other workers
+        still hold leases it keeps polling, so work they abandon is picked up here.
+        Returns the number of targets this worker finished.
+        """
+        in_flight = {}
+        parked = []
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(in_flight, parked, stop), name="lease-heartbeat",
+                                     daemon=True)
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="target") as pool:
+                count = self._work_queue(pool, in_flight, parked, poll)
+        finally:
+            stop.set()
+            heartbeat.join()
+        return count
+
+    def _work_queue(self, pool, in_flight, parked, poll):
+        count = 0
+        while True:
+            while len(in_flight) < self.concurrency:
+                username = self.queue.claim(self.worker)
+                if username is None:
+                    break
+                in_flight[pool.submit(self.scan_one, username)] = username
+            if in_flight:
+                count += self._drain(in_flight, parked)
+                continue
+            # Nothing left to claim right now: pivot what is parked before waiting on other workers
+            count += self._pivot(parked, force=True)
+            expiry = self.queue.next_expiry()
+            if expiry is None:
+                return count
+            time.sleep(min(poll, max(0.1, expiry - self.queue.clock())))
+
+    def _heartbeat(self, in_flight, parked, stop):
+        """Renews the leases of running and parked targets, however long a single probe or pivot takes."""
+        while not stop.wait(self.queue.lease / 3):
+            for username in list(in_flight.values()) + [target.username for target in list(parked)]:
+                self.queue.renew(username, self.worker)
+
+    def _drain(self, in_flight, parked):
+        """Collects finished targets; parked ones are pivoted once a full window is waiting. Returns the count done."""
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        count = 0
+        for future in done:
+            username = in_flight.pop(future)
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {"target": username, "error": f"{type(e).__name__}: {e}"}
+            if isinstance(record, ParkedTarget):
+                parked.append(record)
+                continue
+            count += self._complete(record)
+        return count + self._pivot(parked)
+
+    def _pivot(self, parked, force=False):
+        """
+        Pivots the parked targets through the scheduler once pivot_window of them are waiting
+        (or whatever is parked, with force), then finishes them. Returns the count done.
+        """
+        if not parked or (len(parked) < self.pivot_window and not force):
+            return 0
+        window = parked[:]
+        started = time.time()
+        try:
+            deferred = set(self.scanner.pivot_emails([(target.username, target.graph, account)
+                                                      for target in window for account in target.accounts]))
+        except Exception as e:
+            # Not even the deferred-pivot bookkeeping worked: the scans themselves still count
+            self.scanner._log(f"[?] GitHub pivots failed ({type(e).__name__}), results unknown.")
+            deferred = {target.username for target in window}
+        elapsed = time.time() - started
+        count = 0
+        for target in window:
+            target.elapsed += elapsed
+            count += self._complete(self._finish(target, pivot_deferred=target.username in deferred))
+        # Only now: the heartbeat keeps renewing the leases of what is still listed
+        del parked[:len(window)]
+        return count
+
+    def _complete(self, record):
+        """Stores (queue) and writes out one finished record. Returns 1 if it was written."""
+        failed = "error" in record
+        # Stored before it is written out: a crash in between loses an output line, never the result
+        if self.queue and not self.queue.complete(record["target"], self.worker, record, failed=failed):
+            return 0  # Our lease ran out and another worker took the target over
+        self._emit(record)
+        return 1
+
+class ParkedTarget:
+    """A scanned target whose GitHub pivots wait for the scheduler; its graph (and exporter) stay open until then."""
+    def __init__(self, username, graph, exporter, accounts, elapsed, extra):
+        self.username = username
+        self.graph = graph
+        self.exporter = exporter
+        self.accounts = accounts  # Account nodes the pivots start from
+        self.elapsed = elapsed    # Time spent working on the target (not waiting while parked)
+        self.extra = extra        # Record fields besides the graph (delta, resumed)
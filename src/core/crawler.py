@@ -0,0 +1,179 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, PersonNode
+
+# Lower runs first: an email is the strongest pivot, a bare URL costs nothing to expand
+SEED_PRIORITIES = {"email": 0, "username": 1, "url": 2}
+
+# Local parts that name a mailbox, not a person
+GENERIC_MAILBOXES = {"admin", "contact", "hello", "info", "mail", "me", "noreply", "no-reply", "support", "team"}
+
+class Seed:
+    """One frontier entry: something to expand and the graph node it was found under."""
+    __slots__ = ("kind", "value", "depth", "parent")
+
+    def __init__(self, kind, value, depth, parent):
+        self.kind = kind
+        self.value = value
+        self.depth = depth
+        self.parent = parent
+
+    def __repr__(self):
+        return f"<Seed {self.kind}: {self.value} (depth {self.depth})>"
+
+class PivotCrawler:
+    """
+    Recursive footprint mapping. Starting from one username, every finding becomes
+    a new seed: emails (from the GitHub pivot), usernames (from email local parts
+    and from profile URLs that name a different handle) and the profile URLs a
+    search for an email turns up.
+    Seeds sit in a priority frontier (emails first, then shallower seeds first),
+    are expanded at most once (visited index) and only up to max_depth. The crawl
+    stops scheduling once the per-target probe budget is spent, so runtime stays bounded.
+    """
+    def __init__(self, scanner, max_depth=2, budget=200, workers=4):
+        self.scanner = scanner
+        self.max_depth = max_depth
+        self.budget = budget  # Network probes one target may spend (a username costs one per rule)
+        self.workers = workers
+        # Email searches use the catalogue's search engine (a local stand-in in offline runs)
+        self.search_url, self.result_class = scanner.rules.search_engine()
+
+    def _log(self, message):
+        self.scanner._log(message)
+
+    def seed_key(self, kind, value):
+        """Canonical visited-index key: URLs go through _clean_url, names are case-folded."""
+        if kind == "url":
+            return kind, self.scanner._clean_url(value).rstrip("/").lower()
+        return kind, value.strip().lower()
+
+    def cost(self, seed):
+        if seed.kind == "username":
+            return len(self.scanner.rules) + 1  # Every rule, plus a possible GitHub pivot
+        if seed.kind == "email":
+            return 1  # One search query
+        return 0
+
+    def crawl(self, username, graph, root_node, journal=None):
+        """
+        Maps username and everything reachable from it into graph. Returns the probes spent.
+        journal is handed to every username scan (see Scanner.scan_target).
+        """
+        frontier = []
+        visited = set()
+        counter = 0  # Tie breaker so equal priorities stay FIFO
+
+        def push(kind, value, depth, parent):
+            nonlocal counter
+            key = self.seed_key(kind, value)
+            if key in visited or depth > self.max_depth:
+                return
+            visited.add(key)
+            counter += 1
+            heapq.heappush(frontier, (SEED_PRIORITIES[kind], depth, counter, Seed(kind, value, depth, parent)))
+
+        push("username", username, 0, root_node)
+        spent = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawl") as pool:
+            in_flight = {}
+            while frontier or in_flight:
+                # Fill the worker pool from the front of the frontier while budget remains
+                while frontier and len(in_flight) < self.workers:
+                    seed = heapq.heappop(frontier)[3]
+                    if spent + self.cost(seed) > self.budget:
+                        self._log(f"[*] Crawl budget reached, skipping {seed.kind} {seed.value}")
+                        continue
+                    spent += self.cost(seed)
+                    in_flight[pool.submit(self._expand, seed, root_node, journal)] = seed
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seed = in_flight.pop(future)
+                    try:
+                        local, found = future.result()
+                    except Exception as e:
+                        self._log(f"[?] Crawl of {seed.kind} {seed.value} failed: {type(e).__name__}")
+                        continue
+                    # Only this thread touches the shared graph
+                    new_nodes = self._merge(graph, local, seed.parent) if local else []
+                    for kind, value, node in found:
+                        push(kind, value, seed.depth + 1, node or seed.parent)
+                    for node in new_nodes:
+                        self._seeds_from_node(node, seed, push)
+        return spent
+
+    # --- EXPANSION (worker threads) ---
+
+    def _expand(self, seed, root_node, journal=None):
+        """Returns (private IdentityGraph or None, [(kind, value, parent node or None)])."""
+        if seed.kind == "username":
+            return self._expand_username(seed, root_node, journal), []
+        if seed.kind == "email":
+            return None, self._expand_email(seed)
+        return self._expand_url(seed)
+
+    def _expand_username(self, seed, root_node, journal=None):
+        # Each worker scans into its own graph; the crawl thread merges it afterwards
+        local = IdentityGraph()
+        local_root = root_node if seed.depth == 0 else PersonNode(seed.value, source="Pivot Crawler")
+        local.set_root(local_root)
+        self.scanner.scan_target(seed.value, local, local_root, journal=journal)
+        return local
+
+    def _expand_email(self, seed):
+        found = []
+        local_part = seed.value.split("@")[0]
+        if len(local_part) >= 3 and local_part.lower() not in GENERIC_MAILBOXES:
+            found.append(("username", local_part, None))
+        try:
+            links = self.scanner._search_results(self.search_url, f'"{seed.value}"', css_class=self.result_class)
+        except Exception as e:
+            # Keep the local-part seed even when the search is blocked
+            self._log(f"[?] Search for {seed.value} failed: {type(e).__name__}")
+            links = []
+        for link in links:
+            found.append(("url", link, None))
+        return found
+
+    def _expand_url(self, seed):
+        """Search hits for an email: a link to a known site becomes an account plus a username seed."""
+        url = self.scanner._clean_url(seed.value)
+        rule, username = self.scanner.rules.match_url(url)
+        if rule is None:
+            return None, []
+        local = IdentityGraph()
+        local.set_root(seed.parent)
+        account = AccountNode(username, rule.name, url, source="Pivot Crawler")
+        local.add_edge(seed.parent, account, "links_to")
+        return local, [("username", username, account)]
+
+    # --- MERGING (crawl thread) ---
+
+    def _merge(self, graph, local, parent):
+        """Copies a worker's graph in, hanging its root's edges off `parent`. Returns nodes new to graph."""
+        new_nodes = []
+
+        def resolve(node):
+            if node is local.root:
+                return parent
+            if node.id in graph.nodes:
+                return graph.nodes[node.id]
+            new_nodes.append(node)
+            return node
+
+        for node_a, node_b, relationship in local.edges:
+            graph.add_edge(resolve(node_a), resolve(node_b), relationship)
+        return new_nodes
+
+    def _seeds_from_node(self, node, seed, push):
+        if node.type == "Email":
+            push("email", node.id, seed.depth + 1, node)
+        elif node.type == "Account" and node.url:
+            # A profile found by search may live under a different handle (e.g. linkedin.com/in/joe-doe-12)
+            _, username = self.scanner.rules.match_url(self.scanner._clean_url(node.url))
+            if username:
+                push("username", username, seed.depth + 1, node)
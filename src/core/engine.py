@@ -0,0 +1,42 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class ScanEngine:
+    """
+    Bounded thread pool for network probes.
+    Caps the number of in-flight probes globally (max_workers)
+    and per host (per_host) so one site never gets hammered.
+    """
+    def __init__(self, max_workers=32, per_host=4):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self._host_slots = {}  # host -> BoundedSemaphore
+        self._lock = threading.Lock()
+
+    def host_slot(self, host):
+        """The semaphore bounding in-flight probes to host (also held by work not submitted here)."""
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def submit(self, host, fn, *args, **kwargs):
+        """
+        Schedules fn(*args) on the pool, holding a slot for `host` while it runs.
+        host=None takes no slot (for work that acquires its hosts' slots itself).
+        """
+        if host is None:
+            return self._executor.submit(fn, *args, **kwargs)
+        slot = self.host_slot(host)
+
+        def run():
+            with slot:
+                return fn(*args, **kwargs)
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from src.utils.extract import CHUNK_SIZE, read_capped
+
+GITHUB_API = "https://api.github.com"
+
+# GitHub serves at most 300 public events (3 pages of 100)
+EVENTS_PER_PAGE = 100
+MAX_EVENT_PAGES = 3
+
+# Conditional-request memo used when the HttpClient has no on-disk cache
+ETAG_MEMO_SIZE = 1024
+
+# A page of 100 events is a few hundred KB; anything far bigger is not worth parsing
+MAX_RESPONSE_BYTES = 4 * 1024 * 1024
+
+class RateLimitExhausted(Exception):
+    """The API quota is spent and resets too late to wait for it."""
+    def __init__(self, reset_at):
+        super().__init__(f"GitHub API quota exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}")
+        self.reset_at = reset_at
+
+class GitHubUnavailable(Exception):
+    """The API answered with an error (5xx, a secondary rate limit...): no verdict on the user."""
+
+class RateBudget:
+    """
+    Remaining GitHub API quota, as reported by the X-RateLimit-* headers of the
+    last response. Shared by every thread that talks to the API.
+    """
+    def __init__(self, limit=60, reserve=0):
+        self.limit = limit
+        self.remaining = limit
+        self.reset_at = 0.0
+        self.reserve = reserve  # Calls we never spend (left for other tools on the same token)
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        with self._lock:
+            self.spent += 1
+            if "X-RateLimit-Remaining" not in headers:
+                return
+            try:
+                self.limit = int(headers.get("X-RateLimit-Limit", self.limit))
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                self.reset_at = float(headers.get("X-RateLimit-Reset", self.reset_at))
+            except ValueError:
+                pass
+
+    def refund(self):
+        """Gives back a claimed call that never reached the API (served from cache)."""
+        with self._lock:
+            self.remaining += 1
+
+    def exhausted(self):
+        """Marks the quota as spent (a 403/429 said so even if the counters did not)."""
+        with self._lock:
+            self.remaining = 0
+            if self.reset_at <= time.time():
+                self.reset_at = time.time() + 60
+
+    def take(self, max_wait=0):
+        """
+        Claims one call. When the quota is gone, sleeps until the reset if that is
+        at most max_wait seconds away, otherwise raises RateLimitExhausted.
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                if self.reset_at and now >= self.reset_at:
+                    # Window rolled over: the next response will tell us the real numbers
+                    self.remaining = max(self.remaining, self.limit)
+                    self.reset_at = 0.0
+                if self.remaining > self.reserve:
+                    self.remaining -= 1
+                    return
+                wait = self.reset_at - now
+            if wait > max_wait:
+                raise RateLimitExhausted(self.reset_at)
+            time.sleep(max(wait, 0.1))
+
+class GitHubPivot:
+    """
+    Finds the email behind a GitHub username while spending as few API calls as possible.
+    The profile is tried first (one call); public events are then paged lazily and
+    reading stops at the first commit email that is not a noreply address.
+    Quota comes from the X-RateLimit-* headers, repeated lookups are conditional
+    (a 304 is free) and base_url can point at a local stand-in for testing.
+    """
+    def __init__(self, http, base_url=GITHUB_API, token=None, max_wait=0, reserve=0, timeout=10):
+        self.http = http
+        self.base_url = base_url.rstrip("/")
+        self.host = urlparse(self.base_url).hostname
+        self.token = token if token is not None else os.environ.get("GITHUB_TOKEN")
+        self.max_wait = max_wait
+        self.timeout = timeout
+        # Authenticated clients get 5000 calls/hour, anonymous ones 60
+        self.budget = RateBudget(limit=5000 if self.token else 60, reserve=reserve)
+        self._etags = OrderedDict()  # url -> (etag, payload, next URL); only used without a ResponseCache
+        self._etag_lock = threading.Lock()
+
+    def _headers(self, url):
+        headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if self.http.cache is None:
+            with self._etag_lock:
+                memo = self._etags.get(url)
+            if memo:
+                headers["If-None-Match"] = memo[0]
+        return headers
+
+    def _get_json(self, url):
+        """
+        Returns (status, payload, next page URL or None); status is 200 or 404.
+        Raises RateLimitExhausted, or GitHubUnavailable on any other error status.
+        """
+        self.budget.take(self.max_wait)
+        response = self.http.get(url, headers=self._headers(url), timeout=self.timeout, stream=True,
+                                 max_bytes=MAX_RESPONSE_BYTES)
+        with response:
+            if getattr(response, "from_cache", False):
+                # Served from disk: no call was spent
+                self.budget.refund()
+            else:
+                self.budget.update(response.headers)
+
+            if response.status_code == 304:
+                with self._etag_lock:
+                    memo = self._etags.get(url)
+                    if memo: self._etags.move_to_end(url)
+                if memo is None:
+                    # Evicted while the request was in flight: ask again unconditionally
+                    return self._get_json(url)
+                return 200, memo[1], memo[2]
+            if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+                self.budget.exhausted()
+                return self._get_json(url)
+            if response.status_code == 404:
+                return 404, None, None
+            if response.status_code != 200:
+                raise GitHubUnavailable(f"GitHub API answered HTTP {response.status_code}: {url}")
+
+            body, truncated = read_capped(response.iter_content(CHUNK_SIZE), MAX_RESPONSE_BYTES)
+            if truncated:
+                raise ValueError(f"GitHub response over {MAX_RESPONSE_BYTES} bytes: {url}")
+            payload = json.loads(body)
+            next_url = response.links.get("next", {}).get("url")
+            etag = response.headers.get("ETag")
+            if etag and self.http.cache is None:
+                with self._etag_lock:
+                    self._etags[url] = (etag, payload, next_url)
+                    self._etags.move_to_end(url)
+                    if len(self._etags) > ETAG_MEMO_SIZE:
+                        self._etags.popitem(last=False)
+            return 200, payload, next_url
+
+    # --- LOOKUPS ---
+
+    def profile_email(self, username):
+        """(email or None, exists). A missing user ends the pivot without touching events."""
+        status, profile, _ = self._get_json(f"{self.base_url}/users/{username}")
+        if status == 404:
+            return None, False
+        email = profile.get("email") if isinstance(profile, dict) else None
+        return email, True
+
+    def events(self, username):
+        """Public events, one page at a time; nothing past the page being read is fetched."""
+        url = f"{self.base_url}/users/{username}/events/public?per_page={EVENTS_PER_PAGE}"
+        for _ in range(MAX_EVENT_PAGES):
+            status, page, url = self._get_json(url)
+            if status == 404 or not isinstance(page, list):
+                return
+            yield from page
+            if not url or len(page) < EVENTS_PER_PAGE:
+                return
+
+    def commit_email(self, username):
+        for event in self.events(username):
+            if event.get("type") != "PushEvent":
+                continue
+            for commit in (event.get("payload") or {}).get("commits") or ():
+                email = (commit.get("author") or {}).get("email")
+                if email and "noreply" not in email:
+                    return email
+        return None
+
+    def find_email(self, username):
+        """Returns (email, source) from the profile or commit history, or None."""
+        email, exists = self.profile_email(username)
+        if email:
+            return email, "GitHub Profile"
+        if not exists:
+            return None
+        return self.commit_lookup(username)
+
+    def commit_lookup(self, username):
+        """(email, source) from the public commit history, or None."""
+        email = self.commit_email(username)
+        if email:
+            return email, "GitHub Commit History"
+        return None
+
+    def find_emails(self, usernames, call=None):
+        """
+        Pivots many usernames around the remaining quota. Cheap profile lookups
+        (one call each) run for everyone first; the costlier event paging only
+        for users whose profile had no email, while budget lasts.
+        call(lookup, username) runs each lookup (the Scanner wraps its breaker and metrics around them).
+        Returns ({username: (email, source)}, {username: error}, [usernames left for the next window]);
+        users in none of them have no email.
+        """
+        call = call or (lambda lookup, username: lookup(username))
+        usernames = list(usernames)
+        found, failed, need_events, deferred = {}, {}, [], []
+        for index, username in enumerate(usernames):
+            try:
+                email, exists = call(self.profile_email, username)
+            except RateLimitExhausted:
+                deferred.extend(usernames[index:])
+                break
+            except Exception as e:
+                failed[username] = e
+                continue
+            if email:
+                found[username] = (email, "GitHub Profile")
+            elif exists:
+                need_events.append(username)
+
+        for index, username in enumerate(need_events):
+            try:
+                result = call(self.commit_lookup, username)
+            except RateLimitExhausted:
+                deferred.extend(need_events[index:])
+                break
+            except Exception as e:
+                failed[username] = e
+                continue
+            if result:
+                found[username] = result
+        return found, failed, deferred
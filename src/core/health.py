@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+
+# Response times (seconds) remembered per host for timeout estimation
+LATENCY_WINDOW = 100
+
+# Below this many samples the configured timeout is used as is
+MIN_SAMPLES = 10
+
+# Adaptive read timeout = clamp(p99 * headroom, MIN_TIMEOUT, configured timeout)
+TIMEOUT_PERCENTILE = 99
+TIMEOUT_HEADROOM = 3.0
+MIN_TIMEOUT = 1.0
+
+# Consecutive failures that open a host's breaker, and how long it stays open
+FAILURE_THRESHOLD = 5
+COOL_DOWN = 30.0
+MAX_COOL_DOWN = 600.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+class CircuitOpen(Exception):
+    """The host failed too often recently; it is skipped until its cool-down ends."""
+    def __init__(self, host, retry_at):
+        super().__init__(f"{host} is failing, skipped until {time.strftime('%H:%M:%S', time.localtime(retry_at))}")
+        self.host = host
+        self.retry_at = retry_at
+
+class HostState:
+    """Latency window and breaker of one host."""
+    __slots__ = ("latencies", "failures", "state", "open_until", "cool_down", "probing")
+
+    def __init__(self, cool_down=COOL_DOWN):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.failures = 0  # consecutive
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.cool_down = cool_down
+        self.probing = False  # a half-open trial request is in flight
+
+    def percentile(self, p):
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+class HostHealth:
+    """
+    Per-host latency tracking and circuit breaking, shared by every target of a scan.
+
+    Timeouts follow the host's own latency: once enough responses are seen, the read
+    timeout shrinks to a multiple of its p99 (never above the sites.json timeout), so
+    a tarpitting host stops costing every target the full timeout.
+    After FAILURE_THRESHOLD failures in a row the breaker opens and the host is
+    skipped for a cool-down. Then a single half-open trial request decides: success
+    closes the breaker, failure reopens it with twice the cool-down.
+    """
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, cool_down=COOL_DOWN, max_cool_down=MAX_COOL_DOWN,
+                 clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.base_cool_down = cool_down
+        self.max_cool_down = max_cool_down
+        self.clock = clock
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.base_cool_down)
+        return state
+
+    def timeout_for(self, host, configured):
+        """Read timeout for the next request to host; `configured` is the ceiling."""
+        with self._lock:
+            state = self._host(host)
+            if state.state != CLOSED or len(state.latencies) < MIN_SAMPLES:
+                # Too little data, or a recovery trial: give the host the full timeout
+                return configured
+            estimate = state.percentile(TIMEOUT_PERCENTILE) * TIMEOUT_HEADROOM
+        return min(configured, max(MIN_TIMEOUT, estimate))
+
+    def before(self, host):
+        """Raises CircuitOpen when host must be skipped; otherwise the request may go out."""
+        with self._lock:
+            state = self._host(host)
+            if state.state == CLOSED:
+                return
+            now = self.clock()
+            if state.state == OPEN and now >= state.open_until:
+                state.state = HALF_OPEN
+            if state.state == HALF_OPEN and not state.probing:
+                state.probing = True  # This caller is the trial request
+                return
+            raise CircuitOpen(host, state.open_until)
+
+    def success(self, host, latency=None):
+        with self._lock:
+            state = self._host(host)
+            if latency is not None:
+                state.latencies.append(latency)
+            state.failures = 0
+            state.state = CLOSED
+            state.probing = False
+            state.cool_down = self.base_cool_down
+
+    def release(self, host):
+        """
+        The request let through by before() ended without saying anything about the host
+        (abandoned, out of API quota). A pending half-open trial slot is handed back.
+        """
+        with self._lock:
+            self._host(host).probing = False
+
+    def failure(self, host):
+        """Records a failed request. Returns True when this failure opened the breaker."""
+        with self._lock:
+            state = self._host(host)
+            state.failures += 1
+            if state.state == HALF_OPEN:
+                # The trial failed: back off harder
+                state.cool_down = min(self.max_cool_down, state.cool_down * 2)
+            elif state.state == OPEN or state.failures < self.failure_threshold:
+                return False
+            state.state = OPEN
+            state.probing = False
+            state.open_until = self.clock() + state.cool_down
+            return True
+
+    def snapshot(self):
+        """host -> {state, failures, samples, p99}, for metrics and debugging."""
+        with self._lock:
+            return {host: {"state": state.state, "failures": state.failures, "samples": len(state.latencies),
+                           "p99": round(state.percentile(TIMEOUT_PERCENTILE), 3) if state.latencies else None}
+                    for host, state in self._hosts.items()}
@@ -0,0 +1,132 @@
+import time
+from src.core.scanner import PROBE_FOUND, PROBE_MISSING
+
+# How long a site result stays trustworthy, per sites.json category (seconds).
+# A rule can override it with an optional "freshness_ttl" key.
+FRESHNESS_TTLS = {
+    "Code": 7 * 86400,
+    "Infrastructure": 7 * 86400,
+    "Blog": 3 * 86400,
+    "Social": 86400,
+}
+DEFAULT_FRESHNESS_TTL = 86400
+
+class ScanDelta:
+    """What changed for one target since its last known state."""
+    def __init__(self, target):
+        self.target = target
+        self.new_accounts = []
+        self.removed_accounts = []
+        self.new_emails = []
+        self.removed_emails = []
+        self.probed = []   # Site names checked again
+        self.reused = []   # Site names whose last result was still fresh
+
+    @property
+    def changed(self):
+        return bool(self.new_accounts or self.removed_accounts or self.new_emails or self.removed_emails)
+
+    def to_dict(self):
+        return {
+            "new_accounts": self.new_accounts,
+            "removed_accounts": self.removed_accounts,
+            "new_emails": self.new_emails,
+            "removed_emails": self.removed_emails,
+            "probed": len(self.probed),
+            "reused": len(self.reused),
+        }
+
+    def summary(self):
+        lines = [f"[*] Rescan of {self.target}: {len(self.probed)} sites probed, {len(self.reused)} still fresh."]
+        lines += [f"[+] NEW ACCOUNT: {node_id}" for node_id in self.new_accounts]
+        lines += [f"[-] REMOVED ACCOUNT: {node_id}" for node_id in self.removed_accounts]
+        lines += [f"[!] NEW EMAIL: {email}" for email in self.new_emails]
+        lines += [f"[-] REMOVED EMAIL: {email}" for email in self.removed_emails]
+        if not self.changed:
+            lines.append("[*] No changes since the last scan.")
+        return lines
+
+class IncrementalScanner:
+    """
+    Rescans a known target using its last state in the IdentityStore.
+    Only sites whose last result is stale (older than the category TTL) or
+    unknown are probed again; fresh findings are carried over as they are.
+    """
+    def __init__(self, scanner, store, ttls=None):
+        if store is None:
+            raise ValueError("Incremental rescans need an identity store")
+        self.scanner = scanner
+        self.store = store
+        self.ttls = dict(FRESHNESS_TTLS, **(ttls or {}))
+
+    def ttl_for(self, rule):
+        if "freshness_ttl" in rule.options:
+            return rule.options["freshness_ttl"]
+        return self.ttls.get(rule.category, DEFAULT_FRESHNESS_TTL)
+
+    def stale_rules(self, username, states=None, now=None):
+        """Rules to probe again: never checked, last check failed, or older than their TTL."""
+        states = self.store.probe_states(username) if states is None else states
+        now = now or time.time()
+        stale = []
+        for rule in self.scanner.rules:
+            state = states.get(rule.name)
+            if state is None or state[0] not in (PROBE_FOUND, PROBE_MISSING) or now - state[2] > self.ttl_for(rule):
+                stale.append(rule)
+        return stale
+
+    def rescan(self, username, graph, root_node, journal=None):
+        """Fills `graph` with the target's current footprint and returns the ScanDelta (journal: see Scanner.scan_target)."""
+        previous = self.store.load_graph(username)
+        stale = self.stale_rules(username)
+        stale_names = {rule.name for rule in stale}
+        delta = ScanDelta(username)
+        delta.probed = sorted(stale_names)
+        delta.reused = sorted(rule.name for rule in self.scanner.rules if rule.name not in stale_names)
+
+        # Findings on fresh sites are kept as they are (with whatever hangs off them, e.g. emails)
+        old_accounts = previous.nodes_by_type("Account")
+        for account in old_accounts:
+            if account.platform not in stale_names:
+                self._carry(previous, account, graph, root_node)
+
+        pivots = self.scanner.scan_target(username, graph, root_node, rules=stale, journal=journal) if stale else {}
+
+        # A stale site that came back "missing" means the account is gone; if the check
+        # failed we know nothing new, so the old finding is kept. An account found again
+        # keeps what hung off it unless its pivot answered that there is nothing there now
+        # (a pivot that hit the rate limit or a 5xx says nothing about the old email)
+        states = self.store.probe_states(username)
+        removed = []
+        for account in old_accounts:
+            if account.id in graph.nodes:
+                if account.platform in stale_names and pivots.get(account.platform) != PROBE_MISSING:
+                    self._carry(previous, account, graph, root_node)
+                continue
+            if states.get(account.platform, (None,))[0] == PROBE_MISSING:
+                removed.append(account.id)
+            else:
+                self._carry(previous, account, graph, root_node)
+        # Drop the vanished accounts from the store, along with anything only reachable through them
+        gone = [node_id for node_id in previous.nodes if node_id not in graph.nodes]
+        if gone:
+            self.store.remove_nodes(username, gone)
+
+        old_emails = {node.id.lower() for node in previous.nodes_by_type("Email")}
+        emails = {node.id.lower() for node in graph.nodes_by_type("Email")}
+        delta.new_accounts = sorted(node.id for node in graph.nodes_by_type("Account") if node.id not in previous.nodes)
+        delta.removed_accounts = sorted(removed)
+        delta.new_emails = sorted(node.id for node in graph.nodes_by_type("Email") if node.id.lower() not in old_emails)
+        delta.removed_emails = sorted(node.id for node in previous.nodes_by_type("Email") if node.id.lower() not in emails)
+        return delta
+
+    def _carry(self, previous, account, graph, root_node):
+        """Copies an account and everything reachable from it out of the previous graph."""
+        graph.add_edge(root_node, account, f"has_account_on_{account.platform}")
+        stack = [account]
+        while stack:
+            node = stack.pop()
+            for child, rel in previous.out_edges(node.id):
+                if child.id not in graph.nodes:
+                    stack.append(child)
+                graph.add_edge(node, child, rel)
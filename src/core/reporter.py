@@ -1,52 +1,176 @@
+import json
 import os
 from datetime import datetime
+from html import escape
+from itertools import islice
+from src.core.analyzer import RiskAnalyzer
+
+# Findings per HTML page; bigger reports continue in report_<target>_p2.html, _p3, ...
+PAGE_SIZE = 50000
+
+# Sites listed in the "Scan performance" card (slowest first)
+PERFORMANCE_ROWS = 10
+
+# Renders the embedded findings payload. Rows have a fixed height so only the ones in
+# view (plus a small overscan) exist in the DOM; filtering runs over a prebuilt
+# upper-case index and is debounced so typing never re-filters on every keystroke.
+TABLE_SCRIPT = """
+(function () {
+    var ROW_HEIGHT = 52, OVERSCAN = 10, DEBOUNCE_MS = 150;
+    var rows = JSON.parse(document.getElementById("findingsData").textContent);
+    var index = rows.map(function (r) { return (r[0] + " " + r[1]).toUpperCase(); });
+    var visible = rows.map(function (_, i) { return i; });
+    var viewport = document.getElementById("tableViewport");
+    var body = document.getElementById("findingsBody");
+    var counter = document.getElementById("resultCount");
+    var input = document.getElementById("searchInput");
+
+    function spacer(height) {
+        var tr = document.createElement("tr"), td = document.createElement("td");
+        tr.className = "spacer-row";
+        td.colSpan = 3;
+        td.style.height = height + "px";
+        tr.appendChild(td);
+        return tr;
+    }
+
+    function makeRow(r) {
+        var tr = document.createElement("tr");
+        tr.className = r[3] ? "finding-row email-row" : "finding-row";
+
+        var platform = document.createElement("div");
+        platform.className = "platform-tag";
+        platform.textContent = r[0];
+        tr.appendChild(document.createElement("td")).appendChild(platform);
+
+        var data = document.createElement("td");
+        if (r[1].indexOf("http") === 0) {
+            // Shorten long URLs visually but keep the link intact
+            var a = document.createElement("a");
+            a.href = r[1];
+            a.target = "_blank";
+            a.className = "link-text";
+            a.textContent = r[1].length > 45 ? r[1].slice(0, 45) + "..." : r[1];
+            data.appendChild(a);
+        } else {
+            data.textContent = r[1];
+        }
+        tr.appendChild(data);
+
+        var badge = document.createElement("span");
+        badge.className = "source-badge";
+        badge.textContent = r[2];
+        tr.appendChild(document.createElement("td")).appendChild(badge);
+        return tr;
+    }
+
+    function render() {
+        var first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        var last = Math.min(visible.length, first + Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN);
+        var frag = document.createDocumentFragment();
+        frag.appendChild(spacer(first * ROW_HEIGHT));
+        for (var i = first; i < last; i++) frag.appendChild(makeRow(rows[visible[i]]));
+        frag.appendChild(spacer((visible.length - last) * ROW_HEIGHT));
+        body.replaceChildren(frag);
+        counter.textContent = visible.length + " of " + rows.length + " findings";
+    }
+
+    function applyFilter() {
+        var filter = input.value.toUpperCase();
+        visible = [];
+        for (var i = 0; i < index.length; i++) {
+            if (!filter || index[i].indexOf(filter) > -1) visible.push(i);
+        }
+        viewport.scrollTop = 0;
+        render();
+    }
+
+    var timer = null;
+    window.scheduleFilter = function () {
+        clearTimeout(timer);
+        timer = setTimeout(applyFilter, DEBOUNCE_MS);
+    };
+
+    var ticking = false;
+    viewport.addEventListener("scroll", function () {
+        if (ticking) return;
+        ticking = true;
+        requestAnimationFrame(function () { ticking = false; render(); });
+    });
+
+    render();
+})();
+"""
 
 class Reporter:
-    def __init__(self, target_username, graph):
+    def __init__(self, target_username, graph, page_size=PAGE_SIZE, analyzer=None, metrics=None):
         self.target = target_username
         self.graph = graph
+        self.page_size = page_size
+        self.analyzer = analyzer or RiskAnalyzer()
+        self.metrics = metrics  # Optional ScanMetrics: adds the "Scan performance" card
         self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    def _page_name(self, page):
+        if page == 1:
+            return f"report_{self.target}.html"
+        return f"report_{self.target}_p{page}.html"
+
+    def _findings(self):
+        """Yields one [platform, link, source, is_email] row per discovered node."""
+        for node in self.graph.nodes.values():
+            if node.type != "Person": 
+                # Intelligent Platform Labeling
+                # We check 'platform' first, then 'site_name', then fallback to 'Unknown'
+                platform_label = getattr(node, 'platform', getattr(node, 'site_name', 'Unknown'))
+                is_email = node.type == "Email"
+                if is_email:
+                    platform_label = "EMAIL LEAK"
+                yield [platform_label, getattr(node, 'url', node.id), node.source, is_email]
+
     def generate_html(self):
-        filename = f"report_{self.target}.html"
-        
+        """
+        Streams the report to disk. Findings are embedded as a JSON payload that a
+        virtualized table renders in the browser; past page_size findings the report
+        is split over several pages.
+        """
         # --- 1. INTELLIGENCE ANALYSIS (Stats & Risk) ---
         total_nodes = len(self.graph.nodes)
-        accounts = [n for n in self.graph.nodes.values() if n.type == "Account"]
-        emails = [n for n in self.graph.nodes.values() if n.type == "Email"]
-        
-        # Dynamic Risk Scoring Logic
-        risk_score = 0
-        risk_factors = []
+        accounts = self.graph.nodes_by_type("Account")
+        emails = self.graph.nodes_by_type("Email")
         
-        if len(accounts) > 0: 
-            risk_score += 10
-        if len(accounts) > 5: 
-            risk_score += 20
-            risk_factors.append("High footprint visibility")
-            
-        if len(emails) > 0: 
-            risk_score += 40  # Emails are high risk
-            risk_factors.append("Email address exposed")
-        
-        # Determine Badge Color & Label
-        risk_level = "LOW"
-        risk_color = "#10b981" # Emerald Green
-        if risk_score > 30:
-            risk_level = "MODERATE"
-            risk_color = "#f59e0b" # Amber Orange
-        if risk_score > 60:
-            risk_level = "CRITICAL"
-            risk_color = "#ef4444" # Red
-
-        # --- 2. HTML TEMPLATE ---
-        html_content = f"""
+        # Risk scoring lives in the analyzer (same weights as the batch ranking)
+        assessment = self.analyzer.assess(self.graph, target=self.target)
+        risk_factors = assessment.factors
+        risk = (assessment.level, assessment.color, risk_factors)
+
+        findings = total_nodes - len(self.graph.nodes_by_type("Person"))
+        pages = max(1, -(-findings // self.page_size))
+
+        # --- 2. STREAM THE PAGES ---
+        rows = self._findings()
+        for page in range(1, pages + 1):
+            with open(self._page_name(page), "w") as f:
+                self._write_head(f, total_nodes, len(accounts), len(emails), risk, page, pages)
+                self._write_findings(f, islice(rows, self.page_size))
+                self._write_tail(f, risk_factors)
+
+        print(f"\n[+] Professional Report generated: {os.path.abspath(self._page_name(1))}")
+        if pages > 1:
+            print(f"[*] {findings} findings split over {pages} pages.")
+
+    # --- 3. HTML TEMPLATE ---
+
+    def _write_head(self, f, total_nodes, account_count, email_count, risk, page, pages):
+        risk_level, risk_color, _ = risk
+        target = escape(self.target)
+        f.write(f"""
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Digital Footprint Dossier: {self.target}</title>
+            <title>Digital Footprint Dossier: {target}</title>
             <style>
                 :root {{
                     --primary-slate: #1e293b;
@@ -174,6 +298,24 @@ class Reporter:
                 .link-text {{ color: var(--accent-blue); text-decoration: none; font-family: monospace; }}
                 .link-text:hover {{ text-decoration: underline; }}
 
+                /* --- VIRTUALIZED ROWS: fixed height, only the visible window is in the DOM --- */
+                .table-viewport {{ max-height: 640px; overflow-y: auto; }}
+                .table-viewport th {{ position: sticky; top: 0; }}
+                .finding-row td {{
+                    height: 52px;
+                    box-sizing: border-box;
+                    padding: 0 1.5rem;
+                    white-space: nowrap;
+                    overflow: hidden;
+                    text-overflow: ellipsis;
+                    max-width: 420px;
+                }}
+                .spacer-row td {{ padding: 0; border: none; }}
+                .email-row .platform-tag {{ color: #ef4444; font-weight: bold; }}
+                .result-count {{ margin-top: 0.5rem; font-size: 0.75rem; color: #64748b; }}
+                .pager {{ padding: 0.75rem 1.5rem; border-top: 1px solid var(--border-color); font-size: 0.85rem; color: #64748b; }}
+                .pager a {{ color: var(--accent-blue); margin: 0 0.25rem; }}
+
                 /* --- GRAPH IMAGE --- */
                 .graph-card {{
                     background: white;
@@ -195,7 +337,7 @@ class Reporter:
                     <span>OpSec Analysis Tool // v1.0</span>
                 </div>
                 <div class="meta-info">
-                    <div>TARGET: <strong>{self.target}</strong></div>
+                    <div>TARGET: <strong>{target}</strong></div>
                     <div>GENERATED: {self.timestamp}</div>
                 </div>
             </div>
@@ -209,12 +351,12 @@ class Reporter:
                     </div>
                     <div class="card">
                         <div class="stat-title">Accounts Found</div>
-                        <div class="stat-value">{len(accounts)}</div>
+                        <div class="stat-value">{account_count}</div>
                     </div>
                     <div class="card">
                         <div class="stat-title">Email Leaks</div>
-                        <div class="stat-value" style="color: {'#ef4444' if len(emails) > 0 else '#10b981'}">
-                            {len(emails)}
+                        <div class="stat-value" style="color: {'#ef4444' if email_count > 0 else '#10b981'}">
+                            {email_count}
                         </div>
                     </div>
                     <div class="card">
@@ -233,60 +375,84 @@ class Reporter:
                         </div>
                         <div class="table-container">
                             <div class="search-bar">
-                                <input type="text" id="searchInput" class="search-input" placeholder="Filter findings (e.g., 'Twitter', 'Leaked')..." onkeyup="filterTable()">
+                                <input type="text" id="searchInput" class="search-input" placeholder="Filter findings (e.g., 'Twitter', 'Leaked')..." oninput="scheduleFilter()">
+                                <div class="result-count" id="resultCount"></div>
                             </div>
-                            <table id="findingsTable">
-                                <thead>
-                                    <tr>
-                                        <th>Platform</th>
-                                        <th>URL / Data</th>
-                                        <th>Source</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-        """
-        
-        # --- GENERATE TABLE ROWS ---
-        for node in self.graph.nodes.values():
-            if node.type != "Person": 
-                # Intelligent Platform Labeling
-                # We check 'platform' first, then 'site_name', then fallback to 'Unknown'
-                platform_label = getattr(node, 'platform', getattr(node, 'site_name', 'Unknown'))
-                
-                # Special styling for Email nodes
-                row_style = ""
-                if node.type == "Email": 
-                    platform_label = "EMAIL LEAK"
-                    row_style = "color: #ef4444; font-weight:bold;"
-                
-                # Link Formatting
-                link = getattr(node, 'url', node.id)
-                display_link = link
-                if "http" in link:
-                    # Shorten long URLs visually but keep the link intact
-                    short_link = link[:45] + "..." if len(link) > 45 else link
-                    display_link = f"<a href='{link}' target='_blank' class='link-text'>{short_link}</a>"
-                
-                html_content += f"""
-                                    <tr>
-                                        <td><div class="platform-tag" style="{row_style}">{platform_label}</div></td>
-                                        <td>{display_link}</td>
-                                        <td><span class="source-badge">{node.source}</span></td>
-                                    </tr>
-                """
-
-        html_content += f"""
-                                </tbody>
-                            </table>
+                            <div class="table-viewport" id="tableViewport">
+                                <table id="findingsTable">
+                                    <thead>
+                                        <tr>
+                                            <th>Platform</th>
+                                            <th>URL / Data</th>
+                                            <th>Source</th>
+                                        </tr>
+                                    </thead>
+                                    <tbody id="findingsBody"></tbody>
+                                </table>
+                            </div>
+                            {self._pager(page, pages)}
                         </div>
                     </div>
+        """)
+
+    def _write_findings(self, f, rows):
+        """Findings go out one JSON row at a time; '<' is escaped so no row can close the script tag."""
+        f.write('<script type="application/json" id="findingsData">[')
+        for i, row in enumerate(rows):
+            if i: f.write(",")
+            f.write(json.dumps(row).replace("<", "\\u003c"))
+        f.write(']</script>\n')
+
+    def _pager(self, page, pages):
+        if pages == 1:
+            return ""
+        links = []
+        for number in range(1, pages + 1):
+            if number == page:
+                links.append(f'<strong>{number}</strong>')
+            else:
+                links.append(f'<a href="{escape(self._page_name(number))}">{number}</a>')
+        return f'<div class="pager">Page {" ".join(links)}</div>'
+
+    def _performance_card(self):
+        """Per-site probe latency (slowest p99 first), failures and bytes read; empty without metrics."""
+        if self.metrics is None:
+            return ""
+        rows = self.metrics.rows()
+        if not rows:
+            return ""
 
+        def ms(value):
+            return "-" if value is None else f"{value:.0f}"
+
+        body = "".join(
+            f'<tr><td>{escape(site)}</td><td>{probes}</td><td>{ms(p50)}</td><td>{ms(p99)}</td>'
+            f'<td>{failures}</td><td>{kilobytes:g}</td></tr>'
+            for site, probes, p50, p99, failures, kilobytes in rows[:PERFORMANCE_ROWS])
+        more = f'<p class="graph-caption">{len(rows) - PERFORMANCE_ROWS} faster sites not shown.</p>' if len(rows) > PERFORMANCE_ROWS else ""
+        return f"""
+                        <div style="margin-top: 2rem;">
+                            <div class="section-header">
+                                <div class="section-title">SCAN PERFORMANCE</div>
+                            </div>
+                            <div class="card" style="padding: 1rem; font-size: 0.85rem;">
+                                <table>
+                                    <thead><tr><th>Site</th><th>Probes</th><th>p50 ms</th><th>p99 ms</th><th>Failed</th><th>KB</th></tr></thead>
+                                    <tbody>{body}</tbody>
+                                </table>
+                                {more}
+                            </div>
+                        </div>"""
+
+    def _write_tail(self, f, risk_factors):
+        target = escape(self.target)
+        f.write(f"""
                     <div>
                         <div class="section-header">
                             <div class="section-title">RELATIONSHIP MAP</div>
                         </div>
                         <div class="graph-card">
-                            <img src="scan_{self.target}.png" alt="Network Graph Analysis">
+                            <img src="scan_{target}.png" alt="Network Graph Analysis">
                             <div class="graph-caption">
                                 <p><strong>Visual Identity Cluster</strong></p>
                                 <p>This graph visualizes the connection between the target identity and discovered assets across the surface web.</p>
@@ -299,10 +465,11 @@ class Reporter:
                             </div>
                             <div class="card" style="padding: 1rem;">
                                 <ul style="margin: 0; padding-left: 1.5rem; color: #64748b; font-size: 0.9rem;">
-                                    {''.join([f'<li style="margin-bottom:0.5rem">{factor}</li>' for factor in risk_factors]) or '<li>No critical risk factors identified.</li>'}
+                                    {''.join([f'<li style="margin-bottom:0.5rem">{escape(factor)}</li>' for factor in risk_factors]) or '<li>No critical risk factors identified.</li>'}
                                 </ul>
                             </div>
                         </div>
+                        {self._performance_card()}
                     </div>
                 
                 </div> <div class="footer">
@@ -310,37 +477,7 @@ class Reporter:
                 </div>
             </div>
 
-            <script>
-                function filterTable() {{
-                    var input, filter, table, tr, td, i, txtValue;
-                    input = document.getElementById("searchInput");
-                    filter = input.value.toUpperCase();
-                    table = document.getElementById("findingsTable");
-                    tr = table.getElementsByTagName("tr");
-
-                    for (i = 0; i < tr.length; i++) {{
-                        // Check both Platform (col 0) and Data (col 1)
-                        td0 = tr[i].getElementsByTagName("td")[0]; 
-                        td1 = tr[i].getElementsByTagName("td")[1];
-                        
-                        if (td0 || td1) {{
-                            txt0 = td0.textContent || td0.innerText;
-                            txt1 = td1.textContent || td1.innerText;
-                            
-                            if (txt0.toUpperCase().indexOf(filter) > -1 || txt1.toUpperCase().indexOf(filter) > -1) {{
-                                tr[i].style.display = "";
-                            }} else {{
-                                tr[i].style.display = "none";
-                            }}
-                        }}
-                    }}
-                }}
-            </script>
+            <script>{TABLE_SCRIPT}</script>
         </body>
         </html>
-        """
-
-        with open(filename, "w") as f:
-            f.write(html_content)
-        
-        print(f"\n[+] Professional Report generated: {os.path.abspath(filename)}")
+        """)
@@ -0,0 +1,262 @@
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlparse
+from src.utils.extract import MAX_BODY_BYTES, MAX_MARKERS, MarkerSet
+
+# --- sites.json SCHEMA ---
+# name, category, url ("{}" = username), check_type, plus per check type:
+#   status_code : exist_code / exist_codes, optional status_probe ("stream" = GET and hang up
+#                 before the body, the default; "head" = HEAD request, for sites that answer it)
+#   markers     : present_markers / absent_markers (first marker seen in the body decides;
+#                 at most 16 per rule, extract.MAX_MARKERS)
+#   regex       : pattern (searched in the body; "{}" = escaped username)
+#   search      : query, expected_domains, optional search_url and result_class
+#   race        : strategies (nested rules raced against each other, see below)
+# Optional on any rule: profile_url, miss_redirects (final URL substrings that mean
+# "not found"), timeout, max_bytes (body bytes a check may read), pivot, fallback
+# (a nested rule tried on a miss).
+# A rule with "strategies" runs them concurrently and takes the first hit. With
+# "hedge_after" (seconds) they start one after another instead, each one once the
+# previous has answered without a hit or has been running that long.
+# Unknown keys (cache_ttl, rate_limit, freshness_ttl, risk_weight, ...) are kept in SiteRule.options.
+CHECK_TYPES = ("status_code", "markers", "regex", "search", "race")
+
+# Default search engine for "search" rules; "{}" is replaced by the query
+SEARCH_URL = "https://html.duckduckgo.com/html/?q={}"
+
+# CSS class of the result links on SEARCH_URL pages
+RESULT_CLASS = "result__a"
+
+STATUS_PROBES = ("stream", "head")
+
+class UrlTemplate:
+    """
+    A "{}" template split once at load time.
+    Rendering is a plain join instead of a str.format parse per probe.
+    """
+    __slots__ = ("template", "_parts")
+
+    def __init__(self, template):
+        self.template = template
+        self._parts = tuple(template.split("{}"))
+
+    def render(self, value):
+        return value.join(self._parts)
+
+    def match(self, url):
+        """
+        Inverse of render(): the value a URL was rendered from, or None.
+        Scheme, "www." and trailing slashes are ignored; the value must be a single path segment.
+        """
+        if len(self._parts) != 2:
+            return None
+        prefix, suffix = _SCHEME.sub("", self._parts[0]), self._parts[1].rstrip("/")
+        bare = _bare_url(url)
+        if not bare.lower().startswith(prefix.lower()) or not bare.lower().endswith(suffix.lower()):
+            return None
+        value = bare[len(prefix):len(bare) - len(suffix)]
+        return value if value and "/" not in value else None
+
+    def __repr__(self):
+        return f"<UrlTemplate: {self.template}>"
+
+_SCHEME = re.compile(r"^[a-z]+://(www\.)?", re.IGNORECASE)
+
+def _bare_url(url):
+    url = url.split("#")[0].split("?")[0]
+    return _SCHEME.sub("", url).rstrip("/")
+
+@lru_cache(maxsize=4096)
+def _marker_set(markers):
+    return MarkerSet(markers)
+
+@dataclass(frozen=True, eq=False)
+class SiteRule:
+    """One compiled, immutable entry of sites.json."""
+    name: str
+    category: str
+    check_type: str
+    host: str
+    url: UrlTemplate = None          # what we fetch
+    profile_url: UrlTemplate = None  # what we report on a hit (defaults to url)
+    exist_codes: frozenset = frozenset([200])
+    present_markers: tuple = ()
+    absent_markers: tuple = ()
+    pattern: str = None
+    miss_redirects: tuple = ()
+    query: UrlTemplate = None
+    search_url: UrlTemplate = None
+    result_class: str = RESULT_CLASS
+    expected_domains: tuple = ()
+    strategies: tuple = ()           # race rules: the competing SiteRules, in launch order
+    hedge_after: float = 0           # race rules: stagger strategy launches by this many seconds (0 = all at once)
+    timeout: float = 5
+    status_probe: str = "stream"
+    max_bytes: int = MAX_BODY_BYTES   # markers past this point count as absent
+    marker_set: MarkerSet = None     # prebuilt when no marker depends on the username
+    pivot: str = None
+    fallback: "SiteRule" = None
+    options: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))  # cache_ttl, rate_limit, ...
+
+    def markers_for(self, username):
+        """
+        Single-pass matcher over every present/absent marker of this rule.
+        Static marker sets are built once at load; "{}" markers are rendered per username (and cached).
+        """
+        if self.marker_set:
+            return self.marker_set
+        markers = tuple(m.replace("{}", username) for m in self.present_markers + self.absent_markers)
+        return _marker_set(markers) if markers else None
+
+    def pattern_for(self, username):
+        return _compile_pattern(self.pattern, username if "{}" in self.pattern else None)
+
+    def report_url(self, username):
+        return (self.profile_url or self.url).render(username)
+
+    def username_from(self, url):
+        """The username behind a profile URL of this site (fallback rules included), or None."""
+        templates = [t for t in (self.profile_url, self.url) if t]
+        templates += [UrlTemplate(domain.rstrip("/") + "/{}") for domain in self.expected_domains]
+        for template in templates:
+            username = template.match(url)
+            if username:
+                return username
+        for strategy in self.strategies:
+            username = strategy.username_from(url)
+            if username:
+                return username
+        return self.fallback.username_from(url) if self.fallback else None
+
+@lru_cache(maxsize=4096)
+def _compile_pattern(pattern, username):
+    if username is not None:
+        pattern = pattern.replace("{}", re.escape(username))
+    return re.compile(pattern.encode("utf-8"))
+
+# Keys consumed by compile_rule; anything else is kept in SiteRule.options
+_RULE_KEYS = {
+    "name", "category", "check_type", "url", "profile_url", "exist_code", "exist_codes",
+    "present_markers", "absent_markers", "pattern", "miss_redirects", "query",
+    "search_url", "result_class", "expected_domains", "timeout", "pivot", "fallback", "strategies", "hedge_after",
+    "status_probe", "max_bytes",
+}
+
+def compile_rule(entry, parent=None):
+    """Validates one sites.json entry and turns it into a SiteRule."""
+    name = entry.get("name") or (parent and parent["name"])
+    check_type = entry.get("check_type", "race" if entry.get("strategies") else "status_code")
+    if check_type not in CHECK_TYPES:
+        raise ValueError(f"{name}: unknown check_type '{check_type}' (expected one of {', '.join(CHECK_TYPES)})")
+
+    url = UrlTemplate(entry["url"]) if entry.get("url") else None
+    search_url = None
+    query = None
+    strategies = ()
+    if check_type == "race":
+        if not entry.get("strategies"):
+            raise ValueError(f"{name}: race rules need 'strategies'")
+        # Strategies report the site's profile URL unless they name their own
+        inherited = {"profile_url": entry["profile_url"]} if entry.get("profile_url") else {}
+        strategies = tuple(compile_rule(dict(inherited, **strategy), parent=entry) for strategy in entry["strategies"])
+        host = None  # Each strategy holds its own host's slot while it runs
+    elif check_type == "search":
+        if not entry.get("query"):
+            raise ValueError(f"{name}: search rules need a 'query'")
+        query = UrlTemplate(entry["query"])
+        search_url = UrlTemplate(entry.get("search_url", SEARCH_URL))
+        host = urlparse(search_url.template).hostname
+    else:
+        if url is None:
+            raise ValueError(f"{name}: '{check_type}' rules need a 'url'")
+        host = urlparse(url.template).hostname
+
+    if check_type == "markers" and not (entry.get("present_markers") or entry.get("absent_markers")):
+        raise ValueError(f"{name}: markers rules need present_markers and/or absent_markers")
+    marker_count = len(entry.get("present_markers", ())) + len(entry.get("absent_markers", ()))
+    if marker_count > MAX_MARKERS:
+        raise ValueError(f"{name}: {marker_count} markers, at most {MAX_MARKERS} are allowed per rule")
+    if check_type == "regex" and not entry.get("pattern"):
+        raise ValueError(f"{name}: regex rules need a 'pattern'")
+    status_probe = entry.get("status_probe", "stream")
+    if status_probe not in STATUS_PROBES:
+        raise ValueError(f"{name}: unknown status_probe '{status_probe}' (expected one of {', '.join(STATUS_PROBES)})")
+
+    exist_codes = entry.get("exist_codes") or [entry.get("exist_code", 200)]
+    fallback = entry.get("fallback")
+    markers = tuple(entry.get("present_markers", ())) + tuple(entry.get("absent_markers", ()))
+    static_markers = MarkerSet(markers) if markers and not any("{}" in m for m in markers) else None
+
+    return SiteRule(
+        name=name,
+        category=entry.get("category") or (parent and parent.get("category")) or "Unknown",
+        check_type=check_type,
+        host=host,
+        url=url,
+        profile_url=UrlTemplate(entry["profile_url"]) if entry.get("profile_url") else None,
+        exist_codes=frozenset(exist_codes),
+        present_markers=tuple(entry.get("present_markers", ())),
+        absent_markers=tuple(entry.get("absent_markers", ())),
+        pattern=entry.get("pattern"),
+        miss_redirects=tuple(entry.get("miss_redirects", ())),
+        query=query,
+        search_url=search_url,
+        result_class=entry.get("result_class", RESULT_CLASS),
+        expected_domains=tuple(entry.get("expected_domains", ())),
+        strategies=strategies,
+        hedge_after=entry.get("hedge_after", 0),
+        timeout=entry.get("timeout", 5),
+        status_probe=status_probe,
+        max_bytes=entry.get("max_bytes", MAX_BODY_BYTES),
+        marker_set=static_markers,
+        pivot=entry.get("pivot"),
+        fallback=compile_rule(fallback, parent=entry) if fallback else None,
+        options=MappingProxyType({k: v for k, v in entry.items() if k not in _RULE_KEYS}),
+    )
+
+class RuleTable:
+    """
+    The compiled site catalogue: an immutable tuple of SiteRules plus a name index.
+    """
+    def __init__(self, entries):
+        self.rules = tuple(compile_rule(entry) for entry in entries)
+        self.by_name = MappingProxyType({rule.name: rule for rule in self.rules})
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls([])
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def match_url(self, url):
+        """(rule, username) for the first site whose profile URLs cover url, or (None, None)."""
+        for rule in self.rules:
+            username = rule.username_from(url)
+            if username:
+                return rule, username
+        return None, None
+
+    def search_engine(self):
+        """
+        (search URL template, result link class) of the first search check in the catalogue
+        (strategies and fallbacks included), so free-form searches go where the site searches go.
+        """
+        stack = list(reversed(self.rules))
+        while stack:
+            rule = stack.pop()
+            if rule.check_type == "search":
+                return rule.search_url, rule.result_class
+            if rule.fallback: stack.append(rule.fallback)
+            stack.extend(reversed(rule.strategies))
+        return UrlTemplate(SEARCH_URL), RESULT_CLASS
+
+    def __len__(self):
+        return len(self.rules)
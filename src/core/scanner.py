@@ -1,33 +1,84 @@
-import json
-import requests
-import time
-import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import unquote, urlparse
-from bs4 import BeautifulSoup
+from src.core.engine import ScanEngine
+from src.core.github import GitHubPivot, RateLimitExhausted
+from src.core.health import CircuitOpen, HostHealth
+from src.core.rules import RESULT_CLASS, RuleTable
+from src.utils.extract import CHUNK_SIZE, MAX_BODY_BYTES, capped, extract_links, read_capped
+from src.utils.http_client import HttpClient
+from src.utils.metrics import ScanMetrics, active_trace, attached
+from src.utils.rate_limit import HostRateLimiter
 from src.models.node import AccountNode, EmailNode
 
+# How many distinct search queries we remember per process
+SEARCH_MEMO_SIZE = 4096
+
+# Outcome of one site check. "unknown" means the check itself failed (timeout, block, ...),
+# which is not evidence that the account does not exist.
+PROBE_FOUND, PROBE_MISSING, PROBE_UNKNOWN = "found", "missing", "unknown"
+
+class SearchFailed(Exception):
+    """The search engine did not answer with a result page (blocked, rate limited, down)."""
+
+class SiteUnavailable(Exception):
+    """The site answered with a server error or throttling status instead of a profile or a miss."""
+
+class RaceLost(Exception):
+    """Another strategy of the same race already answered; this one stopped reading."""
+
+# Cancellation flag of the race strategy running on this thread, if any
+_race = threading.local()
+
 class Scanner:
-    def __init__(self, sites_file="data/sites.json"):
-        self.sites = self._load_sites(sites_file)
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0'
-        ]
-
-    def _get_headers(self):
-        return {
-            'User-Agent': random.choice(self.user_agents),
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.google.com/'
-        }
-
-    def _load_sites(self, path):
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+    def __init__(self, sites_file="data/sites.json", max_workers=32, per_host=4, http=None, verbose=True, cache=None,
+                 store=None, github=None, metrics=None, health=None):
+        self.rules = RuleTable.load(sites_file)
+        self.verbose = verbose  # Batch mode turns the console chatter off
+        self.store = store  # Optional IdentityStore: every hit is persisted for cross-target queries
+        self.metrics = metrics or ScanMetrics()  # Per-site timings, statuses and error classes of every probe
+        self.health = health or HostHealth()  # Adaptive timeouts and circuit breakers, per host
+        self.engine = ScanEngine(max_workers=max_workers, per_host=per_host)
+        self._race_workers = max_workers
+        self._race_executor = None  # Strategies of race rules; created on first use
+        self._race_lock = threading.Lock()
+        self._search_memo = {}  # search URL -> Future holding the cleaned result links
+        self._search_lock = threading.Lock()
+        # One pooled client for every handler; keep one socket per allowed in-flight probe
+        self.http = http or HttpClient(pool_maxsize=per_host, cache=cache, host_ttls=self._cache_ttls(),
+                                       limiter=HostRateLimiter(host_rates=self._host_rates()))
+        # Email pivot for GitHub hits; quota-aware and shared by every target of a batch
+        self.github = github or GitHubPivot(self.http)
+
+    def _host_rules(self):
+        """Every rule that talks to a host: top-level rules plus their strategies and fallbacks."""
+        stack = list(self.rules)
+        while stack:
+            rule = stack.pop()
+            stack.extend(rule.strategies)
+            if rule.fallback: stack.append(rule.fallback)
+            if rule.host: yield rule
+
+    def _cache_ttls(self):
+        """hostname -> cache TTL (seconds) from the optional 'cache_ttl' key in sites.json"""
+        ttls = {}
+        for rule in self._host_rules():
+            if "cache_ttl" in rule.options:
+                ttls[rule.host] = rule.options["cache_ttl"]
+        return ttls
+
+    def _host_rates(self):
+        """hostname -> (requests/second, burst) from the optional 'rate_limit' key in sites.json"""
+        rates = {}
+        for rule in self._host_rules():
+            limit = rule.options.get("rate_limit")
+            if limit:
+                rates[rule.host] = (limit["per_second"], limit.get("burst", 1))
+        return rates
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
 
     # --- HELPER: URL CLEANER ---
     def _clean_url(self, url):
@@ -52,179 +103,422 @@ class Scanner:
                 url = url.split("?")[0]
 
             return url
-        except:
+        except Exception:
             return url
 
     # --- SEARCH ENGINE PIVOT ---
-    def _search_duckduckgo(self, query, expected_domain=None):
+    def _fetch_search_results(self, search_url, query, timeout=10, css_class=RESULT_CLASS):
+        """
+        Scans TOP 5 results and returns their cleaned links.
+        Raises when the search itself failed, so the probe counts as unknown rather than a miss.
         """
-        Scans TOP 5 results to find the correct profile link.
+        url = search_url.render(query)
+        # Politeness is handled per host by the HttpClient's rate limiter
+        with self.http.get(url, timeout=timeout, stream=True, max_bytes=MAX_BODY_BYTES) as resp:
+            if resp.status_code != 200:
+                raise SearchFailed(f"Search answered HTTP {resp.status_code}")
+            # Check the top 5 results, not just the first one; stop reading once we have them
+            links = extract_links(self._chunks(resp, MAX_BODY_BYTES), css_class, limit=5, encoding=resp.encoding)
+            return [self._clean_url(href) for href in links]
+
+    def _search_results(self, search_url, query, timeout=10, css_class=RESULT_CLASS):
+        """
+        Memoized search: each query is fetched and parsed once per process.
+        Concurrent callers asking for the same query wait on a single request.
         """
-        url = f"https://html.duckduckgo.com/html/?q={query}"
+        key = search_url.render(query)
+        with self._search_lock:
+            pending = self._search_memo.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self._search_memo[key] = pending
+                if len(self._search_memo) > SEARCH_MEMO_SIZE:
+                    # Forget the oldest query (dicts keep insertion order)
+                    self._search_memo.pop(next(iter(self._search_memo)))
+
+        if not owner:
+            try:
+                return pending.result()
+            except RaceLost:
+                # The fetching strategy lost its own race; that says nothing about this caller's
+                return self._search_results(search_url, query, timeout, css_class)
+
         try:
-            time.sleep(1.5) # Slight delay for politeness
-            resp = requests.get(url, headers=self._get_headers(), timeout=10)
-            
-            if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                results = soup.find_all('a', class_='result__a')
-                
-                # Check the top 5 results, not just the first one
-                for link in results[:5]:
-                    raw_href = link['href']
-                    clean_link = self._clean_url(raw_href)
-                    
-                    # If we are looking for a specific domain (like linkedin), verify it matches
-                    if expected_domain:
-                        if expected_domain in clean_link:
-                            return clean_link
-                    else:
-                        # For generic searches, return the first valid one
-                        return clean_link
-        except Exception:
-            pass
+            links = self._fetch_search_results(search_url, query, timeout, css_class)
+        except Exception as e:
+            # Failed searches are shared with current waiters but retried next time
+            with self._search_lock:
+                if self._search_memo.get(key) is pending:
+                    del self._search_memo[key]
+            pending.set_exception(e)
+            raise
+        pending.set_result(links)
+        return links
+
+    def _search_pivot(self, search_url, query, expected_domain=None, timeout=10, css_class=RESULT_CLASS):
+        """
+        Finds the correct profile link among the top results.
+        expected_domain may be one domain or a tuple of them (checked in order of preference).
+        """
+        links = self._search_results(search_url, query, timeout, css_class)
+        if not expected_domain:
+            # For generic searches, return the first valid one
+            return links[0] if links else None
+
+        domains = (expected_domain,) if isinstance(expected_domain, str) else expected_domain
+        for domain in domains:
+            for link in links:
+                # If we are looking for a specific domain (like linkedin), verify it matches
+                if domain in link:
+                    return link
         return None
 
-    # --- SPECIALIZED HANDLERS ---
+    # --- RULE CHECKS ---
+    # Every site, "hard" targets included, is a compiled SiteRule from sites.json.
+    # Each check returns the profile URL on a hit and None otherwise.
 
-    def _check_linkedin(self, username):
-        # Query: site:linkedin.com/in/username
-        # We pass 'linkedin.com/in' as expected_domain to filter out noise
-        query = f"site:linkedin.com/in/{username}"
-        return self._search_duckduckgo(query, expected_domain="linkedin.com/in")
+    def _probe(self, rule, username):
+        """One instrumented site check (worker thread): returns the profile URL or None, raises on failure."""
+        with self.metrics.trace(rule.name) as trace:
+            result = self._check_rule(rule, username)
+            trace.outcome = PROBE_FOUND if result else PROBE_MISSING
+        return result
 
-    def _check_twitter(self, username):
-        # 1. Try Nitter (Direct)
+    def _check_rule(self, rule, username):
+        """
+        Raises when neither the rule nor its fallback could give an answer either way.
+        A host whose breaker is open is not contacted at all (CircuitOpen), but its fallback still runs.
+        """
+        error = None
         try:
-            nitter_url = f"https://xcancel.com/{username}"
-            resp = requests.get(nitter_url, headers=self._get_headers(), timeout=5)
-            if resp.status_code == 200 and "User not found" not in resp.text:
-                return f"https://x.com/{username}"
-        except:
-            pass
-
-        # 2. Search Pivot (Broadened)
-        query = f"site:twitter.com/{username} OR site:x.com/{username}" 
-        # We accept either domain
-        result = self._search_duckduckgo(query, expected_domain="twitter.com")
-        if not result:
-            result = self._search_duckduckgo(query, expected_domain="x.com")
-            
+            result = self._check_with_health(rule, username)
+        except Exception as e:
+            result, error = None, e
+        if not result and rule.fallback:
+            return self._check_rule(rule.fallback, username)
+        if error:
+            raise error
         return result
 
-    def _check_tiktok(self, username):
-        url = f"https://www.tiktok.com/@{username}"
+    def _check_with_health(self, rule, username):
+        """One check against rule.host, feeding its outcome and response time to the host's breaker."""
+        if rule.host is None:
+            # Race rules talk to no host themselves; each strategy is tracked on its own
+            return self._CHECKS[rule.check_type](self, rule, username)
+        self.health.before(rule.host)
+        trace = active_trace()
+        seen = len(trace.requests) if trace else 0
         try:
-            response = requests.get(url, headers=self._get_headers(), timeout=10)
-            if response.status_code == 200:
-                # Stronger check: Title tag usually contains "Name (@handle) | TikTok"
-                if f"@{username}" in response.text:
-                    return url
-                elif "Couldn't find this account" in response.text:
-                    return None
-        except:
-            pass
-        return None
+            result = self._CHECKS[rule.check_type](self, rule, username)
+        except RaceLost:
+            self.health.release(rule.host)
+            raise  # Abandoned on purpose; says nothing about the host
+        except Exception:
+            if self.health.failure(rule.host):
+                self._log(f"[!] {rule.host} keeps failing; skipping it for a while.")
+            raise
+        # The slowest time to first byte of this check's network requests drives the adaptive timeout
+        # (race strategies share the trace, so only requests to this host count)
+        ttfbs = [r.ttfb for r in trace.requests[seen:]
+                 if r.ttfb is not None and urlparse(r.url).hostname == rule.host] if trace else []
+        self.health.success(rule.host, max(ttfbs) if ttfbs else None)
+        return result
+
+    def _fetch(self, rule, username, status_only=False):
+        """
+        Requests the rule URL, streamed so the body is only read as far as the check needs.
+        status_only probes never download the body (HEAD or hang up, per the rule's status_probe).
+        Returns None (and closes it) when status or redirect target rule it out.
+        Raises SiteUnavailable on throttling and server errors, which say nothing about the account.
+        """
+        timeout = self.health.timeout_for(rule.host, rule.timeout)
+        url = rule.url.render(username)
+        if status_only:
+            response = self.http.status(url, method=rule.status_probe, timeout=timeout)
+        else:
+            response = self.http.get(url, timeout=timeout, stream=True, max_bytes=rule.max_bytes)
+        status = response.status_code
+        if status not in rule.exist_codes and (status == 429 or status >= 500):
+            response.close()
+            raise SiteUnavailable(f"{rule.host} answered HTTP {status}")
+        if status not in rule.exist_codes or \
+                (rule.miss_redirects and any(m in response.url for m in rule.miss_redirects)):
+            response.close()
+            return None
+        return response
+
+    def _check_status(self, rule, username):
+        if self._fetch(rule, username, status_only=True) is None:
+            return None
+        return rule.report_url(username)
+
+    def _check_markers(self, rule, username):
+        """
+        All present/absent markers are matched in one pass; the first one to show up decides.
+        No marker at all: hit only if the rule does not require a present marker.
+        """
+        response = self._fetch(rule, username)
+        if response is None:
+            return None
+        with response:
+            marker = rule.markers_for(username).first(self._chunks(response, rule.max_bytes))
+        if marker is None:
+            found = not rule.present_markers
+        else:
+            found = marker in [m.replace("{}", username) for m in rule.present_markers]
+        return rule.report_url(username) if found else None
 
-    def _check_facebook(self, username):
-        url = f"https://www.facebook.com/{username}"
+    def _check_regex(self, rule, username):
+        response = self._fetch(rule, username)
+        if response is None:
+            return None
+        with response:
+            body, _ = read_capped(self._chunks(response), rule.max_bytes)
+            found = rule.pattern_for(username).search(body)
+        return rule.report_url(username) if found else None
+
+    def _check_search(self, rule, username):
+        query = rule.query.render(username)
+        timeout = self.health.timeout_for(rule.host, rule.timeout)
+        return self._search_pivot(rule.search_url, query, rule.expected_domains or None, timeout, rule.result_class)
+
+    def _check_race(self, rule, username):
+        """
+        Runs the rule's strategies against each other and returns the first hit.
+        Without hedge_after all strategies start at once. With it, the next strategy starts
+        as soon as the running ones have answered without a hit, or once the last one
+        launched has taken hedge_after seconds. When one wins, strategies not yet launched
+        never run and the running ones stop reading their response.
+        No hit: None if any strategy answered, otherwise the first strategy's error is raised.
+        """
+        strategies = list(rule.strategies)
+        cancelled = threading.Event()
+        trace = active_trace()
+        pending = {}
+        errors = []
+        answered = False
+
+        def launch():
+            strategy = strategies.pop(0)
+            pending[self._races().submit(self._run_strategy, strategy, username, cancelled, trace)] = strategy
+
+        launch()
         try:
-            response = requests.get(url, headers=self._get_headers(), timeout=10)
-            if "This content isn't available" in response.text:
-                return None
-            if response.status_code == 200:
-                return url
-        except:
-            pass
-        return None
+            while pending or strategies:
+                if strategies and (not rule.hedge_after or not pending):
+                    launch()
+                    continue
+                done, _ = wait(pending, timeout=rule.hedge_after if strategies else None,
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    launch()  # Hedge: the running strategies are taking too long
+                    continue
+                for future in done:
+                    del pending[future]
+                    error = future.exception()
+                    if error:
+                        errors.append(error)
+                        continue
+                    answered = True
+                    if future.result():
+                        return future.result()
+        finally:
+            cancelled.set()
+        if answered or not errors:
+            return None
+        raise errors[0]
+
+    def _races(self):
+        with self._race_lock:
+            if self._race_executor is None:
+                self._race_executor = ThreadPoolExecutor(max_workers=self._race_workers, thread_name_prefix="race")
+            return self._race_executor
+
+    def _run_strategy(self, strategy, username, cancelled, trace):
+        """One race strategy (race thread): holds its host's slot and reports into the probe's trace."""
+        if cancelled.is_set():
+            raise RaceLost()
+        with attached(trace), self.engine.host_slot(strategy.host):
+            _race.cancelled = cancelled
+            try:
+                return self._check_rule(strategy, username)
+            finally:
+                _race.cancelled = None
+
+    def _chunks(self, response, max_bytes=None):
+        """Streams the body up to max_bytes; a race strategy that has already lost stops reading here."""
+        cancelled = getattr(_race, "cancelled", None)
+        chunk_size = min(CHUNK_SIZE, max_bytes) if max_bytes else CHUNK_SIZE
+        for chunk in capped(response.iter_content(chunk_size), max_bytes):
+            if cancelled is not None and cancelled.is_set():
+                raise RaceLost()
+            yield chunk
+
+    _CHECKS = {
+        "status_code": _check_status,
+        "markers": _check_markers,
+        "regex": _check_regex,
+        "search": _check_search,
+        "race": _check_race,
+    }
 
     # --- MAIN ENGINE ---
 
-    def scan_target(self, username, graph, root_node):
-        print(f"\n[*] Initializing Scan for target: {username}...")
-        print(f"[*] Loaded {len(self.sites)} standard sites to scan.")
-        print("[*] Engaging Search Pivot & Evasion modules...\n")
+    def scan_target(self, username, graph, root_node, rules=None, journal=None, deferred=None):
+        """
+        Probes every rule (or only the given subset of rules) and adds the hits to the graph.
+        journal (e.g. the batch WorkQueue) gets a write_probe() call for every site outcome.
+        With a deferred list, GitHub email pivots are not run: the account nodes they would
+        start from are appended to it instead, for pivot_emails() to handle many targets at once.
+        Returns {site name: PROBE_*} for the pivots that ran off the hits.
+        """
+        rules = self.rules if rules is None else rules
+        self._log(f"\n[*] Initializing Scan for target: {username}...")
+        self._log(f"[*] Loaded {len(rules)} site rules to scan.")
+        self._log("[*] Engaging Search Pivot & Evasion modules...\n")
 
-        # 1. Standard JSON Scans
-        for site in self.sites:
-            site_name = site['name']
-            if site_name in ["Facebook", "Twitter", "X", "TikTok", "LinkedIn"]: continue
+        # Hits registered on the graph are mirrored into the identity store as they happen
+        recorder = self.store.recorder(username) if self.store else None
+        if recorder:
+            graph.add_listener(recorder)
+        try:
+            return self._run_probes(username, graph, root_node, rules, journal, deferred)
+        finally:
+            if recorder:
+                graph.remove_listener(recorder)
+                recorder.close()
 
-            url_template = site['url']
-            target_url = url_template.format(username)
+    def _run_probes(self, username, graph, root_node, rules, journal=None, deferred=None):
+        # Every probe is fired at once; the engine bounds how many run concurrently.
+        # pending maps each future to (kind, rule, parent_node)
+        pending = {}
+        pivots = {}
+        for rule in rules:
+            future = self.engine.submit(rule.host, self._probe, rule, username)
+            pending[future] = ("site", rule, None)
 
-            try:
-                response = requests.get(target_url, headers=self._get_headers(), timeout=5)
-                if response.status_code == 200:
-                    found_node = self._register_hit(graph, root_node, username, site_name, target_url)
-                    if site_name == "GitHub":
-                        self.extract_github_email(username, graph, found_node)
-            except:
-                pass
-            time.sleep(0.5)
-
-        # 2. Hard Target Scans
-        
-        # LinkedIn
-        li = self._check_linkedin(username)
-        if li: self._register_hit(graph, root_node, username, "LinkedIn", li)
-        else: print("[-] LinkedIn: Not found (or unindexed).")
-
-        # X (Twitter)
-        x = self._check_twitter(username)
-        if x: self._register_hit(graph, root_node, username, "X (Twitter)", x)
-        else: print("[-] X (Twitter): Not found.")
-
-        # Facebook
-        fb = self._check_facebook(username)
-        if fb: self._register_hit(graph, root_node, username, "Facebook", fb)
-        else: print("[-] Facebook: Not found or Protected.")
-        
-        # TikTok
-        tt = self._check_tiktok(username)
-        if tt: self._register_hit(graph, root_node, username, "TikTok", tt)
-        else: print("[-] TikTok: Not found.")
+        # Collect results as they land; the graph is only touched from this thread
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, rule, parent = pending.pop(future)
+                error = future.exception()
+                result = None if error else future.result()
+
+                if kind == "github":
+                    pivots[rule.name] = PROBE_UNKNOWN if error else PROBE_FOUND if result else PROBE_MISSING
+                    if result: self._register_email(graph, parent, *result)
+                    elif isinstance(error, (RateLimitExhausted, CircuitOpen)):
+                        self._log(f"[?] GitHub pivot skipped: {error}")
+                    elif error:
+                        self._log(f"[?] GitHub pivot failed ({type(error).__name__}), result unknown.")
+                    else: self._log("[-] No email found in Profile OR Commits.")
+                    continue
+
+                if error:
+                    self._record_probe(username, rule, PROBE_UNKNOWN, journal=journal)
+                    if isinstance(error, CircuitOpen):
+                        self._log(f"[?] {rule.name}: Skipped, {error}. Result unknown.")
+                    else:
+                        self._log(f"[?] {rule.name}: Check failed ({type(error).__name__}), result unknown.")
+                    continue
+                self._record_probe(username, rule, PROBE_FOUND if result else PROBE_MISSING, result, journal)
+                if not result:
+                    # Catalogue sites stay quiet on a miss; the harder checks report it
+                    if rule.check_type != "status_code": self._log(f"[-] {rule.name}: Not found.")
+                    continue
+
+                found_node = self._register_hit(graph, root_node, username, rule.name, result)
+                if rule.pivot == "github_email" and deferred is not None:
+                    deferred.append(found_node)
+                elif rule.pivot == "github_email":
+                    self._log(f"[*] Pivoting: Scanning GitHub profile for emails...")
+                    github_future = self.engine.submit(self.github.host, self._find_github_email, username)
+                    pending[github_future] = ("github", rule, found_node)
+        return pivots
+
+    def _record_probe(self, username, rule, state, url=None, journal=None):
+        # Per-site outcomes (misses included) are what incremental rescans and resumed batches work from
+        if self.store:
+            self.store.write_probe(username, rule.name, state, url)
+        if journal:
+            journal.write_probe(username, rule.name, state, url)
 
     def _register_hit(self, graph, root_node, username, site_name, url):
-        print(f"[+] FOUND: {site_name} -> {url}")
+        self._log(f"[+] FOUND: {site_name} -> {url}")
         new_account = AccountNode(username, site_name, url, source="Scanner")
         graph.add_node(new_account)
         graph.add_edge(root_node, new_account, f"has_account_on_{site_name}")
         return new_account
 
+    def _register_email(self, graph, parent_node, email, source):
+        self._log(f"[!] BINGO! Found email via {source}: {email}")
+        email_node = EmailNode(email, source=source)
+        graph.add_node(email_node)
+        graph.add_edge(parent_node, email_node, "leaked_via_code")
+        return email_node
+
     def extract_github_email(self, username, graph, parent_node):
-        print(f"[*] Pivoting: Scanning GitHub profile for emails...")
-        api_url = f"https://api.github.com/users/{username}"
-        headers = self._get_headers()
-        found_email = None
-        source = "Unknown"
-        
+        self._log(f"[*] Pivoting: Scanning GitHub profile for emails...")
         try:
-            resp = requests.get(api_url, headers=headers)
-            if resp.status_code == 200 and resp.json().get("email"):
-                found_email = resp.json().get("email")
-                source = "GitHub Profile"
-            
-            if not found_email:
-                events_url = f"https://api.github.com/users/{username}/events/public"
-                events = requests.get(events_url, headers=headers).json()
-                if isinstance(events, list):
-                    for event in events:
-                        if event["type"] == "PushEvent":
-                            for commit in event.get("payload", {}).get("commits", []):
-                                email = commit.get("author", {}).get("email")
-                                if email and "noreply" not in email:
-                                    found_email = email
-                                    source = "GitHub Commit History"
-                                    break
-                        if found_email: break
-
-            if found_email:
-                print(f"[!] BINGO! Found email via {source}: {found_email}")
-                email_node = EmailNode(found_email, source=source)
-                graph.add_node(email_node)
-                graph.add_edge(parent_node, email_node, "leaked_via_code")
-            else:
-                print("[-] No email found in Profile OR Commits.")
-        except:
-            pass
+            found = self._find_github_email(username)
+        except (RateLimitExhausted, CircuitOpen) as e:
+            self._log(f"[?] GitHub pivot skipped: {e}")
+            return
+        except Exception as e:
+            self._log(f"[?] GitHub pivot failed ({type(e).__name__}), result unknown.")
+            return
+        if found:
+            self._register_email(graph, parent_node, *found)
+        else:
+            self._log("[-] No email found in Profile OR Commits.")
+
+    def pivot_emails(self, pending):
+        """
+        Runs the GitHub pivots scan_target() deferred, for many targets at once, through the
+        quota-aware scheduler. pending: [(username, graph, account node)]; emails found are
+        added to each graph (and mirrored into the identity store).
+        Returns the usernames whose pivot was left for later because the quota ran out.
+        """
+        usernames = list(dict.fromkeys(username for username, _, _ in pending))
+        self._log(f"[*] Pivoting: Scanning GitHub profiles for the emails of {len(usernames)} targets...")
+        found, failed, deferred = self.github.find_emails(usernames, call=self._github_lookup)
+        for username, graph, account in pending:
+            if username in found:
+                recorder = self.store.recorder(username) if self.store else None
+                if recorder:
+                    graph.add_listener(recorder, replay=False)
+                try:
+                    self._register_email(graph, account, *found[username])
+                finally:
+                    if recorder:
+                        graph.remove_listener(recorder)
+                        recorder.close()
+            elif isinstance(failed.get(username), CircuitOpen):
+                self._log(f"[?] GitHub pivot for {username} skipped: {failed[username]}")
+            elif username in failed:
+                self._log(f"[?] GitHub pivot for {username} failed ({type(failed[username]).__name__}), result unknown.")
+        if deferred:
+            self._log(f"[?] GitHub quota spent: {len(deferred)} pivots left for later.")
+        return deferred
+
+    def _find_github_email(self, username):
+        """Returns (email, source) from the GitHub profile or commit history, or None."""
+        return self._github_lookup(self.github.find_email, username)
+
+    def _github_lookup(self, lookup, username):
+        """Runs one GitHubPivot lookup (returning (email, ...) or None) under the breaker and a metrics trace."""
+        with self.metrics.trace("GitHub API") as trace:
+            self.health.before(self.github.host)
+            try:
+                found = lookup(username)
+            except RateLimitExhausted:
+                self.health.release(self.github.host)
+                raise  # Out of quota, not a failing host
+            except Exception:
+                self.health.failure(self.github.host)
+                raise
+            self.health.success(self.github.host)
+            trace.outcome = PROBE_FOUND if found and found[0] else PROBE_MISSING
+        return found
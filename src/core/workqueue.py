@@ -0,0 +1,180 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# Seconds a claimed target stays reserved; its worker renews it every third of that
+LEASE_SECONDS = 120
+
+# A target whose lease ran out this many times is given up on (it keeps killing workers)
+MAX_ATTEMPTS = 3
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """
+    Durable batch work queue backed by SQLite.
+    Every target is a job that a worker claims under a time-limited lease, and
+    every site check of a claimed target is journaled as it finishes. A worker
+    that crashes simply stops renewing its leases: once they run out, any worker
+    sharing the file claims those targets again and only probes the sites that
+    have no final answer yet. Finished records are kept, so a restart never
+    rescans a completed target.
+    Several processes can share one queue file (SQLite locking keeps claims
+    exclusive); across machines the file must live on a filesystem with working
+    locks, which rules out most NFS setups.
+    """
+    def __init__(self, path=".cache/work_queue.sqlite", lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS,
+                 clock=time.time):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.clock = clock
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit mode: claims open their own write transaction (BEGIN IMMEDIATE)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                target TEXT NOT NULL UNIQUE,
+                state TEXT NOT NULL,
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                record TEXT,
+                added REAL NOT NULL,
+                finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS probes (
+                target TEXT NOT NULL,
+                site TEXT NOT NULL,
+                state TEXT NOT NULL,
+                url TEXT,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (target, site)
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, seq);
+        """)
+
+    # --- PRODUCER ---
+
+    def add(self, targets):
+        """Enqueues targets in order; ones already queued (in any state) are left alone. Returns how many were new."""
+        now = self.clock()
+        added = 0
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for target in targets:
+                    cursor = self._db.execute(
+                        "INSERT OR IGNORE INTO jobs (target, state, added) VALUES (?, ?, ?)", (target, PENDING, now))
+                    added += cursor.rowcount
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return added
+
+    # --- WORKERS ---
+
+    def claim(self, worker):
+        """Leases the oldest pending (or abandoned) target to worker. Returns the target, or None."""
+        now = self.clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Abandoned leases that already had their chances are given up on
+                self._db.execute(
+                    "UPDATE jobs SET state = ?, finished = ?, record = ? "
+                    "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, now, None, LEASED, now, self.max_attempts))
+                row = self._db.execute(
+                    "SELECT target FROM jobs WHERE state = ? OR (state = ? AND lease_until < ?) ORDER BY seq LIMIT 1",
+                    (PENDING, LEASED, now)).fetchone()
+                if row:
+                    self._db.execute(
+                        "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                        "WHERE target = ?", (LEASED, worker, now + self.lease, row[0]))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return row[0] if row else None
+
+    def renew(self, target, worker):
+        """Extends worker's lease on target. Returns False when the lease was lost to another worker."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE target = ? AND state = ? AND worker = ?",
+                (self.clock() + self.lease, target, LEASED, worker))
+        return cursor.rowcount == 1
+
+    def write_probe(self, target, site, state, url=None):
+        """Journals one site check of target ("found", "missing" or "unknown"); same shape as IdentityStore."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?)",
+                             (target, site, state, url, self.clock()))
+
+    def probe_states(self, target):
+        """site -> (state, url, checked_at) journaled for target so far."""
+        with self._lock:
+            rows = self._db.execute("SELECT site, state, url, checked_at FROM probes WHERE target = ?",
+                                    (target,)).fetchall()
+        return {site: (state, url, checked_at) for site, state, url, checked_at in rows}
+
+    def complete(self, target, worker, record, failed=False):
+        """
+        Stores target's finished record. Returns False (and stores nothing) when worker
+        no longer holds the lease: whoever took it over owns the result.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET state = ?, record = ?, finished = ?, lease_until = NULL "
+                "WHERE target = ? AND state = ? AND worker = ?",
+                (FAILED if failed else DONE, json.dumps(record), self.clock(), target, LEASED, worker))
+        return cursor.rowcount == 1
+
+    def release(self, worker):
+        """Hands every target worker holds back to the queue (on a clean abort). Journaled probes are kept."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE state = ? AND worker = ?", (PENDING, LEASED, worker))
+        return cursor.rowcount
+
+    def next_expiry(self):
+        """Earliest time a lease held by some worker runs out, or None when nothing is leased."""
+        with self._lock:
+            return self._db.execute("SELECT MIN(lease_until) FROM jobs WHERE state = ?", (LEASED,)).fetchone()[0]
+
+    # --- INSPECTION ---
+
+    def counts(self):
+        """state -> number of targets."""
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def records(self):
+        """Yields the stored record of every finished target, in queue order."""
+        with self._lock:
+            rows = self._db.execute("SELECT target, state, record FROM jobs WHERE state IN (?, ?) ORDER BY seq",
+                                    (DONE, FAILED)).fetchall()
+        for target, state, record in rows:
+            # Targets given up on after repeated crashes never got a record
+            yield json.loads(record) if record else {"target": target, "error": "Abandoned after repeated crashes"}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
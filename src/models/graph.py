@@ -1,11 +1,33 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+from collections import deque
 
 class IdentityGraph:
     def __init__(self):
         self.nodes = {} # Dictionary of nodes
         self.root = None
-        self.edges = [] # List of tuples (node_a, node_b, relationship)
+        self.edges = [] # List of tuples (node_a, node_b, relationship), no duplicates
+
+        # --- INDEXES ---
+        self._edge_keys = set()  # (src_id, dst_id, relationship)
+        self._adjacency = {}     # node_id -> [(neighbor_id, relationship, outgoing)] in insertion order
+        self._by_type = {}       # node type -> [node_id]
+        self._layout = None      # GraphLayout, created on first visualize()
+        self._listeners = []     # Sinks told about every new node/edge (exporters, stores)
+
+    def add_listener(self, listener, replay=True):
+        """
+        Registers a sink with on_node(node, is_root) and on_edge(node_a, node_b, relationship).
+        With replay, what the graph already holds is sent first so the sink sees the full graph.
+        """
+        if replay:
+            for node in self.nodes.values():
+                listener.on_node(node, node is self.root)
+            for node_a, node_b, relationship in self.edges:
+                listener.on_edge(node_a, node_b, relationship)
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
 
     def set_root(self, node):
         self.root = node
@@ -16,81 +38,137 @@ class IdentityGraph:
         node_id = node.id
         if node_id not in self.nodes:
             self.nodes[node_id] = node
+            self._adjacency[node_id] = []
+            self._by_type.setdefault(node.type, []).append(node_id)
+            for listener in self._listeners:
+                listener.on_node(node, node is self.root)
 
     def add_edge(self, node_a, node_b, relationship="connected_to"):
-        # Store the relationship for the visualizer
-        self.edges.append((node_a, node_b, relationship))
-        
+        """Adds a directed edge once; returns False if (a, b, relationship) already exists."""
+        key = (node_a.id, node_b.id, relationship)
+        if key in self._edge_keys:
+            return False
+
         # Ensure both nodes are in our registry
         self.add_node(node_a)
         self.add_node(node_b)
 
+        # Store the relationship for the visualizer
+        self._edge_keys.add(key)
+        self.edges.append((node_a, node_b, relationship))
+        self._adjacency[node_a.id].append((node_b.id, relationship, True))
+        if node_b.id != node_a.id:
+            self._adjacency[node_b.id].append((node_a.id, relationship, False))
+        for listener in self._listeners:
+            listener.on_edge(node_a, node_b, relationship)
+        return True
+
+    def has_edge(self, node_a, node_b, relationship="connected_to"):
+        return (node_a.id, node_b.id, relationship) in self._edge_keys
+
+    # --- QUERIES ---
+
+    def neighbors(self, node_id, direction="both"):
+        """
+        Nodes linked to node_id. direction: "out" (node_id -> n), "in" (n -> node_id) or "both".
+        Each neighbor is returned once, in the order its first edge was added.
+        """
+        seen = set()
+        result = []
+        for neighbor_id, _, outgoing in self._adjacency.get(node_id, ()):
+            if direction == "out" and not outgoing: continue
+            if direction == "in" and outgoing: continue
+            if neighbor_id not in seen:
+                seen.add(neighbor_id)
+                result.append(self.nodes[neighbor_id])
+        return result
+
+    def out_edges(self, node_id):
+        """[(neighbor_node, relationship)] for every edge leaving node_id."""
+        return [(self.nodes[neighbor_id], rel) for neighbor_id, rel, outgoing in self._adjacency.get(node_id, ()) if outgoing]
+
+    def nodes_by_type(self, node_type):
+        return [self.nodes[node_id] for node_id in self._by_type.get(node_type, ())]
+
+    def path_to_root(self, node_id):
+        """
+        Shortest chain of nodes from the root to node_id (both included), e.g.
+        [Person, Account, Email]. Returns [] when node_id is unknown or unreachable.
+        """
+        if not self.root or node_id not in self.nodes:
+            return []
+        parents = {node_id: None}
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            if current == self.root.id:
+                path = []
+                while current is not None:
+                    path.append(self.nodes[current])
+                    current = parents[current]
+                return path
+            for neighbor_id, _, _ in self._adjacency[current]:
+                if neighbor_id not in parents:
+                    parents[neighbor_id] = current
+                    queue.append(neighbor_id)
+        return []
+
+    def subgraph(self, node_types, keep_root=True):
+        """
+        New IdentityGraph holding only nodes of the given type(s) and the edges between them.
+        The root is kept (when keep_root) so the result still has an anchor to traverse from.
+        """
+        if isinstance(node_types, str):
+            node_types = (node_types,)
+        sub = IdentityGraph()
+        if keep_root and self.root:
+            sub.set_root(self.root)
+        for node_type in node_types:
+            for node in self.nodes_by_type(node_type):
+                sub.add_node(node)
+        for u, v, rel in self.edges:
+            if u.id in sub.nodes and v.id in sub.nodes:
+                sub.add_edge(u, v, rel)
+        return sub
+
     def bfs_traversal(self):
         # Your existing print logic (keep this)
         if not self.root:
             return
         
-        queue = [(self.root, 0)]
+        queue = deque([(self.root, 0)])
         visited = set()
         visited.add(self.root.id)
 
         print(f"[+] Starting Graph Traversal from: {self.root.label}")
         
         while queue:
-            current_node, level = queue.pop(0)
+            current_node, level = queue.popleft()
             prefix = "  " * level + "└── "
             print(f"{prefix}[{current_node.type}] {current_node.label}")
 
-            # Find neighbors based on edges
-            for u, v, rel in self.edges:
-                neighbor = None
-                if u.id == current_node.id: neighbor = v
-                elif v.id == current_node.id: neighbor = u
-                
-                if neighbor and neighbor.id not in visited:
-                    visited.add(neighbor.id)
-                    queue.append((neighbor, level + 1))
+            # Neighbors come straight from the adjacency index: O(V + E) overall
+            for neighbor_id, _, _ in self._adjacency[current_node.id]:
+                if neighbor_id not in visited:
+                    visited.add(neighbor_id)
+                    queue.append((self.nodes[neighbor_id], level + 1))
 
     # --- NEW VISUALIZATION ENGINE ---
     def visualize(self, filename="footprint_map.png"):
         """
-        Generates a PNG image of the attack surface using NetworkX.
+        Draws the attack surface. A .svg filename is written directly (no plotting
+        library needed); anything else goes through matplotlib.
+        Node positions are cached, so re-rendering after a scan grows only places new nodes.
         """
-        G = nx.Graph()
-        color_map = []
-        labels = {}
-
-        # 1. Add Nodes
-        for node_id, node in self.nodes.items():
-            G.add_node(node_id)
-            labels[node_id] = node.label
-            
-            # Color Coding based on Node Type
-            if node.type == "Person":
-                color_map.append('#ff4d4d') # Red (Target)
-            elif node.type == "Email":
-                color_map.append('#ffcc00') # Yellow (High Value)
-            else:
-                color_map.append('#4d94ff') # Blue (Accounts)
-
-        # 2. Add Edges
-        for u, v, rel in self.edges:
-            G.add_edge(u.id, v.id)
+        from src.models.layout import GraphLayout, write_image, write_svg
 
-        # 3. Draw
-        plt.figure(figsize=(10, 8))
-        pos = nx.spring_layout(G, seed=42) # Spring layout for "spiderweb" look
-        
-        nx.draw(G, pos, 
-                node_color=color_map, 
-                with_labels=True, 
-                labels=labels,
-                node_size=3000, 
-                font_size=10,
-                font_weight='bold',
-                edge_color='gray')
-        
-        plt.title(f"Digital Footprint Map: {self.root.label}", fontsize=15)
-        plt.savefig(filename)
+        if self._layout is None:
+            self._layout = GraphLayout()
+        positions = self._layout.compute(self)
+
+        title = f"Digital Footprint Map: {self.root.label}" if self.root else "Digital Footprint Map"
+        if filename.lower().endswith(".svg"):
+            write_svg(self, positions, filename, title=title)
+        else:
+            write_image(self, positions, filename, title=title)
         print(f"\n[+] Visualization saved to: {filename}")
-        plt.close()
@@ -0,0 +1,264 @@
+import math
+import random
+from collections import deque
+from xml.sax.saxutils import escape
+
+# Color Coding based on Node Type
+NODE_COLORS = {
+    "Person": '#ff4d4d',  # Red (Target)
+    "Email": '#ffcc00',   # Yellow (High Value)
+}
+DEFAULT_COLOR = '#4d94ff'  # Blue (Accounts)
+
+# Angle between consecutive children placed incrementally (golden angle keeps them spread)
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+def node_color(node):
+    return NODE_COLORS.get(node.type, DEFAULT_COLOR)
+
+class GraphLayout:
+    """
+    Places the nodes of an IdentityGraph on a plane.
+
+    Scan graphs are star/tree shaped, so they get a radial layout from the root:
+    one ring per BFS level, each subtree owning an angular slice sized by its
+    leaf count. That is O(V + E). Only small graphs with cross links (cycles)
+    get a force-directed pass. Positions are cached per node id: a re-render
+    after new nodes keeps existing nodes still and only places the new ones.
+    """
+    FORCE_MAX_NODES = 150
+    RING = 1.0  # Distance between BFS levels
+
+    def __init__(self):
+        self.positions = {}  # node_id -> (x, y)
+        self._angles = {}    # node_id -> (angle, slice width) for radial placement
+        self._children = {}  # node_id -> number of children placed so far
+        self._centers = {}   # node_id -> (x, y) of the component root its rings are centered on
+
+    def compute(self, graph):
+        """Returns {node_id: (x, y)} for every node of the graph."""
+        new_ids = [node_id for node_id in graph.nodes if node_id not in self.positions]
+        if not new_ids:
+            return self.positions
+
+        parents, order = self._bfs_tree(graph)
+        if self._wants_force(graph):
+            self._force_directed(graph, new_ids)
+        elif not self.positions:
+            self._radial(graph, parents, order)
+        else:
+            self._place_incremental(parents, order, new_ids)
+        return self.positions
+
+    def _wants_force(self, graph):
+        # A tree has exactly V - 1 edges; anything beyond that is a cross link
+        return len(graph.nodes) <= self.FORCE_MAX_NODES and len(graph.edges) > len(graph.nodes) - 1
+
+    def _bfs_tree(self, graph):
+        """Spanning tree from the root (and from every other component): parents + BFS order."""
+        parents = {}
+        order = []
+        starts = ([graph.root.id] if graph.root else []) + list(graph.nodes)
+        for start in starts:
+            if start in parents:
+                continue
+            parents[start] = None
+            queue = deque([start])
+            while queue:
+                current = queue.popleft()
+                order.append(current)
+                for neighbor in graph.neighbors(current):
+                    if neighbor.id not in parents:
+                        parents[neighbor.id] = current
+                        queue.append(neighbor.id)
+        return parents, order
+
+    # --- RADIAL (HIERARCHICAL) LAYOUT ---
+
+    def _radial(self, graph, parents, order):
+        children = {}
+        for node_id in order:
+            parent = parents[node_id]
+            if parent is not None:
+                children.setdefault(parent, []).append(node_id)
+
+        # Leaf counts decide how much of the circle each subtree gets
+        leaves = {}
+        for node_id in reversed(order):
+            leaves[node_id] = sum(leaves[c] for c in children.get(node_id, ())) or 1
+
+        roots = [node_id for node_id in order if parents[node_id] is None]
+        total = sum(leaves[r] for r in roots)
+        start = 0.0
+        for offset, root_id in enumerate(roots):
+            width = 2 * math.pi * leaves[root_id] / total
+            # Extra components are shifted sideways so they do not sit on top of the main one
+            self._assign(root_id, start + width / 2, width, 0, (offset * 4 * self.RING, 0.0))
+            stack = [(root_id, start, 0)]
+            while stack:
+                node_id, slice_start, depth = stack.pop()
+                kids = children.get(node_id, ())
+                self._children[node_id] = len(kids)
+                cursor = slice_start
+                for kid in kids:
+                    kid_width = 2 * math.pi * leaves[kid] / total
+                    self._assign(kid, cursor + kid_width / 2, kid_width, depth + 1, self.positions[root_id])
+                    stack.append((kid, cursor, depth + 1))
+                    cursor += kid_width
+            start += width
+
+    def _assign(self, node_id, angle, width, depth, center):
+        radius = depth * self.RING
+        self.positions[node_id] = (center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle))
+        self._angles[node_id] = (angle, width)
+        self._centers[node_id] = center
+
+    def _place_incremental(self, parents, order, new_ids):
+        new = set(new_ids)
+        for node_id in order:
+            if node_id not in new:
+                continue
+            parent = parents[node_id]
+            if parent is None:
+                # New component: park it to the right of everything placed so far
+                max_x = max((x for x, _ in self.positions.values()), default=0.0)
+                self.positions[node_id] = (max_x + 2 * self.RING, 0.0)
+                self._angles[node_id] = (0.0, 2 * math.pi)
+                self._centers[node_id] = self.positions[node_id]
+                self._children[node_id] = 0
+                continue
+
+            p_angle, p_width = self._angles[parent]
+            px, py = self.positions[parent]
+            k = self._children.get(parent, 0)
+            self._children[parent] = k + 1
+            # Spread children over the parent's slice with the golden angle
+            angle = p_angle + ((k * GOLDEN_ANGLE) % p_width) - p_width / 2
+            width = p_width / (k + 2)
+            # One ring further out than the parent, on the rings of the parent's component
+            cx, cy = self._centers.get(parent, (0.0, 0.0))
+            radius = math.hypot(px - cx, py - cy) + self.RING
+            self.positions[node_id] = (cx + radius * math.cos(angle), cy + radius * math.sin(angle))
+            self._angles[node_id] = (angle, width)
+            self._centers[node_id] = (cx, cy)
+            self._children[node_id] = 0
+
+    # --- FORCE-DIRECTED (small graphs only) ---
+
+    def _force_directed(self, graph, new_ids, iterations=200):
+        """Fruchterman-Reingold; cached nodes stay pinned, new nodes move."""
+        rng = random.Random(42)
+        ids = list(graph.nodes)
+        pos = {node_id: list(self.positions.get(node_id) or (rng.uniform(-1, 1), rng.uniform(-1, 1))) for node_id in ids}
+        movable = set(new_ids)
+        k = math.sqrt(4.0 / len(ids))
+        temperature = 0.2
+        links = [(u.id, v.id) for u, v, _ in graph.edges]
+
+        for _ in range(iterations):
+            disp = {node_id: [0.0, 0.0] for node_id in movable}
+            for a in movable:
+                ax, ay = pos[a]
+                for b in ids:
+                    if a == b: continue
+                    dx, dy = ax - pos[b][0], ay - pos[b][1]
+                    dist = math.hypot(dx, dy) or 0.01
+                    force = k * k / dist
+                    disp[a][0] += dx / dist * force
+                    disp[a][1] += dy / dist * force
+            for u, v in links:
+                dx, dy = pos[u][0] - pos[v][0], pos[u][1] - pos[v][1]
+                dist = math.hypot(dx, dy) or 0.01
+                force = dist * dist / k
+                if u in movable:
+                    disp[u][0] -= dx / dist * force
+                    disp[u][1] -= dy / dist * force
+                if v in movable:
+                    disp[v][0] += dx / dist * force
+                    disp[v][1] += dy / dist * force
+            for node_id in movable:
+                dx, dy = disp[node_id]
+                length = math.hypot(dx, dy) or 0.01
+                step = min(length, temperature)
+                pos[node_id][0] += dx / length * step
+                pos[node_id][1] += dy / length * step
+            temperature *= 0.98
+
+        for node_id in ids:
+            self.positions[node_id] = tuple(pos[node_id])
+            self._angles.setdefault(node_id, (math.atan2(pos[node_id][1], pos[node_id][0]), math.pi / 4))
+
+# --- RENDERERS ---
+
+def _canvas_size(count):
+    # Canvas grows with sqrt(N) so node density stays readable
+    return max(800, int(300 * math.sqrt(count)))
+
+def write_svg(graph, positions, filename, title=None):
+    """Streams the graph out as SVG. Needs no plotting library."""
+    size = _canvas_size(len(graph.nodes))
+    xs = [x for x, _ in positions.values()] or [0.0]
+    ys = [y for _, y in positions.values()] or [0.0]
+    span = max(max(xs) - min(xs), max(ys) - min(ys)) or 1.0
+    margin = 60
+    scale = (size - 2 * margin) / span
+    min_x, min_y = min(xs), min(ys)
+    radius = max(4, min(28, 400 / math.sqrt(len(graph.nodes) or 1)))
+    show_labels = len(graph.nodes) <= 500
+
+    def point(node_id):
+        x, y = positions[node_id]
+        return margin + (x - min_x) * scale, margin + (y - min_y) * scale
+
+    with open(filename, "w") as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+                f'viewBox="0 0 {size} {size}" font-family="sans-serif">\n')
+        f.write('<rect width="100%" height="100%" fill="white"/>\n')
+        if title:
+            f.write(f'<text x="{size / 2:.0f}" y="30" text-anchor="middle" font-size="20">{escape(title)}</text>\n')
+        f.write('<g stroke="gray" stroke-width="1">\n')
+        for u, v, _ in graph.edges:
+            (x1, y1), (x2, y2) = point(u.id), point(v.id)
+            f.write(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+        f.write('</g>\n<g>\n')
+        for node_id, node in graph.nodes.items():
+            x, y = point(node_id)
+            f.write(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius:.1f}" fill="{node_color(node)}">'
+                    f'<title>{escape(str(node.label))}</title></circle>\n')
+            if show_labels:
+                f.write(f'<text x="{x:.1f}" y="{y + radius + 12:.1f}" text-anchor="middle" font-size="11">'
+                        f'{escape(str(node.label))}</text>\n')
+        f.write('</g>\n</svg>\n')
+
+def write_image(graph, positions, filename, title=None):
+    """Raster output through matplotlib, drawn with collections so cost stays linear."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    count = len(graph.nodes)
+    # Raster memory grows with the square of the side, so cap it; SVG is the format for huge graphs
+    inches = min(30, max(10, _canvas_size(count) / 80))
+    fig, ax = plt.subplots(figsize=(inches, inches * 0.8))
+    segments = [(positions[u.id], positions[v.id]) for u, v, _ in graph.edges]
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.8, zorder=1))
+
+    ids = list(graph.nodes)
+    node_size = max(30, min(3000, 60000 / max(count, 1)))
+    ax.scatter([positions[i][0] for i in ids], [positions[i][1] for i in ids],
+               s=node_size, c=[node_color(graph.nodes[i]) for i in ids], zorder=2)
+    if count <= 200:
+        font_size = 10 if count <= 30 else 7
+        for node_id in ids:
+            x, y = positions[node_id]
+            ax.text(x, y, graph.nodes[node_id].label, fontsize=font_size, fontweight='bold',
+                    ha='center', va='center', zorder=3)
+
+    ax.set_axis_off()
+    ax.set_aspect('equal')
+    ax.autoscale_view()
+    if title:
+        ax.set_title(title, fontsize=15)
+    fig.savefig(filename, bbox_inches='tight')
+    plt.close(fig)
@@ -1,22 +1,49 @@
-import json
+import sys
+import time
 from datetime import datetime
 
 class OSINTNode:
     """
     Base class for all nodes in the Identity Graph.
     Implements a Directed Graph structure.
+
+    Nodes are slotted and keep only what they need: the edge set and the
+    properties dict are allocated on first use, repeated strings (source,
+    platform) are interned and the timestamp is stored as epoch seconds.
     """
+    __slots__ = ("id", "source", "created", "_edges", "_properties")
+
+    # --- VISUALIZATION ATTRIBUTES ---
+    # Required by graph.py to draw the node correctly (shared per class, not per node)
+    type = "Node"
+
     def __init__(self, value, source="Unknown"):
         self.id = value  # Unique identifier (e.g., username, email)
-        self.source = source  # Where we found this info
-        self.timestamp = datetime.now().isoformat()
-        self.edges = set()  # Adjacency List: Stores connected nodes
-        self.properties = {} # Extra data (bio, followers, etc.)
-        
-        # --- VISUALIZATION ATTRIBUTES ---
-        # These are required by graph.py to draw the node correctly
-        self.label = value 
-        self.type = "Node" 
+        self.source = sys.intern(source)  # Where we found this info
+        self.created = time.time()  # Formatted only when someone asks for .timestamp
+        self._edges = None  # Adjacency List: Stores connected nodes
+        self._properties = None  # Extra data (bio, followers, etc.)
+
+    @property
+    def label(self):
+        # Every node type displays its unique id in its bubble
+        return self.id
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self.created).isoformat()
+
+    @property
+    def edges(self):
+        if self._edges is None:
+            self._edges = set()
+        return self._edges
+
+    @property
+    def properties(self):
+        if self._properties is None:
+            self._properties = {}
+        return self._properties
 
     def connect(self, node, relation):
         """
@@ -33,7 +60,7 @@ class OSINTNode:
             "id": self.id,
             "source": self.source,
             "label": self.label,
-            "edges": [(n.id, rel) for n, rel in self.edges]
+            "edges": [(n.id, rel) for n, rel in (self._edges or ())]
         }
 
     def __repr__(self):
@@ -44,35 +71,63 @@ class OSINTNode:
 
 class PersonNode(OSINTNode):
     """Represents the real human target."""
+    __slots__ = ("risk_score",)
+    type = "Person"  # Display name (the id) goes in the red bubble
+
     def __init__(self, name, source="Input"):
         super().__init__(name, source)
         self.risk_score = 0
-        
-        # Specifics for Visualization
-        self.type = "Person"
-        self.label = name  # Display name in the red bubble
 
 class AccountNode(OSINTNode):
     """Represents an account on a specific platform."""
+    __slots__ = ("platform", "url")
+    type = "Account"  # "platform:username" goes in the blue bubble
+
     def __init__(self, username, platform, url, source):
         # Create a unique ID so it doesn't clash with the PersonNode
         unique_id = f"{platform}:{username}"
-        
+
         super().__init__(unique_id, source)
-        self.platform = platform
+        self.platform = sys.intern(platform)
         self.url = url
-        self.properties["url"] = url
-        
-        # Specifics for Visualization
-        self.type = "Account"
-        self.label = f"{platform}:{username}"  # Display name in the blue bubble
+
+    @property
+    def properties(self):
+        # The URL lives in self.url; only materialize the dict view when asked for it
+        if self._properties is None:
+            self._properties = {"url": self.url}
+        return self._properties
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["platform"] = self.platform
+        data["url"] = self.url
+        return data
 
 class EmailNode(OSINTNode):
     """Represents an email address."""
+    __slots__ = ("leaked",)
+    type = "Email"  # The address goes in the yellow bubble
+
     def __init__(self, email, source):
         super().__init__(email, source)
         self.leaked = False  # Placeholder for Breach Check logic
-        
-        # Specifics for Visualization
-        self.type = "Email"
-        self.label = email  # Display name in the yellow bubble
+
+
+def node_from_dict(data):
+    """Rebuilds a node from to_dict() output (the inverse used by the graph loaders)."""
+    node_type = data.get("type") or "OSINTNode"
+    source = data.get("source") or "Unknown"
+    if node_type == "AccountNode":
+        platform = data["platform"]
+        username = data["id"][len(platform) + 1:]
+        node = AccountNode(username, platform, data.get("url"), source)
+    elif node_type == "PersonNode":
+        node = PersonNode(data["id"], source)
+    elif node_type == "EmailNode":
+        node = EmailNode(data["id"], source)
+    else:
+        node = OSINTNode(data["id"], source)
+    if data.get("created") is not None:
+        node.created = float(data["created"])
+    return node
@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import threading
+import time
+from src.models.graph import IdentityGraph
+from src.models.node import node_from_dict
+
+# Seconds a write waits for another process' transaction before giving up
+BUSY_TIMEOUT = 30
+
+class IdentityStore:
+    """
+    Persistent identity store backed by SQLite.
+    Every scan's nodes and edges are kept per target, with indexes on node id,
+    type, platform and email, so questions like "which targets share this email"
+    are answered from disk without rescanning or reading old reports.
+    """
+    def __init__(self, path=".cache/identity.sqlite"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Several scanner processes may share the store: wait out each other's (short) writes
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS targets (
+                name TEXT PRIMARY KEY,
+                first_scanned REAL NOT NULL,
+                last_scanned REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS nodes (
+                target TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                platform TEXT,
+                email TEXT,
+                url TEXT,
+                source TEXT,
+                is_root INTEGER NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (target, node_id)
+            );
+            CREATE TABLE IF NOT EXISTS edges (
+                target TEXT NOT NULL,
+                src TEXT NOT NULL,
+                dst TEXT NOT NULL,
+                rel TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (target, src, dst, rel)
+            );
+            CREATE TABLE IF NOT EXISTS probes (
+                target TEXT NOT NULL,
+                site TEXT NOT NULL,
+                state TEXT NOT NULL,
+                url TEXT,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (target, site)
+            );
+            CREATE INDEX IF NOT EXISTS idx_nodes_id ON nodes(node_id);
+            CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(type);
+            CREATE INDEX IF NOT EXISTS idx_nodes_platform ON nodes(platform);
+            CREATE INDEX IF NOT EXISTS idx_nodes_email ON nodes(email);
+        """)
+        self._db.commit()
+
+    # --- WRITES ---
+
+    def recorder(self, target):
+        """Graph listener that writes everything added to the graph under `target`."""
+        return StoreRecorder(self, target)
+
+    def touch_target(self, target, when=None):
+        when = when or time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO targets VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE SET last_scanned = excluded.last_scanned",
+                (target, when, when))
+            self._db.commit()
+
+    def write_node(self, target, node, is_root=False):
+        platform = getattr(node, "platform", None)
+        email = node.id.lower() if node.type == "Email" else None
+        with self._lock:
+            self._db.execute("""
+                INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(target, node_id) DO UPDATE SET
+                    url = excluded.url, source = excluded.source, last_seen = excluded.last_seen
+            """, (target, node.id, node.type, platform, email, getattr(node, "url", None),
+                  node.source, int(is_root), node.created, time.time()))
+            self._db.commit()
+
+    def write_edge(self, target, node_a, node_b, relationship):
+        with self._lock:
+            self._db.execute("""
+                INSERT INTO edges VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(target, src, dst, rel) DO UPDATE SET last_seen = excluded.last_seen
+            """, (target, node_a.id, node_b.id, relationship, time.time()))
+            self._db.commit()
+
+    def write_probe(self, target, site, state, url=None):
+        """Outcome of one site check for a target: "found", "missing" or "unknown" (the check failed)."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?)",
+                             (target, site, state, url, time.time()))
+            self._db.commit()
+
+    def remove_nodes(self, target, node_ids):
+        """Forgets nodes (and their edges) that a rescan showed are gone."""
+        with self._lock:
+            for node_id in node_ids:
+                self._db.execute("DELETE FROM nodes WHERE target = ? AND node_id = ?", (target, node_id))
+                self._db.execute("DELETE FROM edges WHERE target = ? AND (src = ? OR dst = ?)",
+                                 (target, node_id, node_id))
+            self._db.commit()
+
+    def commit(self):
+        with self._lock:
+            self._db.commit()
+
+    def save_graph(self, target, graph):
+        """Stores a whole in-memory graph at once (for graphs built without a recorder)."""
+        recorder = self.recorder(target)
+        graph.add_listener(recorder)
+        graph.remove_listener(recorder)
+        recorder.close()
+
+    # --- CORRELATION QUERIES ---
+
+    def targets(self):
+        """Every stored target, most recently scanned first."""
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM targets ORDER BY last_scanned DESC").fetchall()
+        return [row[0] for row in rows]
+
+    def targets_with_node(self, node_id):
+        """Targets whose graph contains node_id (e.g. 'GitHub:joe')."""
+        return self._column("SELECT DISTINCT target FROM nodes WHERE node_id = ? AND is_root = 0", (node_id,))
+
+    def targets_with_email(self, email):
+        """Targets that leaked this email address (case-insensitive)."""
+        return self._column("SELECT DISTINCT target FROM nodes WHERE email = ?", (email.lower(),))
+
+    def targets_with_platforms(self, *platforms):
+        """Targets holding an account on every one of the given platforms."""
+        if not platforms:
+            return []
+        marks = ",".join("?" * len(platforms))
+        return self._column(f"""
+            SELECT target FROM nodes
+            WHERE type = 'Account' AND platform IN ({marks})
+            GROUP BY target HAVING COUNT(DISTINCT platform) = ?
+        """, (*platforms, len(set(platforms))))
+
+    def shared_nodes(self, node_type=None, min_targets=2):
+        """
+        Nodes seen under at least min_targets different targets, most shared first.
+        Returns [(node_id, type, [targets])].
+        """
+        # Emails are compared case-insensitively through the normalized email column
+        query = "SELECT COALESCE(email, node_id), type, GROUP_CONCAT(target, char(31)) FROM nodes WHERE is_root = 0"
+        params = []
+        if node_type:
+            query += " AND type = ?"
+            params.append(node_type)
+        query += " GROUP BY COALESCE(email, node_id) HAVING COUNT(DISTINCT target) >= ? ORDER BY COUNT(DISTINCT target) DESC"
+        params.append(min_targets)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [(node_id, node_type, sorted(set(targets.split("\x1f")))) for node_id, node_type, targets in rows]
+
+    def correlate(self, target):
+        """
+        Other targets sharing at least one node (account or email) with `target`.
+        Returns [(other_target, [shared node ids])], most overlap first.
+        """
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT other.target, other.node_id FROM nodes AS mine
+                JOIN nodes AS other ON other.node_id = mine.node_id AND other.target != mine.target
+                WHERE mine.target = ? AND mine.is_root = 0 AND other.is_root = 0 AND mine.email IS NULL
+                UNION
+                SELECT other.target, other.email FROM nodes AS mine
+                JOIN nodes AS other ON other.email = mine.email AND other.target != mine.target
+                WHERE mine.target = ? AND mine.email IS NOT NULL
+            """, (target, target)).fetchall()
+        shared = {}
+        for other, node_id in rows:
+            shared.setdefault(other, []).append(node_id)
+        return sorted(shared.items(), key=lambda item: (-len(item[1]), item[0]))
+
+    def load_graph(self, target):
+        """Rebuilds the last known IdentityGraph of a target (empty graph if unknown)."""
+        graph = IdentityGraph()
+        with self._lock:
+            node_rows = self._db.execute(
+                "SELECT node_id, type, platform, url, source, is_root, created FROM nodes WHERE target = ?",
+                (target,)).fetchall()
+            edge_rows = self._db.execute("SELECT src, dst, rel FROM edges WHERE target = ?", (target,)).fetchall()
+        for node_id, node_type, platform, url, source, is_root, created in node_rows:
+            node = node_from_dict({"type": f"{node_type}Node" if node_type != "Node" else "OSINTNode",
+                                   "id": node_id, "platform": platform, "url": url,
+                                   "source": source, "created": created})
+            if is_root:
+                graph.set_root(node)
+            else:
+                graph.add_node(node)
+        for src, dst, rel in edge_rows:
+            if src in graph.nodes and dst in graph.nodes:
+                graph.add_edge(graph.nodes[src], graph.nodes[dst], rel)
+        return graph
+
+    def probe_states(self, target):
+        """site -> (state, url, checked_at) from the target's last checks."""
+        with self._lock:
+            rows = self._db.execute("SELECT site, state, url, checked_at FROM probes WHERE target = ?",
+                                    (target,)).fetchall()
+        return {site: (state, url, checked_at) for site, state, url, checked_at in rows}
+
+    def _column(self, query, params):
+        with self._lock:
+            return [row[0] for row in self._db.execute(query, params).fetchall()]
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+class StoreRecorder:
+    """Graph listener: mirrors one target's graph into the IdentityStore as it grows."""
+    def __init__(self, store, target):
+        self.store = store
+        self.target = target
+        store.touch_target(target)
+
+    def on_node(self, node, is_root=False):
+        self.store.write_node(self.target, node, is_root)
+
+    def on_edge(self, node_a, node_b, relationship):
+        self.store.write_edge(self.target, node_a, node_b, relationship)
+
+    def close(self):
+        self.store.commit()
@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Only final, meaningful answers are worth keeping (404 = "account does not exist")
+CACHEABLE_STATUSES = (200, 203, 301, 308, 404, 410)
+
+# Hop-by-hop / transport headers that no longer describe the stored (decoded) body
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+class CachedEntry:
+    """One stored response, as read back from disk."""
+    def __init__(self, status, headers, body, etag, last_modified, expires_at):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def revalidatable(self):
+        return bool(self.etag or self.last_modified)
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache backed by SQLite.
+    Entries are keyed by method+URL, expire after a per-request TTL and are
+    evicted least-recently-used once the stored bodies exceed max_bytes.
+    """
+    def __init__(self, path=".cache/http_cache.sqlite", max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def cacheable(status):
+        return status in CACHEABLE_STATUSES
+
+    @staticmethod
+    def key(method, url):
+        return f"{method.upper()} {url}"
+
+    def lookup(self, method, url):
+        """Returns the CachedEntry for method+URL (fresh or stale), or None."""
+        key = self.key(method, url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        status, headers, body, etag, last_modified, expires_at = row
+        return CachedEntry(status, json.loads(headers), body, etag, last_modified, expires_at)
+
+    def store(self, method, url, status, headers, body, ttl):
+        if status not in CACHEABLE_STATUSES or ttl <= 0:
+            return
+        headers = {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+        lowered = {k.lower(): v for k, v in headers.items()}
+        key = self.key(method, url)
+        now = time.time()
+        size = len(body)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(headers), body, lowered.get("etag"),
+                 lowered.get("last-modified"), now + ttl, now, size))
+            self._total += size - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, method, url, ttl):
+        """A 304 confirmed the stored body is still current: extend its lifetime."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                             (now + ttl, now, self.key(method, url)))
+            self._db.commit()
+
+    def _evict(self):
+        # Caller holds the lock. Drop least recently used entries until we fit again.
+        while self._total > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    return
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
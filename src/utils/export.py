@@ -0,0 +1,308 @@
+import json
+import os
+import shutil
+import tempfile
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
+from src.models.graph import IdentityGraph
+from src.models.node import node_from_dict
+
+# --- WRITERS ---
+# Every writer is a graph listener: attach it with graph.add_listener(writer) and
+# nodes/edges are written the moment they are added, so nothing is buffered in Python.
+
+# Node fields carried by every format (besides the id)
+NODE_FIELDS = ("type", "source", "label", "platform", "url", "created")
+
+def node_record(node, is_root=False):
+    record = node.to_dict()
+    record.pop("edges", None)  # Graph edges are streamed as their own records
+    record["created"] = node.created
+    if is_root:
+        record["root"] = True
+    return record
+
+class GraphWriter:
+    """Base class: opens the target file and implements the listener interface."""
+    binary = False
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb" if self.binary else "w", encoding=None if self.binary else "utf-8")
+        self.start()
+
+    def start(self):
+        pass
+
+    def on_node(self, node, is_root=False):
+        raise NotImplementedError
+
+    def on_edge(self, node_a, node_b, relationship):
+        raise NotImplementedError
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JsonLinesWriter(GraphWriter):
+    """One JSON object per line: {"kind": "node", ...} or {"kind": "edge", ...}."""
+    def on_node(self, node, is_root=False):
+        record = node_record(node, is_root)
+        record["kind"] = "node"
+        self._file.write(json.dumps(record) + "\n")
+
+    def on_edge(self, node_a, node_b, relationship):
+        self._file.write(json.dumps({"kind": "edge", "src": node_a.id, "dst": node_b.id, "rel": relationship}) + "\n")
+
+class GraphMLWriter(GraphWriter):
+    """GraphML allows nodes and edges in any order, so both are written as they arrive."""
+    def start(self):
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for name in NODE_FIELDS + ("root",):
+            attr_type = "double" if name == "created" else "boolean" if name == "root" else "string"
+            self._file.write(f'<key id="{name}" for="node" attr.name="{name}" attr.type="{attr_type}"/>\n')
+        self._file.write('<key id="rel" for="edge" attr.name="relationship" attr.type="string"/>\n'
+                         '<graph edgedefault="directed">\n')
+
+    def on_node(self, node, is_root=False):
+        record = node_record(node, is_root)
+        parts = [f'<node id={quoteattr(str(node.id))}>']
+        for name in NODE_FIELDS + ("root",):
+            value = record.get(name)
+            if value is not None:
+                value = "true" if value is True else str(value)
+                parts.append(f'<data key="{name}">{escape(value)}</data>')
+        parts.append('</node>\n')
+        self._file.write("".join(parts))
+
+    def on_edge(self, node_a, node_b, relationship):
+        self._file.write(f'<edge source={quoteattr(str(node_a.id))} target={quoteattr(str(node_b.id))}>'
+                         f'<data key="rel">{escape(relationship)}</data></edge>\n')
+
+    def close(self):
+        self._file.write('</graph>\n</graphml>\n')
+        super().close()
+
+class GexfWriter(GraphWriter):
+    """
+    GEXF wants every <node> before any <edge>. Nodes go straight to the file,
+    edges are spooled to a temporary file on disk and appended on close().
+    """
+    def start(self):
+        self._edges = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._edge_count = 0
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<gexf xmlns="http://gexf.net/1.3" version="1.3">\n'
+                         '<graph defaultedgetype="directed" mode="static">\n'
+                         '<attributes class="node">\n')
+        for index, name in enumerate(NODE_FIELDS + ("root",)):
+            if name == "label": continue
+            attr_type = "double" if name == "created" else "boolean" if name == "root" else "string"
+            self._file.write(f'<attribute id="{index}" title="{name}" type="{attr_type}"/>\n')
+        self._file.write('</attributes>\n<nodes>\n')
+
+    def on_node(self, node, is_root=False):
+        record = node_record(node, is_root)
+        parts = [f'<node id={quoteattr(str(node.id))} label={quoteattr(str(node.label))}><attvalues>']
+        for index, name in enumerate(NODE_FIELDS + ("root",)):
+            value = record.get(name)
+            if name == "label" or value is None: continue
+            value = "true" if value is True else str(value)
+            parts.append(f'<attvalue for="{index}" value={quoteattr(value)}/>')
+        parts.append('</attvalues></node>\n')
+        self._file.write("".join(parts))
+
+    def on_edge(self, node_a, node_b, relationship):
+        self._edge_count += 1
+        self._edges.write(f'<edge id="{self._edge_count}" source={quoteattr(str(node_a.id))} '
+                          f'target={quoteattr(str(node_b.id))} label={quoteattr(relationship)}/>\n')
+
+    def close(self):
+        self._file.write('</nodes>\n<edges>\n')
+        self._edges.seek(0)
+        shutil.copyfileobj(self._edges, self._file)
+        self._edges.close()
+        self._file.write('</edges>\n</graph>\n</gexf>\n')
+        super().close()
+
+# Record tags of the msgpack stream
+MP_HEADER, MP_STRING, MP_NODE, MP_EDGE = 0, 1, 2, 3
+MP_MAGIC = "dfm-graph"
+
+class MsgpackWriter(GraphWriter):
+    """
+    Compact archive format: a stream of msgpack arrays where every string is
+    written once into a string table and referenced by index afterwards
+    (platforms, sources, relationships and edge endpoints repeat a lot).
+      [0, "dfm-graph", 1]                       header
+      [1, "text"]                               next string table entry
+      [2, type, id, source, platform, url, created, is_root]   (strings as indexes, -1 = none)
+      [3, src, dst, rel]
+    """
+    binary = True
+
+    def start(self):
+        try:
+            import msgpack
+        except ImportError:
+            self._file.close()
+            raise ImportError("The msgpack export format needs the 'msgpack' package (pip install msgpack)")
+        self._packer = msgpack.Packer()
+        self._strings = {}
+        self._file.write(self._packer.pack([MP_HEADER, MP_MAGIC, 1]))
+
+    def _ref(self, value):
+        if value is None:
+            return -1
+        index = self._strings.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings[value] = index
+            self._file.write(self._packer.pack([MP_STRING, value]))
+        return index
+
+    def on_node(self, node, is_root=False):
+        record = node_record(node, is_root)
+        refs = [self._ref(record.get(name)) for name in ("type", "id", "source", "platform", "url")]
+        self._file.write(self._packer.pack([MP_NODE] + refs + [record["created"], is_root]))
+
+    def on_edge(self, node_a, node_b, relationship):
+        self._file.write(self._packer.pack([MP_EDGE, self._ref(node_a.id), self._ref(node_b.id), self._ref(relationship)]))
+
+WRITERS = {
+    ".jsonl": JsonLinesWriter,
+    ".graphml": GraphMLWriter,
+    ".gexf": GexfWriter,
+    ".msgpack": MsgpackWriter,
+}
+
+def open_writer(path):
+    """Picks the writer from the file extension (.jsonl, .graphml, .gexf, .msgpack)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported export format '{ext}' (expected one of {', '.join(WRITERS)})")
+    return WRITERS[ext](path)
+
+# --- STREAMING LOADERS ---
+# Each loader reads one record at a time and rebuilds the IdentityGraph as it goes.
+
+class _GraphBuilder:
+    def __init__(self):
+        self.graph = IdentityGraph()
+
+    def node(self, record):
+        node = node_from_dict(record)
+        if record.get("root"):
+            self.graph.set_root(node)
+        else:
+            self.graph.add_node(node)
+
+    def edge(self, src, dst, rel):
+        nodes = self.graph.nodes
+        if src in nodes and dst in nodes:
+            self.graph.add_edge(nodes[src], nodes[dst], rel)
+
+def load_jsonl(path):
+    builder = _GraphBuilder()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            record = json.loads(line)
+            if record.get("kind") == "edge":
+                builder.edge(record["src"], record["dst"], record["rel"])
+            else:
+                builder.node(record)
+    return builder.graph
+
+def _typed(name, value):
+    if name == "created":
+        return float(value)
+    if name == "root":
+        return value == "true"
+    return value
+
+def load_graphml(path):
+    builder = _GraphBuilder()
+    edges = []  # GraphML edges may precede their nodes
+    ns = "{http://graphml.graphdrawing.org/xmlns}"
+    for _, elem in iterparse(path, events=("end",)):
+        if elem.tag == ns + "node":
+            record = {"id": elem.get("id")}
+            for data in elem.findall(ns + "data"):
+                record[data.get("key")] = _typed(data.get("key"), data.text or "")
+            builder.node(record)
+            elem.clear()
+        elif elem.tag == ns + "edge":
+            data = elem.find(ns + "data")
+            edge = (elem.get("source"), elem.get("target"), data.text if data is not None else "connected_to")
+            if edge[0] in builder.graph.nodes and edge[1] in builder.graph.nodes:
+                builder.edge(*edge)
+            else:
+                edges.append(edge)
+            elem.clear()
+    for edge in edges:
+        builder.edge(*edge)
+    return builder.graph
+
+def load_gexf(path):
+    builder = _GraphBuilder()
+    ns = "{http://gexf.net/1.3}"
+    titles = {}
+    for _, elem in iterparse(path, events=("end",)):
+        if elem.tag == ns + "attribute":
+            titles[elem.get("id")] = elem.get("title")
+        elif elem.tag == ns + "node":
+            record = {"id": elem.get("id"), "label": elem.get("label")}
+            for value in elem.iter(ns + "attvalue"):
+                name = titles.get(value.get("for"))
+                record[name] = _typed(name, value.get("value"))
+            builder.node(record)
+            elem.clear()
+        elif elem.tag == ns + "edge":
+            builder.edge(elem.get("source"), elem.get("target"), elem.get("label") or "connected_to")
+            elem.clear()
+    return builder.graph
+
+def load_msgpack(path):
+    import msgpack
+
+    builder = _GraphBuilder()
+    strings = []
+
+    def text(index):
+        return strings[index] if index >= 0 else None
+
+    with open(path, "rb") as f:
+        for record in msgpack.Unpacker(f, raw=False):
+            tag = record[0]
+            if tag == MP_STRING:
+                strings.append(record[1])
+            elif tag == MP_NODE:
+                _, type_, id_, source, platform, url, created, is_root = record
+                builder.node({"type": text(type_), "id": text(id_), "source": text(source),
+                              "platform": text(platform), "url": text(url), "created": created, "root": is_root})
+            elif tag == MP_EDGE:
+                builder.edge(text(record[1]), text(record[2]), text(record[3]))
+            elif tag == MP_HEADER and record[1] != MP_MAGIC:
+                raise ValueError(f"{path} is not a graph archive")
+    return builder.graph
+
+LOADERS = {
+    ".jsonl": load_jsonl,
+    ".graphml": load_graphml,
+    ".gexf": load_gexf,
+    ".msgpack": load_msgpack,
+}
+
+def load_graph(path):
+    """Rebuilds an IdentityGraph from any export file, picked by extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in LOADERS:
+        raise ValueError(f"Unsupported export format '{ext}' (expected one of {', '.join(LOADERS)})")
+    return LOADERS[ext](path)
@@ -0,0 +1,102 @@
+import codecs
+from html.parser import HTMLParser
+
+# Bytes pulled off the socket per step; small enough to stop early, big enough to stay cheap
+CHUNK_SIZE = 16 * 1024
+
+# Body bytes one check reads at most (sites.json "max_bytes" overrides it per site)
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+# Markers one rule may carry; every marker costs a search of each chunk
+MAX_MARKERS = 16
+
+class _LinkCollector(HTMLParser):
+    """Collects href values of <a class="..."> tags and flags when it has enough."""
+    def __init__(self, css_class, limit):
+        super().__init__(convert_charrefs=True)
+        self.css_class = css_class
+        self.limit = limit
+        self.links = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a" or self.done:
+            return
+        attrs = dict(attrs)
+        href = attrs.get("href")
+        if href and self.css_class in (attrs.get("class") or "").split():
+            self.links.append(href)
+            if len(self.links) >= self.limit:
+                self.done = True
+
+def capped(chunks, max_bytes=None):
+    """Passes chunks through until max_bytes have been yielded (the last one is cut to fit)."""
+    if max_bytes is None:
+        yield from chunks
+        return
+    remaining = max_bytes
+    for chunk in chunks:
+        if len(chunk) >= remaining:
+            if remaining:
+                yield chunk[:remaining]
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+def read_capped(chunks, max_bytes):
+    """Reads at most max_bytes. Returns (body, truncated); truncated means more was left unread."""
+    body = bytearray()
+    for chunk in chunks:
+        room = max_bytes - len(body)
+        if len(chunk) > room:
+            body += chunk[:room]
+            return bytes(body), True
+        body += chunk
+    return bytes(body), False
+
+def extract_links(chunks, css_class, limit=5, encoding="utf-8"):
+    """
+    Returns the first `limit` hrefs of <a> tags carrying `css_class`.
+    Chunks are decoded and parsed incrementally; we stop reading as soon as we have enough.
+    """
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    parser = _LinkCollector(css_class, limit)
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            return parser.links
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser.links
+
+class MarkerSet:
+    """
+    Finds the first of a rule's literal markers in a byte stream, chunk by chunk.
+    Each chunk gets one bytes.find per marker (in C), so the cost grows linearly with
+    the marker count; rules are capped at MAX_MARKERS. Once one marker has matched,
+    the others only search up to it. Only a small tail of the previous chunk is kept
+    to catch markers split across chunk boundaries.
+    """
+    def __init__(self, markers):
+        self.markers = tuple(markers)
+        needles = {marker.encode("utf-8"): marker for marker in self.markers}
+        # Longest first so that of two markers starting at the same byte the longer one wins
+        self._needles = sorted(needles.items(), key=lambda item: len(item[0]), reverse=True)
+        self._keep = len(self._needles[0][0]) - 1
+
+    def first(self, chunks):
+        """Returns the first marker that shows up in the stream (stops reading there), or None."""
+        tail = b""
+        for chunk in chunks:
+            window = tail + chunk
+            found = None
+            for needle, marker in self._needles:
+                # Once something matched, a marker only wins by starting before it
+                end = len(window) if found is None else found + len(needle) - 1
+                at = window.find(needle, 0, end)
+                if at != -1:
+                    found, match = at, marker
+            if found is not None:
+                return match
+            tail = window[-self._keep:] if self._keep else b""
+        return None
@@ -0,0 +1,243 @@
+import random
+import time
+from urllib.parse import urlparse
+from src.utils.extract import CHUNK_SIZE, MAX_BODY_BYTES
+from src.utils.metrics import active_trace, install_connection_timing
+
+DEFAULT_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0'
+]
+
+# Transient upstream errors worth another attempt
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Answers to HEAD that mean "ask with GET instead"
+HEAD_UNSUPPORTED = (405, 501)
+
+# A status probe reads a body up to this size to the end (and discards it) so the
+# connection stays pooled; hanging up is only cheaper on longer bodies
+STATUS_DRAIN_BYTES = 64 * 1024
+
+class HttpClient:
+    """
+    The single HTTP layer used by the Scanner.
+    One keep-alive Session with a connection pool per host, shared
+    connect/read timeouts, retries with backoff and User-Agent rotation.
+    Safe to share between the worker threads of a scan.
+    Requests made inside a ScanMetrics.trace() block report their DNS/connect/TTFB
+    timings, status, bytes and retries to that trace.
+
+    With a ResponseCache attached, GETs are served from disk while fresh and
+    revalidated with ETag/Last-Modified once stale (a 304 reuses the stored body).
+    Bodies are cached only when read to the end within max_bytes; status() probes keep no body at all.
+    """
+    def __init__(self, pool_connections=64, pool_maxsize=8, connect_timeout=3.05,
+                 read_timeout=10, retries=2, backoff_factor=0.3,
+                 user_agents_file="data/user_agents.txt",
+                 cache=None, default_ttl=3600, host_ttls=None, limiter=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.user_agents = self._load_user_agents(user_agents_file)
+
+        # --- RESPONSE CACHE ---
+        self.cache = cache
+        self.default_ttl = default_ttl
+        self.host_ttls = dict(host_ttls or {})  # hostname -> seconds (0 disables caching)
+
+        # --- POLITENESS ---
+        self.limiter = limiter  # HostRateLimiter; only real network requests are paced
+
+        # requests/urllib3 take ~100 ms to import; pay for them only once a client is built
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+            # Never sleep for whatever a server asks inside a worker (holding its host slot);
+            # the rate limiter turns Retry-After into a capped pause for the host instead
+            respect_retry_after_header=False,
+        )
+        # pool_connections = how many hosts keep a pool, pool_maxsize = sockets kept per host
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        install_connection_timing(adapter)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _load_user_agents(self, path):
+        try:
+            with open(path, 'r') as f:
+                agents = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        except FileNotFoundError:
+            agents = []
+        return agents or list(DEFAULT_USER_AGENTS)
+
+    def headers(self):
+        """Fresh browser-like headers with a rotated User-Agent."""
+        return {
+            'User-Agent': random.choice(self.user_agents),
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Referer': 'https://www.google.com/'
+        }
+
+    def ttl_for(self, url):
+        return self.host_ttls.get(urlparse(url).hostname, self.default_ttl)
+
+    def get(self, url, headers=None, timeout=None, cache=True, max_bytes=MAX_BODY_BYTES, **kwargs):
+        """
+        GET through the shared pool.
+        `timeout` overrides the read timeout only; the connect timeout is global.
+        Pass cache=False to always go to the network. With the cache on, a body is stored
+        once the caller has read all of it, and only if it fits in max_bytes.
+        """
+        return self._traced(url, self._get, headers, timeout, cache, max_bytes, **kwargs)
+
+    def status(self, url, method="stream", headers=None, timeout=None, cache=True):
+        """
+        Status-only probe: the body is never downloaded. method="head" sends a HEAD
+        (redirects followed), "stream" a GET whose body is discarded: a short one is read to
+        the end so the connection is reused, a longer one (> STATUS_DRAIN_BYTES) is hung up on.
+        The returned response is already closed; only status, headers and final URL are set.
+        """
+        return self._traced(url, self._status, headers, timeout, cache, method)
+
+    def _traced(self, url, send, headers, timeout, *args, **kwargs):
+        merged = self.headers()
+        if headers:
+            merged.update(headers)
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        started = time.perf_counter()
+        response = send(url, merged, (self.connect_timeout, read_timeout), *args, **kwargs)
+        trace = active_trace()
+        if trace is not None:
+            trace.add_response(url, response, time.perf_counter() - started)
+        return response
+
+    def _status(self, url, headers, timeouts, cache, method):
+        # Status entries live under "HEAD" so they never stand in for a body a GET needs
+        ttl = self.ttl_for(url)
+        cached = cache and self.cache is not None and ttl > 0
+        if cached:
+            entry = self.cache.lookup("HEAD", url)
+            if entry and entry.fresh:
+                return self._from_cache(url, entry)
+
+        response = None
+        if method == "head":
+            response = self._send(url, headers, timeouts, method="HEAD", allow_redirects=True)
+            if response.status_code in HEAD_UNSUPPORTED:
+                response.close()
+                response = None
+        if response is None:
+            response = self._send(url, headers, timeouts, stream=True)
+            self._drain(response, STATUS_DRAIN_BYTES)
+        response.close()
+        # A cached entry cannot replay redirects, which rules read through the final URL
+        if cached and not response.history:
+            self.cache.store("HEAD", url, response.status_code, response.headers, b"", ttl)
+        response.from_cache = False
+        return response
+
+    @staticmethod
+    def _drain(response, limit):
+        """Reads and discards a streamed body of at most limit bytes; a longer one is left for close() to cut off."""
+        read = 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            read += len(chunk)
+            if read > limit:
+                return False
+        return True
+
+    def _get(self, url, headers, timeouts, cache, max_bytes, **kwargs):
+        ttl = self.ttl_for(url)
+        if not cache or self.cache is None or ttl <= 0:
+            response = self._send(url, headers, timeouts, **kwargs)
+            response.from_cache = False
+            return response
+
+        entry = self.cache.lookup("GET", url)
+        if entry and entry.fresh:
+            return self._from_cache(url, entry)
+        if entry and entry.revalidatable:
+            if entry.etag: headers['If-None-Match'] = entry.etag
+            if entry.last_modified: headers['If-Modified-Since'] = entry.last_modified
+
+        response = self._send(url, headers, timeouts, **kwargs)
+        if response.status_code == 304 and entry:
+            # Not modified: GitHub does not charge these against the rate limit
+            response.close()
+            self.cache.refresh("GET", url, ttl)
+            return self._from_cache(url, entry)
+
+        response.from_cache = False
+        # A cached entry cannot replay redirects, which rules read through the final URL
+        if response.history or not self.cache.cacheable(response.status_code):
+            return response
+        if response._content_consumed:
+            # Not streamed: the body is already in memory
+            if len(response.content) <= max_bytes:
+                self.cache.store("GET", url, response.status_code, response.headers, response.content, ttl)
+            return response
+        self._tee_into_cache(response, url, ttl, max_bytes)
+        return response
+
+    def _tee_into_cache(self, response, url, ttl, max_bytes):
+        """
+        Streamed bodies reach the caller chunk by chunk as usual (so checks can stop at
+        their first match) while a copy is collected; it is stored only once the caller
+        has read the body to its end within max_bytes.
+        """
+        iter_content = response.iter_content
+
+        def tee(chunk_size=1, decode_unicode=False):
+            body = bytearray()
+            for chunk in iter_content(chunk_size, decode_unicode):
+                if body is not None:
+                    if isinstance(chunk, bytes) and len(body) + len(chunk) <= max_bytes:
+                        body += chunk
+                    else:
+                        body = None  # Too big (or decoded text): pass through without keeping a copy
+                yield chunk
+            if body is not None:
+                self.cache.store("GET", url, response.status_code, response.headers, bytes(body), ttl)
+
+        response.iter_content = tee
+
+    def _send(self, url, headers, timeouts, method="GET", **kwargs):
+        host = urlparse(url).hostname
+        if self.limiter:
+            self.limiter.acquire(host)
+        response = self.session.request(method, url, headers=headers, timeout=timeouts, **kwargs)
+        if self.limiter:
+            self.limiter.feedback(host, response.status_code, response.headers)
+        return response
+
+    def _from_cache(self, url, entry):
+        """Rebuilds a requests.Response around a stored body."""
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        response = Response()
+        response.status_code = entry.status
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = url
+        response._content = entry.body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def close(self):
+        self.session.close()
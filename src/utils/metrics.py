@@ -0,0 +1,310 @@
+import json
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Upper bounds (ms) of the latency histogram buckets; the last one catches everything slower
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf"))
+
+_local = threading.local()
+
+def active_trace():
+    """The ProbeTrace of the probe running on this thread, or None."""
+    return getattr(_local, "trace", None)
+
+@contextmanager
+def attached(trace):
+    """Makes trace the active trace of this thread too (for helper threads working on its probe)."""
+    previous = active_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+class LatencyHistogram:
+    """Fixed-bucket histogram: constant memory however many samples it sees."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """p-th percentile, interpolated linearly inside its bucket (the open bucket reports the max)."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            bound = LATENCY_BUCKETS_MS[index]
+            if count and seen + count >= rank:
+                if bound == float("inf"):
+                    return self.max
+                return min(lower + (bound - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = bound
+        return self.max
+
+    def to_dict(self):
+        if not self.count:
+            return {"count": 0}
+        labels = [f"<={b:g}" if b != float("inf") else f">{LATENCY_BUCKETS_MS[-2]:g}" for b in LATENCY_BUCKETS_MS]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 1),
+            "p50": round(self.percentile(50), 1),
+            "p90": round(self.percentile(90), 1),
+            "p99": round(self.percentile(99), 1),
+            "max": round(self.max, 1),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+class RequestTrace:
+    """Timings of one HTTP request inside a probe (seconds; None = not applicable, e.g. reused socket)."""
+    __slots__ = ("url", "status", "dns", "connect", "ttfb", "total", "retries", "from_cache", "_raw", "_size")
+
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.dns = None
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+        self.retries = 0
+        self.from_cache = False
+        self._raw = None
+        self._size = 0
+
+    @property
+    def bytes(self):
+        return self._raw.tell() if self._raw is not None else self._size
+
+    def settle(self):
+        """Streamed bodies are read after get() returns: count them at the end of the probe and let go of the stream."""
+        if self._raw is not None:
+            try:
+                self._size = self._raw.tell()
+            except Exception:
+                pass
+            self._raw = None
+
+class ProbeTrace:
+    """Everything one site check did: its requests, outcome and error class."""
+    def __init__(self, site):
+        self.site = site
+        self.requests = []
+        self.outcome = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.duration = None
+        self._pending_connection = None  # (dns, connect) of a socket opened for the next request
+
+    def connection_opened(self, dns, connect):
+        self._pending_connection = (dns, connect)
+
+    def add_response(self, url, response, total):
+        request = RequestTrace(url)
+        request.status = response.status_code
+        request.total = total
+        request.from_cache = getattr(response, "from_cache", False)
+        if not request.from_cache:
+            request.ttfb = response.elapsed.total_seconds()
+            raw = response.raw
+            retries = getattr(raw, "retries", None)
+            request.retries = len(retries.history) if retries is not None else 0
+            request._raw = raw
+        if self._pending_connection:
+            request.dns, request.connect = self._pending_connection
+            self._pending_connection = None
+        self.requests.append(request)
+
+class ScanMetrics:
+    """
+    Per-site aggregates of every probe: outcome/status/error counts, bytes,
+    retries and latency histograms (probe total, TTFB, connect, DNS).
+    Thread-safe; memory depends on the number of sites, not probes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sites = {}
+        self.started = time.time()
+
+    @contextmanager
+    def trace(self, site):
+        """Instruments the probe run inside the block; HttpClient reports into it through active_trace()."""
+        trace = ProbeTrace(site)
+        previous = active_trace()
+        _local.trace = trace
+        try:
+            yield trace
+        except Exception as e:
+            trace.error = type(e).__name__
+            trace.outcome = "unknown"
+            raise
+        finally:
+            _local.trace = previous
+            trace.duration = time.perf_counter() - trace.started
+            for request in trace.requests:
+                request.settle()
+            self.record(trace)
+
+    def record(self, trace):
+        with self._lock:
+            stats = self.sites.get(trace.site)
+            if stats is None:
+                stats = self.sites[trace.site] = _SiteStats()
+            stats.add(trace)
+
+    def to_dict(self):
+        with self._lock:
+            sites = {site: stats.to_dict() for site, stats in sorted(self.sites.items())}
+        return {
+            "started": self.started,
+            "elapsed": round(time.time() - self.started, 3),
+            "probes": sum(site["probes"] for site in sites.values()),
+            "sites": sites,
+        }
+
+    def rows(self):
+        """(site, probes, p50 ms, p99 ms, failures, kilobytes) per site, slowest p99 first (for reports)."""
+        data = self.to_dict()["sites"]
+        rows = []
+        for site, stats in data.items():
+            total = stats["latency_ms"]["total"]
+            rows.append((site, stats["probes"], total.get("p50"), total.get("p99"),
+                         stats["outcomes"].get("unknown", 0), round(stats["bytes"] / 1024, 1)))
+        return sorted(rows, key=lambda row: -(row[3] or 0))
+
+    def write_json(self, path, **extra):
+        """Writes to_dict() plus any extra top-level sections (e.g. hosts=HostHealth.snapshot())."""
+        with open(path, "w") as f:
+            json.dump(dict(self.to_dict(), **extra), f, indent=2)
+
+class _SiteStats:
+    def __init__(self):
+        self.probes = 0
+        self.requests = 0
+        self.cached = 0
+        self.retries = 0
+        self.bytes = 0
+        self.outcomes = Counter()
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.total = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.dns = LatencyHistogram()
+
+    def add(self, trace):
+        self.probes += 1
+        self.outcomes[trace.outcome or "unknown"] += 1
+        if trace.error:
+            self.errors[trace.error] += 1
+        self.total.add(trace.duration * 1000)
+        for request in trace.requests:
+            self.requests += 1
+            self.statuses[str(request.status)] += 1
+            if request.from_cache:
+                self.cached += 1
+                continue
+            self.retries += request.retries
+            self.bytes += request.bytes
+            if request.ttfb is not None: self.ttfb.add(request.ttfb * 1000)
+            if request.connect is not None: self.connect.add(request.connect * 1000)
+            if request.dns is not None: self.dns.add(request.dns * 1000)
+
+    def to_dict(self):
+        return {
+            "probes": self.probes,
+            "requests": self.requests,
+            "cached": self.cached,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "outcomes": dict(self.outcomes),
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "latency_ms": {
+                "total": self.total.to_dict(),
+                "ttfb": self.ttfb.to_dict(),
+                "connect": self.connect.to_dict(),
+                "dns": self.dns.to_dict(),
+            },
+        }
+
+# --- CONNECTION TIMING ---
+# urllib3 resolves and connects inside HTTPConnection._new_conn. The subclasses below split
+# that into a timed DNS lookup and a timed TCP connect and report both to the active trace.
+
+_timed_pools = None
+
+def _timed_pool_classes():
+    global _timed_pools
+    if _timed_pools is not None:
+        return _timed_pools
+
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import NameResolutionError
+
+    def timed_new_conn(self, parent_new_conn):
+        trace = active_trace()
+        if trace is None:
+            return parent_new_conn(self)
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        # Same fallback order as create_connection, but over addresses we already resolved
+        error = None
+        for address in dict.fromkeys(info[4][0] for info in addresses):
+            self._dns_host = address
+            try:
+                sock = parent_new_conn(self)
+                break
+            except Exception as e:
+                error = e
+            finally:
+                self._dns_host = host
+        else:
+            raise error
+        trace.connection_opened(resolved - started, time.perf_counter() - resolved)
+        return sock
+
+    class TimedHTTPConnection(HTTPConnection):
+        def _new_conn(self):
+            return timed_new_conn(self, HTTPConnection._new_conn)
+
+    class TimedHTTPSConnection(HTTPSConnection):
+        def _new_conn(self):
+            return timed_new_conn(self, HTTPSConnection._new_conn)
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    _timed_pools = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+    return _timed_pools
+
+def install_connection_timing(adapter):
+    """Makes a requests HTTPAdapter open its sockets through the timed connection classes."""
+    adapter.poolmanager.pool_classes_by_scheme = dict(_timed_pool_classes())
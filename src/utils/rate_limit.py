@@ -0,0 +1,96 @@
+import threading
+import time
+
+# Hosts we talk to that are not profile sites in sites.json (requests/second, burst)
+DEFAULT_HOST_RATES = {
+    "html.duckduckgo.com": (0.5, 1),
+    "lite.duckduckgo.com": (0.5, 1),
+    "api.github.com": (2.0, 5),
+}
+
+# Statuses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+class TokenBucket:
+    """
+    Classic token bucket. reserve() always hands out a slot and returns how long
+    the caller must wait for it, so concurrent callers queue up fairly.
+    """
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0  # consecutive throttle responses
+
+    def reserve(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.blocked_until - now)
+
+class HostRateLimiter:
+    """
+    Per-host politeness scheduler.
+    Every host gets its own token bucket, so a slow or strict site never makes
+    probes to other hosts wait. A 429/503 halves that host's rate and pauses it
+    for Retry-After (or an exponential backoff); successes slowly restore it.
+    """
+    def __init__(self, default_rate=5.0, default_burst=5, host_rates=None,
+                 max_backoff=120.0, min_rate=0.05):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_rates = dict(DEFAULT_HOST_RATES)
+        self.host_rates.update(host_rates or {})
+        self.max_backoff = max_backoff
+        self.min_rate = min_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.host_rates.get(host, (self.default_rate, self.default_burst))
+            bucket = TokenBucket(rate, burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, host):
+        """Blocks the calling thread until `host` may receive another request."""
+        with self._lock:
+            wait = self._bucket(host).reserve(time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+
+    def feedback(self, host, status_code, headers=None):
+        """Adjusts the host's pace based on the response it just gave us."""
+        with self._lock:
+            bucket = self._bucket(host)
+            if status_code in THROTTLE_STATUSES:
+                bucket.strikes += 1
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                delay = self._retry_after(headers)
+                if delay is None:
+                    delay = min(self.max_backoff, 2 ** bucket.strikes)
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + min(delay, self.max_backoff))
+            else:
+                bucket.strikes = 0
+                # Additive recovery towards the configured rate
+                bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * 0.1)
+
+    def _retry_after(self, headers):
+        value = (headers or {}).get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        from email.utils import parsedate_to_datetime  # Rare path; keeps startup light
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
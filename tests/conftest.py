@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bench.farm import SiteFarm, load_config
+
+class FakeClock:
+    """Stands in for time.time where a component takes a clock; advanced by hand."""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class Journal:
+    """Collects scan_target's probe outcomes as (target, site, state)."""
+    def __init__(self):
+        self.probes = []
+
+    def write_probe(self, target, site, state, url=None):
+        self.probes.append((target, site, state))
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def farm(tmp_path):
+    """
+    Starts bench/farm.py's SiteFarm in-process for a list of rules.
+    Usage: sites_file, farm = farm(rules, profile="fast", sites={...overrides})
+    """
+    started = []
+
+    def start(rules, profile="fast", hosts=2, **overrides):
+        site_farm = SiteFarm(load_config(profile, overrides), hosts=hosts)
+        site_farm.start()
+        started.append(site_farm)
+        sites_file = os.path.join(tmp_path, f"sites_{len(started)}.json")
+        with open(sites_file, "w") as f:
+            json.dump(site_farm.rewrite_rules(rules), f)
+        return sites_file, site_farm
+
+    yield start
+    for site_farm in started:
+        site_farm.stop()
+
+class EtagHandler(BaseHTTPRequestHandler):
+    """JSON documents with an ETag; answers If-None-Match with 304. Counts full responses."""
+    protocol_version = "HTTP/1.1"
+    documents = {}  # path -> (status, body dict)
+    served = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        status, body = self.documents.get(self.path, (404, {"message": "Not Found"}))
+        etag = f'"{abs(hash(json.dumps(body, sort_keys=True)))}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.served.append(self.path)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "max-age=0")
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def etag_server():
+    """A local server for conditional-request tests: (base URL, documents dict, list of fully served paths)."""
+    handler = type("Handler", (EtagHandler,), {"documents": {}, "served": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", handler.documents, handler.served
+    server.shutdown()
+    server.server_close()
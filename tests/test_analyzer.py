@@ -0,0 +1,47 @@
+import pytest
+
+from src.core.analyzer import RiskAnalyzer
+from src.core.batch import BatchRunner
+from src.core.rules import compile_rule
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+
+# Heavily weighted sites, so platform weights would show if they leaked into the default score
+RULES = [compile_rule({"name": f"Site{n}", "url": f"https://site{n}.example/{{}}", "category": "Social",
+                       "risk_weight": 3}) for n in range(8)]
+
+def classic_badge(accounts, emails):
+    """The score and badge Reporter.generate_html computed before the analyzer."""
+    score = 10 * (accounts > 0) + 20 * (accounts > 5) + 40 * (emails > 0)
+    return score, "CRITICAL" if score > 60 else "MODERATE" if score > 30 else "LOW"
+
+def footprint(accounts, emails, target="joe"):
+    graph = IdentityGraph()
+    root = PersonNode(target, source="Test")
+    graph.set_root(root)
+    for rule in RULES[:accounts]:
+        graph.add_edge(root, AccountNode(target, rule.name, rule.report_url(target), source="Test"),
+                       f"has_account_on_{rule.name}")
+    parent = graph.nodes[f"{RULES[0].name}:{target}"] if accounts else root
+    for n in range(emails):
+        graph.add_edge(parent, EmailNode(f"{target}{n}@example.org", source="Test"), "leaked_via_code")
+    return graph
+
+@pytest.mark.parametrize("emails", [0, 1])
+@pytest.mark.parametrize("accounts", range(len(RULES) + 1))
+def test_default_weights_keep_the_classic_badge(accounts, emails):
+    assessment = RiskAnalyzer(rules=RULES).assess(footprint(accounts, emails))
+    assert (assessment.score, assessment.level) == classic_badge(accounts, emails)
+
+def test_ranked_records_keep_the_classic_badge():
+    runner = BatchRunner(scanner=None)
+    records = [runner.to_record(f"joe{accounts}", footprint(accounts, emails, f"joe{accounts}"), 0)
+               for accounts, emails in ((1, 0), (6, 0), (2, 1))]
+    ranked = RiskAnalyzer(rules=RULES).rank_records(records)
+    assert [(r.target, r.score, r.level) for r in ranked] == [("joe2", *classic_badge(2, 1)),
+                                                             ("joe6", *classic_badge(6, 0)),
+                                                             ("joe1", *classic_badge(1, 0))]
+
+def test_platform_weights_count_once_switched_on():
+    analyzer = RiskAnalyzer(rules=RULES, weights={"platform_weight": 1})
+    assert analyzer.assess(footprint(2, 0)).score == classic_badge(2, 0)[0] + 2 * 3
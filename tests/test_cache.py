@@ -0,0 +1,106 @@
+import types
+
+import pytest
+
+import src.utils.cache as cache_module
+from src.utils.cache import ResponseCache
+from src.utils.http_client import HttpClient
+
+@pytest.fixture
+def fake_time(monkeypatch, clock):
+    """Freshness checks in the cache module run on the fake clock."""
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(time=clock))
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, fake_time):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=1000)
+    yield cache
+    cache.close()
+
+def test_entry_is_fresh_until_its_ttl(cache, fake_time):
+    cache.store("GET", "http://x/a", 200, {"ETag": '"1"'}, b"body", ttl=60)
+    entry = cache.lookup("GET", "http://x/a")
+    assert entry.fresh and entry.body == b"body" and entry.etag == '"1"'
+    fake_time.advance(61)
+    entry = cache.lookup("GET", "http://x/a")
+    assert not entry.fresh and entry.revalidatable
+
+def test_only_final_answers_are_stored(cache):
+    cache.store("GET", "http://x/503", 503, {}, b"", ttl=60)
+    cache.store("GET", "http://x/no-ttl", 200, {}, b"", ttl=0)
+    cache.store("GET", "http://x/404", 404, {}, b"", ttl=60)
+    assert cache.lookup("GET", "http://x/503") is None
+    assert cache.lookup("GET", "http://x/no-ttl") is None
+    assert cache.lookup("GET", "http://x/404").status == 404
+
+def test_transport_headers_are_dropped(cache):
+    cache.store("GET", "http://x/a", 200, {"Content-Encoding": "gzip", "Content-Length": "9", "X-Keep": "1"},
+                b"", ttl=60)
+    assert cache.lookup("GET", "http://x/a").headers == {"X-Keep": "1"}
+
+def test_refresh_extends_a_stale_entry(cache, fake_time):
+    cache.store("GET", "http://x/a", 200, {}, b"body", ttl=60)
+    fake_time.advance(61)
+    cache.refresh("GET", "http://x/a", ttl=60)
+    assert cache.lookup("GET", "http://x/a").fresh
+
+def test_least_recently_used_entries_are_evicted(cache, fake_time):
+    for name in ("a", "b", "c"):
+        cache.store("GET", f"http://x/{name}", 200, {}, b"x" * 400, ttl=60)
+        fake_time.advance(1)
+        if name == "b":
+            cache.lookup("GET", "http://x/a")  # a is now more recent than b
+            fake_time.advance(1)
+    assert cache.lookup("GET", "http://x/b") is None
+    assert cache.lookup("GET", "http://x/a") is not None
+    assert cache.lookup("GET", "http://x/c") is not None
+
+# --- HttpClient over the cache ---
+
+@pytest.fixture
+def client(cache):
+    http = HttpClient(retries=0, cache=cache, default_ttl=60)
+    yield http
+    http.close()
+
+def test_fresh_entry_is_served_from_disk(client, etag_server):
+    base, documents, served = etag_server
+    documents["/a"] = (200, {"v": 1})
+    assert client.get(f"{base}/a").json() == {"v": 1}
+    response = client.get(f"{base}/a")
+    assert response.from_cache and response.json() == {"v": 1}
+    assert served == ["/a"]
+
+def test_stale_entry_is_revalidated(client, etag_server, fake_time):
+    base, documents, served = etag_server
+    documents["/a"] = (200, {"v": 1})
+    client.get(f"{base}/a").content
+    fake_time.advance(61)
+    response = client.get(f"{base}/a")  # 304: the stored body is reused
+    assert response.from_cache and response.json() == {"v": 1}
+    assert served == ["/a"]
+    assert client.cache.lookup("GET", f"{base}/a").fresh
+
+    fake_time.advance(61)
+    documents["/a"] = (200, {"v": 2})
+    assert client.get(f"{base}/a").json() == {"v": 2}
+    assert served == ["/a", "/a"]
+
+def test_streamed_body_is_stored_only_when_read_to_the_end(client, etag_server):
+    base, documents, _ = etag_server
+    documents["/partial"] = (200, {"v": "x" * 100})
+    documents["/full"] = (200, {"v": "x" * 100})
+    with client.get(f"{base}/partial", stream=True) as response:
+        next(response.iter_content(10))  # A check that stopped at its first match
+    with client.get(f"{base}/full", stream=True) as response:
+        body = b"".join(response.iter_content(10))
+    assert client.cache.lookup("GET", f"{base}/partial") is None
+    assert client.cache.lookup("GET", f"{base}/full").body == body
+
+def test_bodies_over_the_cap_are_not_stored(client, etag_server):
+    base, documents, _ = etag_server
+    documents["/big"] = (200, {"v": "x" * 500})
+    with client.get(f"{base}/big", stream=True, max_bytes=100) as response:
+        assert len(b"".join(response.iter_content(64))) > 500  # The caller still gets everything
+    assert client.cache.lookup("GET", f"{base}/big") is None
@@ -0,0 +1,91 @@
+import pytest
+
+from src.core.crawler import PivotCrawler
+from src.core.github import GitHubPivot
+from src.core.scanner import Scanner
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+from src.utils.http_client import HttpClient
+
+RULES = [
+    {"name": "GitHub", "url": "https://github.example/{}", "check_type": "status_code", "exist_code": 200,
+     "pivot": "github_email"},
+    {"name": "Blog", "check_type": "search", "query": "site:blog.example/{}", "expected_domains": ["blog.example"]},
+]
+
+class RecordingCrawler(PivotCrawler):
+    """Remembers the order seeds were expanded in."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expanded = []
+
+    def _expand(self, seed, root_node, journal=None):
+        self.expanded.append((seed.kind, seed.value, seed.depth))
+        return super()._expand(seed, root_node, journal)
+
+@pytest.fixture
+def crawler(farm):
+    """A one-worker crawler over the farm; every user exists on GitHub, with an email on the profile or in commits."""
+    def build(**kwargs):
+        sites_file, site_farm = farm(RULES, sites={"GitHub": {"hit_rate": 1.0}, "GitHub API": {"hit_rate": 1.0}})
+        scanner = Scanner(sites_file=sites_file, verbose=False, http=HttpClient(retries=0))
+        scanner.github = GitHubPivot(scanner.http, base_url=site_farm.base_url(site_farm.host_count - 1), token="test")
+        return RecordingCrawler(scanner, workers=1, **kwargs), site_farm
+    return build
+
+def crawl(crawler, username="alice"):
+    graph = IdentityGraph()
+    root = PersonNode(username, source="Test")
+    graph.set_root(root)
+    spent = crawler.crawl(username, graph, root)
+    return graph, spent
+
+def test_email_seeds_go_before_url_seeds(crawler):
+    crawler, _ = crawler()
+    graph, _ = crawl(crawler)
+    kinds = [kind for kind, _, _ in crawler.expanded]
+    assert crawler.expanded[:2] == [("username", "alice", 0), ("email", "alice@bench.example", 1)]
+    assert kinds[2:] == ["url"] * (len(kinds) - 2) and len(kinds) > 2  # The search hits, found last
+    assert "alice@bench.example" in graph.nodes
+
+def test_budget_stops_scheduling(crawler):
+    crawler, site_farm = crawler(budget=len(RULES) + 1)  # Exactly one username scan
+    graph, spent = crawl(crawler)
+    assert spent == len(RULES) + 1
+    assert crawler.expanded == [("username", "alice", 0)]  # The email search did not fit
+    assert "alice@bench.example" in graph.nodes  # What the scan found is still kept
+
+def test_max_depth_bounds_the_crawl(crawler):
+    crawler, _ = crawler(max_depth=1)
+    crawl(crawler)
+    assert [depth for _, _, depth in crawler.expanded] == [0, 1]
+
+def test_visited_pivots_are_not_expanded_again(crawler):
+    crawler, _ = crawler()
+    graph, _ = crawl(crawler)
+    # The email's local part names alice again: merged into what is there, never rescanned
+    assert [value for kind, value, _ in crawler.expanded if kind == "username"] == ["alice"]
+    assert len(graph.nodes_by_type("Email")) == 1
+    assert len(graph.nodes_by_type("Account")) == len({node.id for node in graph.nodes_by_type("Account")})
+
+def test_merge_reuses_known_nodes(crawler):
+    crawler, _ = crawler()
+    graph = IdentityGraph()
+    root = PersonNode("alice", source="Test")
+    graph.set_root(root)
+    known = AccountNode("alice", "GitHub", "https://github.example/alice", source="Test")
+    graph.add_edge(root, known, "has_account_on_GitHub")
+
+    local = IdentityGraph()
+    local_root = PersonNode("alice-pivot", source="Pivot Crawler")
+    local.set_root(local_root)
+    twin = AccountNode("alice", "GitHub", "https://github.example/alice", source="Pivot Crawler")
+    email = EmailNode("alice@bench.example", source="Test")
+    local.add_edge(local_root, twin, "has_account_on_GitHub")
+    local.add_edge(twin, email, "leaked_via_code")
+
+    new_nodes = crawler._merge(graph, local, known)
+    assert new_nodes == [email]
+    assert graph.nodes["GitHub:alice"] is known
+    assert graph.has_edge(known, email, "leaked_via_code")
+    assert "alice-pivot" not in graph.nodes  # The worker's root is replaced by the parent
@@ -0,0 +1,70 @@
+import pytest
+
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+from src.utils.export import load_graph, open_writer
+
+FORMATS = ("jsonl", "graphml", "gexf", "msgpack")
+
+@pytest.fixture
+def graph():
+    graph = IdentityGraph()
+    root = PersonNode("bob <&> \"b\"", source="Input")
+    graph.set_root(root)
+    github = AccountNode("bob", "GitHub", "https://github.com/bob?tab=repos&x=<1>", source="Scanner")
+    devto = AccountNode("bob", "Dev.to", "https://dev.to/bob", source="Scanner")
+    email = EmailNode("bob@example.org", source="GitHub Profile")
+    graph.add_edge(root, github, "has_account_on_GitHub")
+    graph.add_edge(root, devto, "has_account_on_Dev.to")
+    graph.add_edge(github, email, "leaked_via_<code> & \"history\"")
+    return graph
+
+def export(graph, path):
+    with open_writer(str(path)) as writer:
+        graph.add_listener(writer)
+        graph.remove_listener(writer)
+
+def snapshot(graph):
+    nodes = {node_id: (type(node).__name__, node.source, getattr(node, "platform", None), getattr(node, "url", None),
+                       node.created)
+             for node_id, node in graph.nodes.items()}
+    edges = sorted((a.id, b.id, rel) for a, b, rel in graph.edges)
+    return nodes, edges, graph.root.id if graph.root else None
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip(graph, tmp_path, fmt):
+    if fmt == "msgpack":
+        pytest.importorskip("msgpack")
+    path = tmp_path / f"graph.{fmt}"
+    export(graph, path)
+    assert snapshot(load_graph(str(path))) == snapshot(graph)
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_streamed_export_matches_the_final_graph(graph, tmp_path, fmt):
+    # Attached before the scan: everything is written as it is added
+    if fmt == "msgpack":
+        pytest.importorskip("msgpack")
+    path = tmp_path / f"live.{fmt}"
+    live = IdentityGraph()
+    with open_writer(str(path)) as writer:
+        live.add_listener(writer)
+        live.set_root(graph.root)
+        for node_a, node_b, rel in graph.edges:
+            live.add_edge(node_a, node_b, rel)
+    assert snapshot(load_graph(str(path))) == snapshot(graph)
+
+@pytest.mark.parametrize("fmt", ("graphml", "gexf"))
+def test_xml_labels_are_escaped(graph, tmp_path, fmt):
+    path = tmp_path / f"graph.{fmt}"
+    export(graph, path)
+    text = path.read_text()
+    assert "<code>" not in text and "&lt;code&gt;" in text
+    loaded = load_graph(str(path))
+    assert loaded.root.label == "bob <&> \"b\""
+    assert loaded.nodes["GitHub:bob"].url == "https://github.com/bob?tab=repos&x=<1>"
+
+def test_unknown_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / "graph.csv"))
+    with pytest.raises(ValueError):
+        load_graph(str(tmp_path / "graph.csv"))
@@ -0,0 +1,44 @@
+import pytest
+
+from src.core.rules import compile_rule
+from src.utils.extract import MAX_MARKERS, MarkerSet
+
+def stream(*chunks, read=None):
+    """Yields the chunks, noting in `read` how many were pulled."""
+    for chunk in chunks:
+        if read is not None:
+            read.append(chunk)
+        yield chunk
+
+def test_marker_split_across_chunks_is_found():
+    markers = MarkerSet(["User not found", "Followers"])
+    assert markers.first(stream(b"<html><p>User no", b"t found</p>")) == "User not found"
+    assert markers.first(stream(b"...Fol", b"l", b"owers...")) == "Followers"
+
+def test_reading_stops_at_the_first_marker():
+    read = []
+    markers = MarkerSet(["Followers"])
+    assert markers.first(stream(b"padding", b"12 Followers", b"more", b"and more", read=read)) == "Followers"
+    assert read == [b"padding", b"12 Followers"]
+
+def test_earliest_marker_in_the_body_decides():
+    markers = MarkerSet(["not found", "Followers"])
+    assert markers.first(stream(b"Followers: 0 ... page not found")) == "Followers"
+    assert markers.first(stream(b"page not found ... Followers")) == "not found"
+
+def test_longer_marker_wins_at_the_same_position():
+    markers = MarkerSet(["User", "User not found"])
+    assert markers.first(stream(b"<p>User not found</p>")) == "User not found"
+    assert markers.first(stream(b"<p>User ", b"profile</p>")) == "User"
+
+def test_no_marker_is_none():
+    assert MarkerSet(["Followers"]).first(stream(b"nothing", b"here")) is None
+    assert MarkerSet(["Followers"]).first(stream()) is None
+
+def test_rules_are_capped_at_max_markers():
+    rule = {"name": "Site", "url": "https://site.example/{}", "check_type": "markers",
+            "present_markers": [f"present {n}" for n in range(MAX_MARKERS)]}
+    assert len(compile_rule(rule).marker_set.markers) == MAX_MARKERS
+    rule["absent_markers"] = ["absent"]
+    with pytest.raises(ValueError, match="at most"):
+        compile_rule(rule)
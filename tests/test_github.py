@@ -0,0 +1,143 @@
+import io
+import json
+import time
+
+import pytest
+
+from src.core.batch import BatchRunner
+from src.core.github import GitHubPivot, GitHubUnavailable
+from src.core.scanner import Scanner
+from src.core.workqueue import DONE, WorkQueue
+from src.models.graph import IdentityGraph
+from src.models.node import PersonNode
+from src.utils.http_client import HttpClient
+
+@pytest.fixture
+def http():
+    client = HttpClient(retries=0)  # No ResponseCache: the pivot keeps its own ETag memo
+    yield client
+    client.close()
+
+def test_repeated_lookup_is_conditional(http, etag_server):
+    base, documents, served = etag_server
+    documents["/users/alice"] = (200, {"login": "alice", "email": "alice@example.org"})
+    pivot = GitHubPivot(http, base_url=base, token="test")
+    assert pivot.profile_email("alice") == ("alice@example.org", True)
+    assert pivot.profile_email("alice") == ("alice@example.org", True)  # 304, answered from the memo
+    assert served == ["/users/alice"]
+
+def test_missing_user_is_not_an_error(http, etag_server):
+    base, _, _ = etag_server
+    assert GitHubPivot(http, base_url=base, token="test").profile_email("nobody") == (None, False)
+
+@pytest.mark.parametrize("status", [403, 429, 500, 502])
+def test_error_statuses_raise(http, etag_server, status):
+    base, documents, _ = etag_server
+    documents["/users/alice"] = (status, {"message": "nope"})
+    with pytest.raises(GitHubUnavailable):
+        GitHubPivot(http, base_url=base, token="test").profile_email("alice")
+
+def test_failed_pivot_counts_against_the_host(etag_server, capsys):
+    base, documents, _ = etag_server
+    documents["/users/alice"] = (500, {"message": "boom"})
+    scanner = Scanner(sites_file="/nonexistent.json", http=HttpClient(retries=0))
+    scanner.github = GitHubPivot(scanner.http, base_url=base, token="test")
+    graph = IdentityGraph()
+    root = PersonNode("alice", source="Test")
+    graph.set_root(root)
+    scanner.extract_github_email("alice", graph, root)
+    assert "GitHub pivot failed (GitHubUnavailable), result unknown." in capsys.readouterr().out
+    assert scanner.health._hosts["127.0.0.1"].failures == 1
+    assert len(graph.nodes) == 1
+
+def test_emails_from_profile_and_commit_history(farm, http):
+    _, site_farm = farm([], sites={"GitHub API": {"hit_rate": 1.0}})
+    pivot = GitHubPivot(http, base_url=site_farm.base_url(site_farm.host_count - 1), token="test")
+    sources = {}
+    for username in (f"user{n}" for n in range(8)):
+        email, source = pivot.find_email(username)
+        assert email == f"{username}@bench.example"
+        sources[username] = source
+    # The farm puts the email on the profile for half of the users and on events page 2 for the rest
+    assert set(sources.values()) == {"GitHub Profile", "GitHub Commit History"}
+
+EVENTS = "/users/{}/events/public?per_page=100"
+
+def github_users(documents, profile=(), commits=()):
+    """Users with their email on the profile, and users with it only in their commit history."""
+    for username in profile:
+        documents[f"/users/{username}"] = (200, {"login": username, "email": f"{username}@example.org"})
+    for username in commits:
+        documents[f"/users/{username}"] = (200, {"login": username, "email": None})
+        documents[EVENTS.format(username)] = (200, [{"type": "PushEvent", "payload": {
+            "commits": [{"author": {"email": f"{username}@example.org"}}]}}])
+
+def limit_quota(pivot, calls):
+    pivot.budget.remaining = calls
+    pivot.budget.reset_at = time.time() + 3600  # The stand-in sends no X-RateLimit headers
+
+def test_scheduler_looks_up_profiles_before_events(http, etag_server):
+    base, documents, served = etag_server
+    github_users(documents, profile=["ann"], commits=["bob", "cid"])
+    documents["/users/eve"] = (500, {"message": "boom"})
+    pivot = GitHubPivot(http, base_url=base, token="test")
+    limit_quota(pivot, 6)
+
+    found, failed, deferred = pivot.find_emails(["bob", "ann", "nobody", "eve", "cid"])
+    assert served == ["/users/bob", "/users/ann", "/users/nobody", "/users/eve", "/users/cid", EVENTS.format("bob")]
+    assert found == {"ann": ("ann@example.org", "GitHub Profile"), "bob": ("bob@example.org", "GitHub Commit History")}
+    assert list(failed) == ["eve"] and isinstance(failed["eve"], GitHubUnavailable)
+    assert deferred == ["cid"]  # The quota ran out before its events
+
+@pytest.fixture
+def github_batch(etag_server, tmp_path):
+    """A BatchRunner over one pivoting GitHub rule; the site and the API are both served by the stand-in."""
+    base, documents, served = etag_server
+    sites_file = tmp_path / "sites.json"
+    sites_file.write_text(json.dumps([{"name": "GitHub", "url": f"{base}/gh/{{}}", "check_type": "status_code",
+                                       "exist_code": 200, "pivot": "github_email"}]))
+
+    def build(usernames, **kwargs):
+        for username in usernames:
+            documents[f"/gh/{username}"] = (200, {})
+        scanner = Scanner(sites_file=str(sites_file), verbose=False, http=HttpClient(retries=0))
+        scanner.github = GitHubPivot(scanner.http, base_url=base, token="test")
+        out = io.StringIO()
+        return BatchRunner(scanner, concurrency=2, out=out, **kwargs), out
+    return build
+
+def records(out):
+    return {record["target"]: record for record in map(json.loads, out.getvalue().splitlines())}
+
+def emails(record):
+    return [node["id"] for node in record["nodes"] if node["type"] == "EmailNode"]
+
+def test_batch_pivots_go_through_the_scheduler(github_batch, etag_server):
+    _, documents, served = etag_server
+    github_users(documents, profile=["ann", "cid"], commits=["bob", "dan"])
+    runner, out = github_batch(["ann", "bob", "cid", "dan"], pivot_window=4)
+    limit_quota(runner.scanner.github, 5)  # Four profiles, then events for one of bob and dan
+
+    assert runner.run(["ann", "bob", "cid", "dan"]) == 4
+    results = records(out)
+    lookups = [path for path in served if path.startswith("/users/")]
+    assert sorted(lookups[:4]) == ["/users/ann", "/users/bob", "/users/cid", "/users/dan"]  # Every profile first
+    assert emails(results["ann"]) == ["ann@example.org"] and emails(results["cid"]) == ["cid@example.org"]
+    paged = [username for username in ("bob", "dan") if emails(results[username])]
+    assert len(paged) == 1 and "pivot_deferred" not in results[paged[0]]
+    left = ({"bob", "dan"} - set(paged)).pop()
+    assert results[left]["pivot_deferred"] is True and emails(results[left]) == []
+    assert ["GitHub:ann", "ann@example.org", "leaked_via_code"] in results["ann"]["edges"]
+
+def test_queue_workers_pivot_parked_targets(github_batch, etag_server, tmp_path):
+    _, documents, _ = etag_server
+    github_users(documents, profile=["ann"], commits=["bob"])
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.add(["ann", "bob", "cid"])  # cid has no GitHub account at all
+    runner, out = github_batch(["ann", "bob"], queue=queue, worker="w1")
+
+    assert runner.run_queue(poll=0.05) == 3
+    results = records(out)
+    assert emails(results["ann"]) == ["ann@example.org"] and emails(results["bob"]) == ["bob@example.org"]
+    assert results["cid"]["nodes"] == []
+    assert queue.counts() == {DONE: 3}
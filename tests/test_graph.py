@@ -0,0 +1,102 @@
+import pytest
+
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+
+@pytest.fixture
+def graph():
+    """bob -> GitHub:bob -> bob@example.org <- Reddit:bob, plus a Dev.to account with no email."""
+    graph = IdentityGraph()
+    root = PersonNode("bob", source="Test")
+    graph.set_root(root)
+    github = AccountNode("bob", "GitHub", "https://github.com/bob", source="Test")
+    reddit = AccountNode("bob", "Reddit", "https://reddit.com/user/bob", source="Test")
+    devto = AccountNode("bob", "Dev.to", "https://dev.to/bob", source="Test")
+    email = EmailNode("bob@example.org", source="Test")
+    for account in (github, reddit, devto):
+        graph.add_edge(root, account, f"has_account_on_{account.platform}")
+    graph.add_edge(github, email, "leaked_via_code")
+    graph.add_edge(reddit, email, "leaked_via_code")
+    return graph
+
+def ids(nodes):
+    return [node.id for node in nodes]
+
+def test_duplicate_edges_are_skipped(graph):
+    github, email = graph.nodes["GitHub:bob"], graph.nodes["bob@example.org"]
+    assert not graph.add_edge(github, email, "leaked_via_code")
+    assert graph.add_edge(github, email, "listed_on_profile")  # Another relationship is another edge
+    assert len(graph.edges) == 6
+    assert graph.has_edge(github, email, "listed_on_profile")
+
+def test_neighbors_by_direction(graph):
+    assert ids(graph.neighbors("bob", "out")) == ["GitHub:bob", "Reddit:bob", "Dev.to:bob"]
+    assert ids(graph.neighbors("bob", "in")) == []
+    assert ids(graph.neighbors("bob@example.org", "in")) == ["GitHub:bob", "Reddit:bob"]
+    assert ids(graph.neighbors("GitHub:bob")) == ["bob", "bob@example.org"]
+    assert graph.neighbors("nobody") == []
+
+def test_neighbor_linked_twice_is_listed_once(graph):
+    github, email = graph.nodes["GitHub:bob"], graph.nodes["bob@example.org"]
+    graph.add_edge(email, github, "recovers")
+    assert ids(graph.neighbors("GitHub:bob")) == ["bob", "bob@example.org"]
+
+def test_nodes_by_type(graph):
+    assert ids(graph.nodes_by_type("Account")) == ["GitHub:bob", "Reddit:bob", "Dev.to:bob"]
+    assert ids(graph.nodes_by_type("Email")) == ["bob@example.org"]
+    assert graph.nodes_by_type("Phone") == []
+
+def test_path_to_root(graph):
+    assert ids(graph.path_to_root("bob@example.org")) == ["bob", "GitHub:bob", "bob@example.org"]
+    assert graph.path_to_root("nobody") == []
+    graph.add_node(EmailNode("stray@example.org", source="Test"))
+    assert graph.path_to_root("stray@example.org") == []
+
+def test_indexes_of_a_graph_with_nodes_removed(graph):
+    # Dropping the emails rebuilds the indexes without them; the source graph is left alone
+    accounts = graph.subgraph("Account")
+    assert set(accounts.nodes) == {"bob", "GitHub:bob", "Reddit:bob", "Dev.to:bob"}
+    assert accounts.nodes_by_type("Email") == []
+    assert ids(accounts.nodes_by_type("Account")) == ["GitHub:bob", "Reddit:bob", "Dev.to:bob"]
+    assert ids(accounts.neighbors("GitHub:bob")) == ["bob"]
+    assert accounts.neighbors("bob@example.org") == []
+    assert len(accounts.edges) == 3
+    assert ids(graph.neighbors("GitHub:bob")) == ["bob", "bob@example.org"]
+
+def test_subgraph_without_root(graph):
+    emails = graph.subgraph(("Email",), keep_root=False)
+    assert list(emails.nodes) == ["bob@example.org"]
+    assert emails.root is None and emails.edges == []
+
+def test_bfs_visits_every_reachable_node_once(graph, capsys):
+    graph.bfs_traversal()
+    lines = capsys.readouterr().out.splitlines()[1:]
+    assert len(lines) == 5
+    assert sum("bob@example.org" in line for line in lines) == 1
+
+class Sink:
+    def __init__(self):
+        self.events = []
+
+    def on_node(self, node, is_root=False):
+        self.events.append(("node", node.id, is_root))
+
+    def on_edge(self, node_a, node_b, relationship):
+        self.events.append(("edge", node_a.id, node_b.id))
+
+def test_listener_gets_the_graph_so_far_then_every_change(graph):
+    sink = Sink()
+    graph.add_listener(sink)
+    assert sink.events[0] == ("node", "bob", True)
+    assert len(sink.events) == 10  # 5 nodes and 5 edges replayed
+    graph.add_edge(graph.nodes["Dev.to:bob"], EmailNode("dev@example.org", source="Test"), "leaked_via_code")
+    assert sink.events[10:] == [("node", "dev@example.org", False), ("edge", "Dev.to:bob", "dev@example.org")]
+    graph.add_edge(graph.nodes["Dev.to:bob"], graph.nodes["dev@example.org"], "leaked_via_code")
+    assert len(sink.events) == 12  # Duplicates are not reported
+
+def test_removed_listener_hears_nothing(graph):
+    sink = Sink()
+    graph.add_listener(sink, replay=False)
+    graph.remove_listener(sink)
+    graph.add_node(EmailNode("late@example.org", source="Test"))
+    assert sink.events == []
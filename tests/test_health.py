@@ -0,0 +1,115 @@
+import pytest
+
+from src.core.health import CLOSED, HALF_OPEN, OPEN, MIN_SAMPLES, MIN_TIMEOUT, CircuitOpen, HostHealth
+from src.core.scanner import PROBE_UNKNOWN, Scanner
+from src.models.graph import IdentityGraph
+from src.models.node import PersonNode
+from src.utils.http_client import HttpClient
+from tests.conftest import Journal
+
+def tripped(clock, threshold=3, cool_down=10):
+    health = HostHealth(failure_threshold=threshold, cool_down=cool_down, max_cool_down=100, clock=clock)
+    for _ in range(threshold):
+        health.before("h")
+        health.failure("h")
+    return health
+
+def test_breaker_opens_after_threshold(clock):
+    health = HostHealth(failure_threshold=3, clock=clock)
+    assert not health.failure("h")
+    assert not health.failure("h")
+    assert health.failure("h")  # The third one opens it
+    assert health._hosts["h"].state == OPEN
+    with pytest.raises(CircuitOpen):
+        health.before("h")
+
+def test_success_resets_failure_count(clock):
+    health = HostHealth(failure_threshold=3, clock=clock)
+    health.failure("h")
+    health.failure("h")
+    health.success("h")
+    assert not health.failure("h")
+    assert health._hosts["h"].state == CLOSED
+
+def test_configured_cool_down_is_used(clock):
+    health = tripped(clock, cool_down=10)
+    assert health._hosts["h"].open_until == clock.now + 10
+
+def test_half_open_lets_one_trial_through(clock):
+    health = tripped(clock)
+    clock.advance(10)
+    health.before("h")  # The trial
+    assert health._hosts["h"].state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        health.before("h")  # Everyone else waits for its outcome
+
+def test_trial_success_closes(clock):
+    health = tripped(clock)
+    clock.advance(10)
+    health.before("h")
+    health.success("h")
+    assert health._hosts["h"].state == CLOSED
+    health.before("h")
+
+def test_trial_failure_doubles_cool_down(clock):
+    health = tripped(clock, cool_down=10)
+    clock.advance(10)
+    health.before("h")
+    assert health.failure("h")
+    state = health._hosts["h"]
+    assert state.state == OPEN
+    assert state.open_until == clock.now + 20
+
+def test_cool_down_is_capped(clock):
+    health = tripped(clock, cool_down=40)
+    for _ in range(3):
+        clock.advance(health._hosts["h"].cool_down)
+        health.before("h")
+        health.failure("h")
+    assert health._hosts["h"].cool_down == 100
+
+def test_released_trial_slot_can_be_taken_again(clock):
+    health = tripped(clock)
+    clock.advance(10)
+    health.before("h")
+    health.release("h")  # The trial ended without an outcome
+    clock.advance(1e7)
+    health.before("h")  # Not stuck half-open
+    assert health._hosts["h"].probing
+
+def test_success_restores_base_cool_down(clock):
+    health = tripped(clock, cool_down=10)
+    clock.advance(10)
+    health.before("h")
+    health.failure("h")  # Cool-down now 20
+    clock.advance(20)
+    health.before("h")
+    health.success("h")
+    assert health._hosts["h"].cool_down == 10
+
+def test_timeout_follows_latency(clock):
+    health = HostHealth(clock=clock)
+    assert health.timeout_for("h", 10) == 10  # No samples yet
+    for _ in range(MIN_SAMPLES):
+        health.success("h", 0.5)
+    assert health.timeout_for("h", 10) == pytest.approx(1.5)
+    assert health.timeout_for("h", 1.2) == 1.2  # Never above the configured timeout
+    for _ in range(MIN_SAMPLES * 10):
+        health.success("h", 0.01)
+    assert health.timeout_for("h", 10) == MIN_TIMEOUT
+
+def test_failing_site_trips_breaker_in_scanner(farm):
+    rules = [{"name": "Broken", "url": "https://broken.example/{}", "check_type": "status_code", "exist_code": 200}]
+    sites_file, _ = farm(rules, sites={"Broken": {"error_rate": 1.0}})
+    scanner = Scanner(sites_file=sites_file, verbose=False, http=HttpClient(retries=0),
+                      health=HostHealth(failure_threshold=2))
+    rule = scanner.rules.by_name["Broken"]
+    journal = Journal()
+    for username in ("a", "b", "c"):
+        graph = IdentityGraph()
+        root = PersonNode(username, source="Test")
+        graph.set_root(root)
+        scanner.scan_target(username, graph, root, journal=journal)
+    assert [state for _, _, state in journal.probes] == [PROBE_UNKNOWN] * 3
+    assert scanner.health._hosts[rule.host].state == OPEN
+    assert scanner.metrics.to_dict()["sites"]["Broken"]["requests"] == 2  # The third was never sent
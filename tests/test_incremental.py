@@ -0,0 +1,175 @@
+import json
+import types
+
+import pytest
+
+import src.core.incremental as incremental_module
+import src.models.store as store_module
+from src.core.github import GitHubPivot
+from src.core.incremental import IncrementalScanner
+from src.core.scanner import PROBE_FOUND, PROBE_MISSING, Scanner
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+from src.models.store import IdentityStore
+from src.utils.http_client import HttpClient
+
+DAY = 86400
+
+@pytest.fixture
+def fake_time(monkeypatch, clock):
+    """Probe timestamps and staleness checks run on the fake clock."""
+    fake = types.SimpleNamespace(time=clock)
+    monkeypatch.setattr(store_module, "time", fake)
+    monkeypatch.setattr(incremental_module, "time", fake)
+    return clock
+
+@pytest.fixture
+def store(tmp_path, fake_time):
+    store = IdentityStore(str(tmp_path / "identity.sqlite"))
+    yield store
+    store.close()
+
+@pytest.fixture
+def make_rescanner(store, tmp_path):
+    """
+    Three Social sites (1 day TTL, 3 days for Site2) served from base at /site<n>/<username>.
+    With pivot=True a hit on Site0 pivots to the GitHub API, served from base as well.
+    """
+    def build(base, pivot=False):
+        rules = [{"name": f"Site{n}", "url": f"{base}/site{n}/{{}}", "check_type": "status_code", "exist_code": 200,
+                  "category": "Social"} for n in range(3)]
+        rules[2]["freshness_ttl"] = 3 * DAY
+        if pivot:
+            rules[0]["pivot"] = "github_email"
+        sites_file = tmp_path / "sites.json"
+        sites_file.write_text(json.dumps(rules))
+        scanner = Scanner(sites_file=str(sites_file), verbose=False, http=HttpClient(retries=0), store=store)
+        scanner.github = GitHubPivot(scanner.http, base_url=base, token="test")
+        return IncrementalScanner(scanner, store)
+    return build
+
+@pytest.fixture
+def rescanner(make_rescanner, etag_server):
+    return make_rescanner(etag_server[0])
+
+def remember(store, target, found, missing=(), emails=None):
+    """Stores a past scan: accounts on the `found` sites (with emails per site) and misses on the others."""
+    graph = IdentityGraph()
+    root = PersonNode(target, source="Test")
+    graph.set_root(root)
+    for site in found:
+        account = AccountNode(target, site, f"https://{site.lower()}.example/{target}", source="Scanner")
+        graph.add_edge(root, account, f"has_account_on_{site}")
+        for email in (emails or {}).get(site, ()):
+            graph.add_edge(account, EmailNode(email, source="Test"), "leaked_via_code")
+        store.write_probe(target, site, PROBE_FOUND, account.url)
+    for site in missing:
+        store.write_probe(target, site, PROBE_MISSING)
+    store.save_graph(target, graph)
+
+def rescan(rescanner, target="joe"):
+    graph = IdentityGraph()
+    root = PersonNode(target, source="Test")
+    graph.set_root(root)
+    return rescanner.rescan(target, graph, root), graph
+
+def test_only_stale_sites_are_probed(rescanner, store, etag_server, fake_time):
+    _, documents, served = etag_server
+    remember(store, "joe", found=["Site1"])
+    fake_time.advance(2 * DAY)
+    remember(store, "joe", found=["Site0"], missing=["Site2"])  # Checked again since
+    documents["/site1/joe"] = (200, {})
+
+    delta, graph = rescan(rescanner)
+    assert served == ["/site1/joe"]
+    assert delta.probed == ["Site1"] and delta.reused == ["Site0", "Site2"]
+    assert {"Site0:joe", "Site1:joe"} <= set(graph.nodes)
+    assert not delta.changed
+
+def test_never_checked_and_failed_sites_are_stale(rescanner, store):
+    remember(store, "joe", found=["Site0"])
+    store.write_probe("joe", "Site1", "unknown")
+    assert [rule.name for rule in rescanner.stale_rules("joe")] == ["Site1", "Site2"]
+
+def test_freshness_ttl_follows_the_category(rescanner, store, fake_time):
+    remember(store, "joe", found=["Site0", "Site1", "Site2"])
+    fake_time.advance(DAY + 1)
+    assert [rule.name for rule in rescanner.stale_rules("joe")] == ["Site0", "Site1"]
+
+def test_account_that_came_back_missing_is_removed(rescanner, store, fake_time):
+    remember(store, "joe", found=["Site0", "Site1"], missing=["Site2"], emails={"Site1": ["joe@x.com"]})
+    fake_time.advance(2 * DAY)
+    store.write_probe("joe", "Site0", PROBE_FOUND)
+    store.write_probe("joe", "Site2", PROBE_MISSING)
+    # The server answers 404 for Site1 now
+
+    delta, graph = rescan(rescanner)
+    assert delta.removed_accounts == ["Site1:joe"]
+    assert "Site1:joe" not in graph.nodes and "joe@x.com" not in graph.nodes
+    assert set(store.load_graph("joe").nodes) == {"joe", "Site0:joe"}
+    assert store.targets_with_email("joe@x.com") == []
+    assert "[-] REMOVED ACCOUNT: Site1:joe" in delta.summary()
+
+def test_failed_check_keeps_the_old_finding(make_rescanner, store, fake_time):
+    rescanner = make_rescanner("http://127.0.0.1:1")  # Nothing listens there: every check fails
+    remember(store, "joe", found=["Site0"], missing=["Site1", "Site2"], emails={"Site0": ["joe@x.com"]})
+    fake_time.advance(2 * DAY)
+    store.write_probe("joe", "Site1", PROBE_MISSING)
+    store.write_probe("joe", "Site2", PROBE_MISSING)
+
+    delta, graph = rescan(rescanner)
+    assert delta.probed == ["Site0"]
+    assert store.probe_states("joe")["Site0"][0] == "unknown"
+    assert delta.removed_accounts == []
+    assert graph.has_edge(graph.nodes["Site0:joe"], graph.nodes["joe@x.com"], "leaked_via_code")
+    assert store.targets_with_email("joe@x.com") == ["joe"]
+
+def test_fresh_findings_keep_their_emails(rescanner, store, etag_server):
+    _, _, served = etag_server
+    remember(store, "joe", found=["Site0"], missing=["Site1", "Site2"], emails={"Site0": ["joe@x.com"]})
+    delta, graph = rescan(rescanner)
+    assert served == [] and delta.probed == []
+    assert graph.path_to_root("joe@x.com")[1].id == "Site0:joe"
+    assert not delta.changed and delta.summary()[-1] == "[*] No changes since the last scan."
+
+def test_new_account_is_reported(rescanner, store, etag_server):
+    _, documents, _ = etag_server
+    remember(store, "joe", found=["Site0"], missing=["Site1"])
+    documents["/site2/joe"] = (200, {})
+    delta, _ = rescan(rescanner)
+    assert delta.probed == ["Site2"]
+    assert delta.new_accounts == ["Site2:joe"]
+    assert "Site2:joe" in store.load_graph("joe").nodes
+
+def test_failed_pivot_keeps_the_old_email(make_rescanner, store, etag_server, fake_time):
+    base, documents, _ = etag_server
+    rescanner = make_rescanner(base, pivot=True)
+    remember(store, "joe", found=["Site0"], missing=["Site1", "Site2"], emails={"Site0": ["joe@x.com"]})
+    fake_time.advance(2 * DAY)
+    store.write_probe("joe", "Site1", PROBE_MISSING)
+    store.write_probe("joe", "Site2", PROBE_MISSING)
+    documents["/site0/joe"] = (200, {})
+    documents["/users/joe"] = (500, {"message": "boom"})  # Account found again, pivot says nothing
+
+    delta, graph = rescan(rescanner)
+    assert delta.probed == ["Site0"] and delta.removed_emails == []
+    assert graph.has_edge(graph.nodes["Site0:joe"], graph.nodes["joe@x.com"], "leaked_via_code")
+    assert store.targets_with_email("joe@x.com") == ["joe"]
+    assert not delta.changed
+
+def test_email_the_pivot_no_longer_finds_is_removed(make_rescanner, store, etag_server, fake_time):
+    base, documents, _ = etag_server
+    rescanner = make_rescanner(base, pivot=True)
+    remember(store, "joe", found=["Site0"], missing=["Site1", "Site2"], emails={"Site0": ["joe@x.com"]})
+    fake_time.advance(2 * DAY)
+    store.write_probe("joe", "Site1", PROBE_MISSING)
+    store.write_probe("joe", "Site2", PROBE_MISSING)
+    documents["/site0/joe"] = (200, {})
+    documents["/users/joe"] = (200, {"login": "joe", "email": None})
+    documents["/users/joe/events/public?per_page=100"] = (200, [])
+
+    delta, graph = rescan(rescanner)
+    assert "joe@x.com" not in graph.nodes and "Site0:joe" in graph.nodes
+    assert store.targets_with_email("joe@x.com") == []
+    assert delta.removed_emails == ["joe@x.com"]
+    assert "[-] REMOVED EMAIL: joe@x.com" in delta.summary()
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from src.models.node import AccountNode, EmailNode, OSINTNode, PersonNode, node_from_dict
+
+def test_nodes_are_slotted():
+    node = AccountNode("bob", "GitHub", "https://github.com/bob", source="Scanner")
+    assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        node.nickname = "b"
+
+def test_extras_are_allocated_on_first_use():
+    node = EmailNode("bob@example.org", source="Scanner")
+    assert node._edges is None and node._properties is None
+    assert node.to_dict()["edges"] == []
+    node.properties["breach"] = "x"
+    node.connect(PersonNode("bob"), "belongs_to")
+    assert node.to_dict()["edges"] == [("bob", "belongs_to")]
+    assert node.properties == {"breach": "x"}
+
+def test_account_properties_show_the_url():
+    node = AccountNode("bob", "GitHub", "https://github.com/bob", source="Scanner")
+    assert node.id == "GitHub:bob" and node.label == "GitHub:bob"
+    assert node.properties == {"url": "https://github.com/bob"}
+
+def test_repeated_strings_are_interned():
+    first = AccountNode("a", "".join(["Git", "Hub"]), "u", source="".join(["Scan", "ner"]))
+    second = AccountNode("b", "".join(["Git", "Hub"]), "u", source="".join(["Scan", "ner"]))
+    assert first.platform is second.platform
+    assert first.source is second.source
+
+def test_timestamp_is_formatted_on_demand():
+    node = OSINTNode("x")
+    node.created = 0.0
+    assert node.timestamp == datetime.fromtimestamp(0).isoformat()
+
+@pytest.mark.parametrize("node", [
+    PersonNode("bob", source="Input"),
+    AccountNode("bob:two", "Dev.to", "https://dev.to/bob", source="Scanner"),
+    EmailNode("bob@example.org", source="GitHub Profile"),
+    OSINTNode("misc"),
+], ids=lambda node: type(node).__name__)
+def test_to_dict_round_trip(node):
+    data = node.to_dict()
+    data["created"] = node.created
+    copy = node_from_dict(data)
+    assert type(copy) is type(node)
+    assert copy.to_dict() == node.to_dict()
+    assert copy.created == node.created
+
+def test_node_from_dict_fills_defaults():
+    node = node_from_dict({"id": "x"})
+    assert type(node) is OSINTNode and node.source == "Unknown"
@@ -0,0 +1,56 @@
+import time
+
+from src.core.health import HALF_OPEN, HostHealth
+from src.core.scanner import Scanner
+from src.utils.http_client import HttpClient
+
+def race_rule(hedge_after):
+    return {
+        "name": "Slowpoke",
+        "profile_url": "https://slow.example/{}",
+        "hedge_after": hedge_after,
+        "strategies": [
+            {"check_type": "markers", "url": "https://slow.example/{}", "exist_code": 200,
+             "absent_markers": ["User not found"]},
+            {"check_type": "search", "query": "site:slow.example/{}", "expected_domains": ["slow.example"]},
+        ],
+    }
+
+def build(farm, hedge_after, slow_ms, site_hits=1.0, search_hits=1.0, health=None):
+    sites_file, site_farm = farm([race_rule(hedge_after)], sites={
+        "Slowpoke": {"latency": {"dist": "fixed", "ms": slow_ms}, "hit_rate": site_hits},
+        "Search": {"hit_rate": search_hits},
+    })
+    scanner = Scanner(sites_file=sites_file, verbose=False, http=HttpClient(retries=0), health=health)
+    return scanner, scanner.rules.by_name["Slowpoke"], site_farm
+
+def test_hedge_beats_slow_primary(farm):
+    scanner, rule, _ = build(farm, hedge_after=0.2, slow_ms=1500)
+    started = time.perf_counter()
+    result = scanner._probe(rule, "alice")
+    elapsed = time.perf_counter() - started
+    assert result == "https://slow.example/alice"
+    assert elapsed < 1.0  # Did not wait for the primary
+
+def test_fast_primary_never_hedges(farm):
+    scanner, rule, site_farm = build(farm, hedge_after=1.0, slow_ms=2)
+    assert scanner._probe(rule, "alice") == "https://slow.example/alice"
+    assert site_farm.requests == 1  # The search strategy was never launched
+
+def test_no_hit_anywhere_is_a_miss(farm):
+    scanner, rule, _ = build(farm, hedge_after=0.1, slow_ms=2, site_hits=0.0, search_hits=0.0)
+    assert scanner._probe(rule, "alice") is None
+
+def test_cancelled_loser_hands_back_half_open_trial(farm, clock):
+    health = HostHealth(failure_threshold=1, cool_down=5, clock=clock)
+    scanner, rule, _ = build(farm, hedge_after=0.2, slow_ms=800, health=health)
+    slow_host = rule.strategies[0].host
+    health.failure(slow_host)
+    clock.advance(5)  # The primary strategy becomes the half-open trial
+
+    assert scanner._probe(rule, "alice") == "https://slow.example/alice"
+    scanner._races().shutdown(wait=True)  # Let the loser find out it lost
+    state = health._hosts[slow_host]
+    assert state.state == HALF_OPEN
+    assert not state.probing  # The next request can be the trial
+    health.before(slow_host)
@@ -0,0 +1,52 @@
+import json
+import re
+
+import pytest
+
+from src.core.reporter import Reporter
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+from src.utils.metrics import ScanMetrics
+
+def findings(path):
+    html = path.read_text()
+    payload = re.search(r'<script type="application/json" id="findingsData">(.*?)</script>', html, re.S).group(1)
+    return html, json.loads(payload)
+
+@pytest.fixture
+def graph():
+    graph = IdentityGraph()
+    root = PersonNode("bob", source="Test")
+    graph.set_root(root)
+    for n in range(5):
+        graph.add_edge(root, AccountNode("bob", f"Site{n}", f"https://site{n}.example/</script>bob", source="Test"),
+                       f"has_account_on_Site{n}")
+    graph.add_edge(root, EmailNode("bob@example.org", source="Test"), "leaked_via_code")
+    return graph
+
+def test_findings_are_split_over_pages(graph, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Reporter("bob", graph, page_size=4).generate_html()
+    first_html, first = findings(tmp_path / "report_bob.html")
+    second_html, second = findings(tmp_path / "report_bob_p2.html")
+    assert len(first) == 4 and len(second) == 2
+    assert {row[0] for row in first + second} == {f"Site{n}" for n in range(5)} | {"EMAIL LEAK"}
+    assert 'href="report_bob_p2.html"' in first_html
+    assert 'href="report_bob.html"' in second_html
+
+def test_rows_cannot_close_the_payload_script(graph, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Reporter("bob", graph).generate_html()
+    _, rows = findings(tmp_path / "report_bob.html")  # Parses, so no row ended the script early
+    assert len(rows) == 6
+    assert "https://site0.example/</script>bob" in [row[1] for row in rows]
+
+def test_performance_card_needs_metrics(graph, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Reporter("bob", graph).generate_html()
+    assert "SCAN PERFORMANCE" not in (tmp_path / "report_bob.html").read_text()
+    metrics = ScanMetrics()
+    with metrics.trace("Site0") as trace:
+        trace.outcome = "found"
+    Reporter("bob", graph, metrics=metrics).generate_html()
+    assert "SCAN PERFORMANCE" in (tmp_path / "report_bob.html").read_text()
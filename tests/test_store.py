@@ -0,0 +1,96 @@
+import types
+
+import pytest
+
+import src.models.store as store_module
+from src.models.graph import IdentityGraph
+from src.models.node import AccountNode, EmailNode, PersonNode
+from src.models.store import IdentityStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = IdentityStore(str(tmp_path / "identity.sqlite"))
+    yield store
+    store.close()
+
+def footprint(target, platforms, emails=(), email_parent=None):
+    """target -> an account per platform; the emails hang off email_parent's account (or the first one)."""
+    graph = IdentityGraph()
+    root = PersonNode(target, source="Test")
+    graph.set_root(root)
+    accounts = {}
+    for platform in platforms:
+        accounts[platform] = AccountNode(target, platform, f"https://{platform.lower()}.example/{target}", source="Test")
+        graph.add_edge(root, accounts[platform], f"has_account_on_{platform}")
+    for email in emails:
+        graph.add_edge(accounts[email_parent or platforms[0]], EmailNode(email, source="Test"), "leaked_via_code")
+    return graph
+
+def test_saved_graph_loads_back(store):
+    graph = footprint("joe", ["GitHub", "Reddit"], ["joe@x.com"])
+    store.save_graph("joe", graph)
+    loaded = store.load_graph("joe")
+    assert loaded.root.id == "joe"
+    assert set(loaded.nodes) == set(graph.nodes)
+    assert sorted((a.id, b.id, rel) for a, b, rel in loaded.edges) == sorted((a.id, b.id, rel) for a, b, rel in graph.edges)
+    assert loaded.nodes["GitHub:joe"].url == "https://github.example/joe"
+    assert store.load_graph("nobody").nodes == {}
+
+def test_targets_with_email_ignores_case(store):
+    store.save_graph("joe", footprint("joe", ["GitHub"], ["Joe@X.com"]))
+    store.save_graph("jo3", footprint("jo3", ["Reddit"], ["joe@x.com"]))
+    store.save_graph("ann", footprint("ann", ["GitHub"], ["ann@x.com"]))
+    assert sorted(store.targets_with_email("JOE@x.com")) == ["jo3", "joe"]
+    assert store.targets_with_email("nobody@x.com") == []
+
+def test_targets_with_platforms_needs_all_of_them(store):
+    store.save_graph("joe", footprint("joe", ["GitHub", "Reddit"]))
+    store.save_graph("ann", footprint("ann", ["GitHub"]))
+    assert store.targets_with_platforms("GitHub", "Reddit") == ["joe"]
+    assert sorted(store.targets_with_platforms("GitHub")) == ["ann", "joe"]
+    assert store.targets_with_platforms() == []
+
+def test_correlate_and_shared_nodes(store):
+    store.save_graph("joe", footprint("joe", ["GitHub"], ["joe@x.com"]))
+    store.save_graph("alias", footprint("alias", ["Reddit"], ["JOE@x.com"]))
+    store.save_graph("ann", footprint("ann", ["GitHub"]))
+    assert store.correlate("joe") == [("alias", ["joe@x.com"])]
+    assert store.correlate("ann") == []
+    assert store.shared_nodes("Email") == [("joe@x.com", "Email", ["alias", "joe"])]
+
+def test_targets_most_recent_first(store):
+    store.touch_target("old", when=100)
+    store.touch_target("new", when=200)
+    assert store.targets() == ["new", "old"]
+
+def test_removed_nodes_take_their_edges_along(store):
+    store.save_graph("joe", footprint("joe", ["GitHub", "Reddit"], ["joe@x.com"]))
+    store.remove_nodes("joe", ["GitHub:joe", "joe@x.com"])
+    loaded = store.load_graph("joe")
+    assert set(loaded.nodes) == {"joe", "Reddit:joe"}
+    assert [(a.id, b.id) for a, b, _ in loaded.edges] == [("joe", "Reddit:joe")]
+    assert store.targets_with_email("joe@x.com") == []
+    assert store.targets_with_node("GitHub:joe") == []
+
+def test_probe_states_keep_the_last_check(store, monkeypatch, clock):
+    monkeypatch.setattr(store_module, "time", types.SimpleNamespace(time=clock))
+    store.write_probe("joe", "GitHub", "found", "https://github.com/joe")
+    clock.advance(1000)
+    store.write_probe("joe", "GitHub", "unknown")
+    store.write_probe("joe", "Reddit", "missing")
+    assert store.probe_states("joe") == {"GitHub": ("unknown", None, clock.now), "Reddit": ("missing", None, clock.now)}
+    assert store.probe_states("ann") == {}
+
+def test_writes_are_visible_to_other_processes_at_once(store):
+    # A second connection stands in for another scanner process sharing the file
+    other = IdentityStore(store.path)
+    try:
+        graph = footprint("joe", ["GitHub"])
+        recorder = store.recorder("joe")
+        graph.add_listener(recorder)  # Still recording: nothing has been closed or committed explicitly
+        assert other.targets_with_node("GitHub:joe") == ["joe"]
+        other.write_probe("ann", "GitHub", "missing")  # Not blocked by the first connection
+        assert list(store.probe_states("ann")) == ["GitHub"]
+        graph.remove_listener(recorder)
+    finally:
+        other.close()
@@ -0,0 +1,126 @@
+import io
+import json
+import threading
+
+import pytest
+
+from src.core.batch import BatchRunner
+from src.core.scanner import PROBE_FOUND, PROBE_MISSING, Scanner
+from src.core.workqueue import DONE, FAILED, LEASED, PENDING, WorkQueue
+from src.utils.http_client import HttpClient
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+def test_add_keeps_order_and_skips_known_targets(queue_path, clock):
+    queue = WorkQueue(queue_path, clock=clock)
+    assert queue.add(["a", "b", "c"]) == 3
+    assert queue.add(["b", "d"]) == 1
+    assert [queue.claim("w") for _ in range(5)] == ["a", "b", "c", "d", None]
+
+def test_workers_never_share_a_target(queue_path, clock):
+    first, second = WorkQueue(queue_path, clock=clock), WorkQueue(queue_path, clock=clock)
+    first.add(f"user{n}" for n in range(20))
+    claimed = []
+
+    def work(queue, worker):
+        while True:
+            target = queue.claim(worker)
+            if target is None:
+                return
+            claimed.append(target)
+
+    threads = [threading.Thread(target=work, args=(queue, name)) for queue, name in ((first, "w1"), (second, "w2"))]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert sorted(claimed) == sorted(f"user{n}" for n in range(20))
+
+def test_expired_lease_is_taken_over(queue_path, clock):
+    queue = WorkQueue(queue_path, lease=10, clock=clock)
+    queue.add(["a"])
+    assert queue.claim("crashed") == "a"
+    assert queue.claim("w2") is None  # Still leased
+    clock.advance(11)
+    assert queue.claim("w2") == "a"
+    # The old holder comes back: its result is dropped, the new holder's is kept
+    assert not queue.complete("a", "crashed", {"target": "a", "by": "crashed"})
+    assert queue.complete("a", "w2", {"target": "a", "by": "w2"})
+    assert list(queue.records()) == [{"target": "a", "by": "w2"}]
+
+def test_renew_keeps_the_lease(queue_path, clock):
+    queue = WorkQueue(queue_path, lease=10, clock=clock)
+    queue.add(["a"])
+    queue.claim("w1")
+    clock.advance(9)
+    assert queue.renew("a", "w1")
+    clock.advance(9)
+    assert queue.claim("w2") is None
+    clock.advance(2)
+    assert queue.claim("w2") == "a"
+    assert not queue.renew("a", "w1")
+
+def test_release_hands_targets_back(queue_path, clock):
+    queue = WorkQueue(queue_path, max_attempts=1, clock=clock)
+    queue.add(["a", "b"])
+    queue.claim("w1")
+    queue.claim("w1")
+    assert queue.release("w1") == 2
+    assert queue.counts() == {PENDING: 2}
+    # A clean abort does not count as an attempt
+    assert queue.claim("w2") == "a"
+
+def test_target_that_keeps_crashing_workers_is_given_up(queue_path, clock):
+    queue = WorkQueue(queue_path, lease=10, max_attempts=2, clock=clock)
+    queue.add(["poison", "ok"])
+    for worker in ("w1", "w2"):
+        assert queue.claim(worker) == "poison"
+        clock.advance(11)
+    assert queue.claim("w3") == "ok"
+    assert queue.counts() == {FAILED: 1, LEASED: 1}
+    assert list(queue.records()) == [{"target": "poison", "error": "Abandoned after repeated crashes"}]
+
+def test_probe_journal(queue_path, clock):
+    queue = WorkQueue(queue_path, clock=clock)
+    queue.write_probe("a", "GitHub", PROBE_FOUND, "https://github.com/a")
+    queue.write_probe("a", "GitHub", PROBE_MISSING)
+    assert queue.probe_states("a") == {"GitHub": (PROBE_MISSING, None, clock.now)}
+
+SITES = [{"name": f"Site{n}", "url": f"https://site{n}.example/{{}}", "check_type": "status_code", "exist_code": 200}
+         for n in range(3)]
+
+def test_crashed_target_resumes_from_unanswered_sites(farm, queue_path, clock):
+    sites_file, site_farm = farm(SITES, hit_rate=1.0)
+    scanner = Scanner(sites_file=sites_file, verbose=False, http=HttpClient(retries=0))
+    queue = WorkQueue(queue_path, lease=10, clock=clock)
+    queue.add(["alice"])
+    # A worker claimed alice, answered two sites and died
+    queue.claim("crashed")
+    queue.write_probe("alice", "Site0", PROBE_FOUND, "https://site0.example/alice")
+    queue.write_probe("alice", "Site1", PROBE_MISSING)
+    clock.advance(11)
+
+    out = io.StringIO()
+    assert BatchRunner(scanner, concurrency=2, out=out, queue=queue, worker="w2").run_queue() == 1
+    record = json.loads(out.getvalue())
+    assert record["resumed"] == 2
+    assert {node["id"] for node in record["nodes"]} == {"Site0:alice", "Site2:alice"}
+    assert site_farm.requests == 1  # Only Site2 was probed
+    assert queue.counts() == {DONE: 1}
+    assert queue.probe_states("alice")["Site2"][0] == PROBE_FOUND
+
+def test_slow_targets_keep_their_lease(farm, queue_path):
+    sites_file, site_farm = farm(SITES[:1], sites={"Site0": {"latency": {"dist": "fixed", "ms": 600}}})
+    WorkQueue(queue_path).add(["a", "b"])
+    outs = [io.StringIO(), io.StringIO()]
+
+    def worker(index):
+        scanner = Scanner(sites_file=sites_file, verbose=False, http=HttpClient(retries=0))
+        queue = WorkQueue(queue_path, lease=0.3)  # Much shorter than one probe
+        BatchRunner(scanner, concurrency=1, out=outs[index], queue=queue, worker=f"w{index}").run_queue(poll=0.05)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(2)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert site_farm.requests == 2  # The heartbeat kept each target with its worker
+    assert sorted(json.loads(line)["target"] for out in outs for line in out.getvalue().splitlines()) == ["a", "b"]